@@ -0,0 +1,277 @@
+"""Headless JSON API serving the page analyses over HTTP.
+
+Each analysis is a GET endpoint taking the same parameters as its page
+query, e.g. `/similar-recipes?recipe=...`; `/` lists them. `POST /batch`
+runs many analyses in one call:
+
+    {"requests": [{"analysis": "similar-recipes", "params": {"recipe": "..."}}, ...]}
+
+and returns {"results": [...]} in the same order, each with its own status.
+
+Queries are started with `Database.submit`, so they run concurrently on the
+shared async driver and share the result cache and in-flight deduplication
+with the pages (the local backend works too). Serialized responses are kept
+in a second cache keyed by the graph's data version, so repeated requests
+skip both the query and the JSON encoding until new data is ingested.
+Responses carry an ETag; a request whose If-None-Match matches gets an
+empty 304.
+
+Usage (from `app/`):
+
+    python -m component.api --port 8000
+    python -m component.api --local-data-dir ../data
+    uvicorn component.api:create_app --factory --port 8000   # settings from NEO4J_* / LOCAL_DATA_DIR
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+from .cache import ResultCache
+from .cli import add_connection_arguments, connect
+from .database import get_database
+from .metrics import tag_page
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+MAX_BATCH_SIZE = 100
+RESPONSE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class Analysis():
+    """An endpoint's query and the parameters it accepts."""
+
+    def __init__(self, cypher_filename: str, parameters: dict, paged: bool = False, description: str = ""):
+        self.cypher_filename = cypher_filename
+        # Parameter name -> (type, default); a default of None makes it required.
+        self.parameters = parameters
+        # Paged analyses also take `page` (from 0) and `page_size`.
+        self.paged = paged
+        self.description = description
+
+    def bind(self, params: dict) -> dict:
+        """Typed parameters from request values; ValueError when they don't fit."""
+        accepted = {**self.parameters, **({"page": (int, 0), "page_size": (int, PAGE_SIZE)} if self.paged else {})}
+        unexpected = params.keys() - accepted.keys()
+        if unexpected:
+            raise ValueError(f"unexpected parameters: {', '.join(sorted(unexpected))}")
+        bound = {}
+        for name, (kind, default) in accepted.items():
+            value = params.get(name, default)
+            if value is None:
+                raise ValueError(f"missing parameter: {name}")
+            try:
+                bound[name] = kind(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be {kind.__name__}") from None
+        if self.paged and not (bound["page"] >= 0 and 1 <= bound["page_size"] <= MAX_PAGE_SIZE):
+            raise ValueError(f"page must be >= 0 and page_size between 1 and {MAX_PAGE_SIZE}")
+        return bound
+
+
+ANALYSES = {
+    "reach": Analysis(
+        "get_high_rep_user_comment_reach.cypher",
+        {"n": (int, 10)},
+        description="Top N users by reputation and how many users commented on the same recipes",
+    ),
+    "reached-users": Analysis(
+        "get_reached_user.cypher",
+        {"user": (str, None), "recipe_count": (int, 2)},
+        description="Users who commented on at least recipe_count of the same recipes as user",
+    ),
+    "similar-recipes": Analysis(
+        "get_similar_recipes.cypher",
+        {"recipe": (str, None)},
+        description="Recipes with the most shared commenters",
+    ),
+    "recipe-sequences": Analysis(
+        "get_recipe_sequences.cypher",
+        {"recipe": (str, None)},
+        description="Chronological recipe sequence of every user who commented on recipe",
+    ),
+    "commenting-paths": Analysis(
+        "get_user_commenting_paths.cypher",
+        {"recipe": (str, None)},
+        paged=True,
+        description="Recipes commented on after recipe, as full paths shared by users",
+    ),
+    "journeys": Analysis(
+        "get_new_user_commenting_journey.cypher",
+        {"length": (int, 3), "min_users": (int, 1)},
+        paged=True,
+        description="The first `length` recipes users commented on, by number of users",
+    ),
+    "user-comments": Analysis(
+        "get_comments.cypher",
+        {"user": (str, None)},
+        description="Every comment posted by user",
+    ),
+    "impact": Analysis(
+        "get_reply_count_thumbs_up.cypher",
+        {"recipe": (str, None)},
+        description="Engagement before and after the first 5-star comment by a high-reputation user",
+    ),
+    "influencer-lift": Analysis(
+        "get_influencer_lift.cypher",
+        {},
+        paged=True,
+        description="Recipes ranked by engagement lift after their first high-reputation 5-star comment",
+    ),
+}
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def conditional_response(request: Request, body: bytes) -> Response:
+    """The JSON body with its ETag, or an empty 304 when the client already has it."""
+    etag = _etag(body)
+    # Clients may keep responses but must revalidate, since ingests change the data.
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+class AnalyticsService():
+    """Runs analyses on a backend and caches their serialized responses."""
+
+    def __init__(self, db, database: str, cache_max_bytes: int = RESPONSE_CACHE_BYTES):
+        self.db = db
+        self.database = database
+        self.responses = ResultCache(max_bytes=cache_max_bytes)
+
+    def _start(self, analysis: Analysis, params: dict):
+        """(key, cached body or None, Future or None). Blocking, so run off the event loop."""
+        tag_page("API")
+        version = self.db.data_version(self.database)
+        key = ResultCache.make_key(analysis.cypher_filename, params, (self.database, version))
+        body = self.responses.get(key)
+        if body is not None:
+            return key, body, None
+        query_params = dict(params)
+        if analysis.paged:
+            page, page_size = query_params.pop("page"), query_params.pop("page_size")
+            future = self.db.submit_page(
+                analysis.cypher_filename, self.database, page=page, page_size=page_size, **query_params
+            )
+        else:
+            future = self.db.submit(analysis.cypher_filename, self.database, **query_params)
+        return key, None, future
+
+    async def body(self, name: str, params: dict) -> bytes:
+        """JSON body of analysis `name` for bound `params`."""
+        key, body, future = await asyncio.to_thread(self._start, ANALYSES[name], params)
+        if body is None:
+            df = await asyncio.wrap_future(future)
+            rows = df.to_json(orient="records", default_handler=str)
+            body = (
+                f'{{"analysis": {json.dumps(name)}, "params": {json.dumps(params)}, "rows": {rows}}}'
+            ).encode()
+            self.responses.put(key, body)
+        return body
+
+    async def batch_item(self, item) -> bytes:
+        """One batch result: {"status": 200, "result": ...} or {"status": 4xx/5xx, "error": ...}."""
+        try:
+            name = item["analysis"]
+            if name not in ANALYSES:
+                return json.dumps({"status": 404, "error": f"unknown analysis: {name}"}).encode()
+            params = ANALYSES[name].bind(item.get("params") or {})
+        except (KeyError, TypeError, AttributeError):
+            return json.dumps({"status": 422, "error": "expected {\"analysis\": ..., \"params\": {...}}"}).encode()
+        except ValueError as e:
+            return json.dumps({"status": 422, "error": str(e)}).encode()
+        try:
+            body = await self.body(name, params)
+        except Exception as e:
+            return json.dumps({"status": 500, "error": f"{type(e).__name__}: {e}"}).encode()
+        return b'{"status": 200, "result": ' + body + b"}"
+
+
+def create_app(db=None, database: str = None) -> FastAPI:
+    """The API for `db`; by default the backend configured in NEO4J_* / LOCAL_DATA_DIR."""
+    if db is None:
+        db = get_database(os.environ)
+    service = AnalyticsService(db, database or os.environ.get("NEO4J_DATABASE", "neo4j"))
+    app = FastAPI(title="Recipe review analytics")
+    app.state.service = service
+
+    @app.get("/")
+    async def index():
+        return {
+            name: {
+                "description": analysis.description,
+                "parameters": {
+                    param: {"type": kind.__name__, "required": default is None, "default": default}
+                    for param, (kind, default) in analysis.parameters.items()
+                },
+                "paged": analysis.paged,
+            }
+            for name, analysis in ANALYSES.items()
+        }
+
+    def endpoint(name: str):
+        async def run(request: Request) -> Response:
+            try:
+                params = ANALYSES[name].bind(dict(request.query_params))
+            except ValueError as e:
+                return JSONResponse({"error": str(e)}, status_code=422)
+            return conditional_response(request, await service.body(name, params))
+
+        return run
+
+    for name, analysis in ANALYSES.items():
+        app.add_api_route(f"/{name}", endpoint(name), methods=["GET"], summary=analysis.description)
+
+    @app.post("/batch")
+    async def batch(request: Request) -> Response:
+        try:
+            items = (await request.json())["requests"]
+        except (ValueError, KeyError, TypeError):
+            return JSONResponse({"error": "expected {\"requests\": [...]}"}, status_code=422)
+        if not isinstance(items, list) or len(items) > MAX_BATCH_SIZE:
+            return JSONResponse(
+                {"error": f"requests must be a list of at most {MAX_BATCH_SIZE} items"}, status_code=422
+            )
+        results = await asyncio.gather(*(service.batch_item(item) for item in items))
+        return conditional_response(request, b'{"results": [' + b", ".join(results) + b"]}")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_connection_arguments(parser)
+    parser.add_argument("--local-data-dir", default=os.environ.get("LOCAL_DATA_DIR"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    if args.local_data_dir:
+        from .local import LocalDatabase
+
+        db = LocalDatabase.from_csv_dir(args.local_data_dir)
+    else:
+        db = connect(args)
+    uvicorn.run(create_app(db, args.database), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Time every page query against synthetic data at several scales.
+
+For each scale, a dataset is generated with `component.synthetic` and
+loaded into a backend:
+
+- `local`: the in-process `LocalDatabase` (no server needed),
+- `neo4j`: the server from --uri/NEO4J_URI. With --load, the database is
+  cleared, the dataset ingested and the precomputed data rebuilt; without
+  it, the data already in the database is measured. Use a scratch database.
+
+Every top-level query in `app/cypher/` is run with representative
+parameters (the most commented recipe, the most active user, ...), after
+warm-up runs, bypassing the result cache. Median and p95 wall times are
+compared with a baseline JSON file; a query is a regression when its
+median is more than --threshold slower than the baseline and by more than
+--min-delta-ms. The exit status is 1 when any query regressed.
+
+Usage (from `app/`):
+
+    python -m component.benchmark --backend local --scales 1 10 --baseline ../benchmarks/local.json
+    python -m component.benchmark --backend local --scales 1 10 --baseline ../benchmarks/local.json --save-baseline
+    python -m component.benchmark --backend neo4j --scales 10 --load --baseline ../benchmarks/neo4j.json
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from neo4j.exceptions import ClientError
+
+from . import ingest, materialize, synthetic
+from .cli import add_connection_arguments, connect
+from .local import LocalDatabase
+from .queries import UnsupportedQueryError
+from .search import to_fulltext_query
+
+REPEAT = 5
+WARMUP = 1
+THRESHOLD = 0.25
+MIN_DELTA_MS = 5.0
+
+
+def representative_parameters(recipes: pd.DataFrame, users: pd.DataFrame, comments: pd.DataFrame) -> dict:
+    """Parameter values that exercise the expensive paths of each query.
+
+    Values under "per_query" replace the shared ones for that query, e.g. the
+    user search matches the top user's name instead of a recipe name.
+    """
+    top_recipe = comments["recipe_code"].value_counts().index[0]
+    top_user = comments["user_id"].value_counts().index[0]
+    recipe = recipes.loc[recipes["recipe_code"] == top_recipe, "recipe_name"].iloc[0]
+    user = users.loc[users["user_id"] == top_user, "user_name"].iloc[0]
+    return {
+        "recipe": recipe,
+        "user": user,
+        "n": 10,
+        "recipe_count": 2,
+        "limit": 50,
+        "length": 3,
+        "min_users": 1,
+        "search": to_fulltext_query(recipe.split()[0]),
+        "per_query": {
+            "search_users.cypher": {"search": to_fulltext_query(user)},
+        },
+    }
+
+
+def benchmark_queries(db, database: str, params: dict, repeat: int = REPEAT, warmup: int = WARMUP) -> dict:
+    """{query name: {"median_ms", "p95_ms", "rows"}} for every page query."""
+    results = {}
+    for query in db.queries:
+        if "/" in query.name:
+            continue
+        overrides = params.get("per_query", {}).get(query.name, {})
+        query_params = {name: overrides.get(name, params[name]) for name in query.parameters}
+        times = []
+        try:
+            for i in range(warmup + repeat):
+                start = time.perf_counter()
+                df = db.execute(query.name, database, **query_params)
+                if i >= warmup:
+                    times.append(time.perf_counter() - start)
+        except UnsupportedQueryError:
+            print(f"{query.name}: skipped (no local implementation)")
+            continue
+        except ClientError as e:
+            print(f"{query.name}: skipped ({e.code})")
+            continue
+        times = np.array(times) * 1000
+        results[query.name] = {
+            "median_ms": round(float(np.median(times)), 3),
+            "p95_ms": round(float(np.percentile(times, 95)), 3),
+            "rows": len(df),
+        }
+    return results
+
+
+def load_dataset(backend: str, db, database: str, data_dir: Path, load: bool):
+    """Return a backend holding the dataset in `data_dir`."""
+    if backend == "local":
+        return LocalDatabase.from_csv_dir(data_dir)
+    if load:
+        db.execute("ingest/clear_graph.cypher", database)
+        print(ingest.ingest_csv_dir(db, database, data_dir))
+        materialize.build(db, database)
+    return db
+
+
+def compare(results: dict, baseline: dict, threshold: float = THRESHOLD, min_delta_ms: float = MIN_DELTA_MS) -> list:
+    """Regressions of `results` against `baseline`, both keyed "<backend>/x<scale>" then query."""
+    regressions = []
+    for run, queries in results.items():
+        for name, current in queries.items():
+            previous = baseline.get(run, {}).get(name)
+            if previous is None:
+                continue
+            delta = current["median_ms"] - previous["median_ms"]
+            if delta > min_delta_ms and current["median_ms"] > previous["median_ms"] * (1 + threshold):
+                regressions.append(
+                    f"{run} {name}: {previous['median_ms']:.1f} -> {current['median_ms']:.1f} ms"
+                )
+    return regressions
+
+
+def report(run: str, queries: dict, baseline: dict) -> str:
+    rows = [
+        {
+            "query": name,
+            "median_ms": result["median_ms"],
+            "p95_ms": result["p95_ms"],
+            "baseline_ms": baseline.get(run, {}).get(name, {}).get("median_ms"),
+            "rows": result["rows"],
+        }
+        for name, result in queries.items()
+    ]
+    return f"{run}\n{pd.DataFrame(rows).to_string(index=False)}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_connection_arguments(parser)
+    parser.add_argument("--backend", choices=["local", "neo4j"], default="local")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timestamp-unit", choices=synthetic.TIMESTAMP_UNITS, default="mixed")
+    parser.add_argument("--data-root", help="keep generated datasets here (default: a temporary folder)")
+    parser.add_argument("--load", action="store_true", help="neo4j: clear the database and load each scale")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--warmup", type=int, default=WARMUP)
+    parser.add_argument("--baseline", help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results to --baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--min-delta-ms", type=float, default=MIN_DELTA_MS)
+    args = parser.parse_args()
+    if args.backend == "neo4j" and len(args.scales) > 1 and not args.load:
+        parser.error("--load is needed to benchmark more than one scale on neo4j")
+
+    db = connect(args) if args.backend == "neo4j" else None
+    baseline_path = Path(args.baseline) if args.baseline else None
+    baseline = json.loads(baseline_path.read_text()) if baseline_path and baseline_path.exists() else {}
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(args.data_root or tmp)
+        for scale in args.scales:
+            data_dir = root / f"x{scale:g}"
+            if not (data_dir / "comment.csv").exists():
+                synthetic.write_csv_dir(data_dir, scale, args.seed, args.timestamp_unit)
+            recipes = pd.read_csv(data_dir / "recipe.csv")
+            users = pd.read_csv(data_dir / "user.csv")
+            comments = pd.read_csv(data_dir / "comment.csv", usecols=["recipe_code", "user_id"])
+            backend = load_dataset(args.backend, db, args.database, data_dir, args.load)
+            params = representative_parameters(recipes, users, comments)
+
+            run = f"{args.backend}/x{scale:g}"
+            results[run] = benchmark_queries(backend, args.database, params, args.repeat, args.warmup)
+            print(report(run, results[run], baseline), end="\n\n")
+
+    regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+    if args.save_baseline and baseline_path:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps({**baseline, **results}, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {baseline_path}")
+    elif regressions:
+        raise SystemExit("Regressions:\n" + "\n".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
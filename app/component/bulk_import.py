@@ -0,0 +1,161 @@
+"""Convert the raw UCI dataset into `neo4j-admin database import` files.
+
+For full rebuilds this replaces both the pandas steps in
+`jupyter_nb/preprocess_data.ipynb` and the transactional loaders: the raw
+CSV is read in chunks, IDs are deduplicated, integer columns are typed in
+the headers, and node/relationship files are written (optionally gzipped)
+ready for an offline import.
+
+Usage (from `app/`):
+
+    python -m component.bulk_import "../data/Recipe Reviews and User Feedback Dataset.csv" ../import --compress
+
+The matching `neo4j-admin` command is printed when the files are written.
+"""
+
+import argparse
+import gzip
+from pathlib import Path
+
+import pandas as pd
+
+from .ingest import COMMENT_PROPERTIES, RECIPE_COLUMNS, USER_COLUMNS, read_chunks
+
+# Header for each output file: (column in the raw data, header field). A
+# separate :ID column keeps recipe_code an integer property, since import IDs
+# are always stored as strings.
+NODE_FILES = {
+    "RECIPE": [
+        ("recipe_code", ":ID(RECIPE)"),
+        ("recipe_code", "recipe_code:int"),
+        ("recipe_number", "recipe_number:int"),
+        ("recipe_name", "recipe_name"),
+    ],
+    "USER": [
+        ("user_id", ":ID(USER)"),
+        ("user_id", "user_id"),
+        ("user_name", "user_name"),
+        ("user_reputation", "user_reputation:int"),
+    ],
+    "COMMENT": [
+        ("comment_id", ":ID(COMMENT)"),
+        ("comment_id", "comment_id"),
+        ("recipe_code", "recipe_code:int"),
+        ("user_id", "user_id"),
+        ("created_at", "created_at:long"),
+        ("reply_count", "reply_count:int"),
+        ("thumbs_up", "thumbs_up:int"),
+        ("thumbs_down", "thumbs_down:int"),
+        ("stars", "stars:int"),
+        ("best_score", "best_score:int"),
+        ("text", "text"),
+    ],
+}
+RELATIONSHIP_FILES = {
+    "POSTED": [("user_id", ":START_ID(USER)"), ("comment_id", ":END_ID(COMMENT)")],
+    "BELONGS_TO": [("comment_id", ":START_ID(COMMENT)"), ("recipe_code", ":END_ID(RECIPE)")],
+}
+
+
+class ImportFile():
+    """A header file plus a (possibly gzipped) data file written chunk by chunk."""
+
+    def __init__(self, output_dir: Path, name: str, columns: list, compress: bool):
+        self.columns = [column for column, _ in columns]
+        self.header_path = output_dir / f"{name}_header.csv"
+        self.data_path = output_dir / (f"{name}.csv.gz" if compress else f"{name}.csv")
+        pd.DataFrame(columns=[field for _, field in columns]).to_csv(
+            self.header_path, index=False
+        )
+        if compress:
+            self._handle = gzip.open(self.data_path, "wt", newline="", encoding="utf-8")
+        else:
+            self._handle = open(self.data_path, "w", newline="", encoding="utf-8")
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame):
+        if len(df):
+            df[self.columns].to_csv(self._handle, header=False, index=False)
+            self.rows += len(df)
+
+    def close(self):
+        self._handle.close()
+
+    @property
+    def argument(self) -> str:
+        return f"{self.header_path},{self.data_path}"
+
+
+def generate(raw_path, output_dir, chunksize: int = 100_000, compress: bool = False) -> dict:
+    """Write import files for the raw dataset and return them keyed by label/type.
+
+    Comments and relationships are streamed; the raw file is read twice. The
+    first pass finds the last row of each comment ID (later rows win, as with
+    MERGE ... SET in the transactional loaders) and keeps the latest row per
+    user and recipe; the second writes each comment from its last row.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    files = {
+        name: ImportFile(output_dir, name.lower(), columns, compress)
+        for name, columns in {**NODE_FILES, **RELATIONSHIP_FILES}.items()
+    }
+    # comment_id -> index of its last row in the raw file (chunks keep counting the index).
+    last_rows = {}
+    recipes, users = {}, {}
+    try:
+        for chunk in read_chunks(raw_path, chunksize):
+            chunk = chunk.dropna(subset=["comment_id", "user_id", "recipe_code"])
+            last_rows.update(zip(chunk["comment_id"], chunk.index))
+            for row in chunk[RECIPE_COLUMNS].itertuples(index=False):
+                recipes[row.recipe_code] = row
+            for row in chunk[USER_COLUMNS].itertuples(index=False):
+                users[row.user_id] = row
+
+        for chunk in read_chunks(raw_path, chunksize):
+            chunk = chunk.dropna(subset=["comment_id", "user_id", "recipe_code"])
+            last = chunk[(chunk["comment_id"].map(last_rows) == chunk.index).to_numpy()]
+
+            files["COMMENT"].write(last[["comment_id", "user_id", "recipe_code"] + COMMENT_PROPERTIES])
+            files["POSTED"].write(last)
+            files["BELONGS_TO"].write(last)
+
+        files["RECIPE"].write(pd.DataFrame(list(recipes.values()), columns=RECIPE_COLUMNS))
+        files["USER"].write(pd.DataFrame(list(users.values()), columns=USER_COLUMNS))
+    finally:
+        for import_file in files.values():
+            import_file.close()
+    return files
+
+
+def import_command(files: dict, database: str = "neo4j") -> str:
+    arguments = [f"--nodes={name}={files[name].argument}" for name in NODE_FILES]
+    arguments += [f"--relationships={name}={files[name].argument}" for name in RELATIONSHIP_FILES]
+    # Review text can span lines.
+    arguments.append("--multiline-fields=true")
+    return " \\\n    ".join(["neo4j-admin database import full"] + arguments + [database])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("raw", help="raw UCI dataset CSV")
+    parser.add_argument("output_dir")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--compress", action="store_true", help="gzip the data files")
+    parser.add_argument("--database", default="neo4j")
+    args = parser.parse_args()
+
+    files = generate(args.raw, args.output_dir, args.chunksize, args.compress)
+    for name, import_file in files.items():
+        print(f"{name}: {import_file.rows} rows")
+    print()
+    print(import_command(files, args.database))
+    print()
+    print(
+        "After importing, run `python -m component.schema apply` and then "
+        "`python -m component.materialize` to build the precomputed relationships."
+    )
+
+
+if __name__ == "__main__":
+    main()
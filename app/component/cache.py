@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+# Seconds a cached result stays valid, keyed by cypher file. Catalog-style
+# queries barely change between ingests, so they are kept for longer.
+DEFAULT_TTL = 300
+QUERY_TTLS = {
+    "get_all_recipes.cypher": 3600,
+    "get_users_sort_by_rep.cypher": 3600,
+    "get_new_user_commenting_journey.cypher": 3600,
+    "search_recipes.cypher": 3600,
+    "search_users.cypher": 3600,
+    "get_recipe_sketches.cypher": 3600,
+}
+
+
+def _estimate_size(value) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, bytes):
+        return len(value)
+    return 1024
+
+
+class ResultCache():
+    """Memory-bounded LRU cache of query results with per-query TTLs.
+
+    Keys are (cypher_filename, parameters, database). Entries are evicted when
+    they expire, when the total estimated size exceeds `max_bytes`, or when
+    `invalidate` is called after new data has been ingested.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, ttls: dict = None):
+        self.max_bytes = max_bytes
+        self.ttls = dict(QUERY_TTLS if ttls is None else ttls)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(cypher_filename: str, parameters: dict, database: str) -> tuple:
+        return (cypher_filename, tuple(sorted((parameters or {}).items())), database)
+
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, size, expires_at = entry
+            if expires_at < time.monotonic():
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Hand out a copy so pages mutating the frame (e.g. converting
+        # created_at) don't alter the cached result.
+        return value.copy() if isinstance(value, pd.DataFrame) else value
+
+    def put(self, key: tuple, value, ttl: float = None):
+        if ttl is None:
+            ttl = self.ttls.get(key[0], DEFAULT_TTL)
+        if ttl <= 0:
+            return
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        stored = value.copy() if isinstance(value, pd.DataFrame) else value
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (stored, size, time.monotonic() + ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, cypher_filename: str = None):
+        """Drop every entry, or only those produced by `cypher_filename`."""
+        with self._lock:
+            for key in list(self._entries):
+                if cypher_filename is None or key[0] == cypher_filename:
+                    self._drop(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _drop(self, key: tuple):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
@@ -0,0 +1,30 @@
+"""Shared command-line helpers for the batch jobs in this package.
+
+Jobs are run from the `app/` directory, e.g. `python -m component.materialize`.
+Connection settings default to the same NEO4J_* names the pages read from
+Streamlit secrets, taken from environment variables.
+"""
+
+import argparse
+import os
+
+from .database import Database
+
+
+def add_connection_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--uri", default=os.environ.get("NEO4J_URI"))
+    parser.add_argument("--username", default=os.environ.get("NEO4J_USERNAME"))
+    parser.add_argument("--password", default=os.environ.get("NEO4J_PASSWORD"))
+    parser.add_argument(
+        "--database", default=os.environ.get("NEO4J_DATABASE", "neo4j")
+    )
+
+
+def connect(args: argparse.Namespace) -> Database:
+    missing = [name for name in ("uri", "username", "password") if not getattr(args, name)]
+    if missing:
+        raise SystemExit(
+            "Missing connection settings: "
+            + ", ".join(f"--{name} / NEO4J_{name.upper()}" for name in missing)
+        )
+    return Database(uri=args.uri, username=args.username, password=args.password)
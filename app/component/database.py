@@ -1,25 +1,618 @@
-from neo4j import GraphDatabase
+import asyncio
+import atexit
+import threading
+import time
+from concurrent.futures import Future
+
+import pandas as pd
+from neo4j import AsyncGraphDatabase, GraphDatabase
+from neo4j.exceptions import ClientError
+
+from .cache import ResultCache
+from .metrics import (
+    ADHOC,
+    current_page,
+    enable_json_logs,
+    metrics,
+    profile_db_hits,
+    result_bytes,
+    serve_prometheus,
+)
+from .queries import get_registry
+
+# Ingest jobs bump this counter after writing new data; every process serving
+# cached results polls it and drops its cache when the value changes.
+DATA_VERSION_QUERY = "MATCH (v:DATA_VERSION {name: 'graph'}) RETURN v.version AS version"
+BUMP_DATA_VERSION_QUERY = """
+MERGE (v:DATA_VERSION {name: 'graph'})
+SET v.version = coalesce(v.version, 0) + 1
+RETURN v.version AS version
+"""
+# Query-plan cache counters from the server's metrics, read over JMX. Needs the
+# metrics and their JMX export enabled (the defaults on self-managed servers)
+# and permission to call dbms.queryJmx, which Aura doesn't grant.
+PLAN_CACHE_QUERY = """
+CALL dbms.queryJmx('neo4j.metrics:*') YIELD name, attributes
+WHERE name CONTAINS '.cypher.cache.'
+RETURN name, attributes
+"""
+PLAN_CACHE_COLUMNS = ["cache", "hits", "misses", "hit_rate"]
+
 
 class Database():
-    def __init__(self, uri: str,username: str, password: str):
+    """Process-wide Neo4j connection shared by every page and rerun.
+
+    Streamlit re-executes page scripts on every interaction, so calling
+    `Database(...)` at module level used to open a new driver (and a new
+    connection pool) each time. Instances are now cached per (uri, username):
+    the first call creates the driver, later calls return the same object so
+    reruns reuse warm connections.
+
+    Pool settings are passed straight to `GraphDatabase.driver` and only take
+    effect on the first call for a given (uri, username).
+
+    `submit`, `submit_page` and `gather` run independent queries concurrently
+    on an `AsyncGraphDatabase` driver owned by a background event loop, so a
+    page waits for its slowest query instead of the sum of all of them.
+    `prefetch` starts a query speculatively; a later `run_query` with the same
+    arguments waits for the in-flight result instead of running it again.
+
+    Every execution is recorded in `component.metrics` with its wall time and
+    server timings. Set `profile` to run page queries (`run_query`,
+    `run_page`, `submit`) under PROFILE and record their db hits as well.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __new__(cls, uri: str, username: str, password: str, **pool_config):
+        key = (uri, username)
+        with cls._instances_lock:
+            instance = cls._instances.get(key)
+            if instance is None:
+                instance = super().__new__(cls)
+                instance._initialized = False
+                cls._instances[key] = instance
+        return instance
+
+    def __init__(
+        self,
+        uri: str,
+        username: str,
+        password: str,
+        max_connection_pool_size: int = 50,
+        connection_acquisition_timeout: float = 30.0,
+        liveness_check_timeout: float = 60.0,
+        max_connection_lifetime: float = 3600.0,
+        cache_max_bytes: int = 256 * 1024 * 1024,
+        version_check_interval: float = 30.0,
+        profile: bool = False,
+    ):
+        if self._initialized:
+            return
+        self.uri = uri
+        self._auth = (username, password)
+        self.pool_config = {
+            "max_connection_pool_size": max_connection_pool_size,
+            "connection_acquisition_timeout": connection_acquisition_timeout,
+            "liveness_check_timeout": liveness_check_timeout,
+            "max_connection_lifetime": max_connection_lifetime,
+        }
         self.driver = GraphDatabase.driver(
             uri=uri
             ,auth=(username, password)
+            ,**self.pool_config
         )
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "sessions_opened": 0,
+            "sessions_active": 0,
+            "sessions_peak": 0,
+            "queries_run": 0,
+            "errors": 0,
+        }
+        self.cache = ResultCache(max_bytes=cache_max_bytes)
+        self.version_check_interval = version_check_interval
+        self.profile = profile
+        self._data_versions = {}
+        self._plan_cache_stats = {}
+        self.queries = get_registry()
+        # Async path, started on first use: event loop thread, driver and the
+        # in-flight queries keyed like the result cache.
+        self._loop = None
+        self.async_driver = None
+        self._async_lock = threading.Lock()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._initialized = True
 
     def generate_query(self, cypher_filename: str):
+        return self.queries.get(cypher_filename).text
+
+    def run_cypher(self, query: str, database: str, parameters: dict = None) -> dict:
+        return self._run(query, parameters, database, name=ADHOC)
+
+    def _run(
+        self, text: str, parameters: dict, database: str, name: str, profile: bool = False
+    ) -> pd.DataFrame:
+        """Run cypher text and record its metrics under `name`."""
+        if profile:
+            text = "PROFILE\n" + text
+        self._track_session_start()
+        start = time.perf_counter()
+        try:
+            with self.driver.session(database=database) as session:
+                result = session.run(text, parameters)
+                df = result.to_df()
+                summary = result.consume()
+        except Exception as e:
+            self._increment("errors")
+            metrics.record(name, time.perf_counter() - start, error=type(e).__name__)
+            raise
+        finally:
+            self._track_session_end()
+        metrics.record(
+            name,
+            time.perf_counter() - start,
+            rows=len(df),
+            bytes=result_bytes(df),
+            available_after=summary.result_available_after,
+            consumed_after=summary.result_consumed_after,
+            db_hits=profile_db_hits(summary.profile) if profile else None,
+        )
+        return df
+
+    def run_query(
+        self, cypher_filename: str, database: str, ttl: float = None, **params
+    ):
+        """Run a registered query file through the result cache.
+
+        Keyword arguments are sent as Cypher parameters (`$recipe`, `$user`,
+        ...), so the query text never changes and Neo4j reuses its plan.
+        Results are cached per (cypher_filename, params, database). `ttl`
+        overrides the per-query default from `cache.QUERY_TTLS`; pass 0 to
+        bypass the cache for a single call.
+        """
+        query = self.queries.get(cypher_filename)
+        parameters = query.bind(params)
+        self._check_data_version(database)
+        key = ResultCache.make_key(cypher_filename, parameters, database)
+        if ttl != 0:
+            df = self.cache.get(key)
+            if df is not None:
+                metrics.record_cache_hit(cypher_filename)
+                return df
+        pending = self._pending_future(key)
+        if pending is not None:
+            return pending.result().copy()
+
+        df = self._run(query.text, parameters, database, name=query.name, profile=self.profile)
+        self.cache.put(key, df, ttl=ttl)
+        return df
+
+    def execute(self, cypher_filename: str, database: str, **params):
+        """Run a registered query file with parameters, bypassing the cache.
+
+        Used for writes (ingest, materialization jobs) and by `run_query` on
+        cache misses.
+        """
+        query = self.queries.get(cypher_filename)
+        parameters = query.bind(params)
+        df = self._run(query.text, parameters, database, name=query.name)
+        return df
+
+    def write(self, cypher_filename: str, database: str, **params):
+        """Run a registered write query in a managed transaction.
+
+        Transient failures such as deadlocks between concurrent batches are
+        retried by the driver. Returns the records of the query's RETURN
+        clause, if any (e.g. how many rows of a batch were written).
+        """
+        query = self.queries.get(cypher_filename)
+        parameters = query.bind(params)
+
+        def work(tx):
+            result = tx.run(query.text, parameters)
+            return result.data(), result.consume()
+
+        self._track_session_start()
+        start = time.perf_counter()
+        try:
+            with self.driver.session(database=database) as session:
+                records, summary = session.execute_write(work)
+        except Exception as e:
+            self._increment("errors")
+            metrics.record(query.name, time.perf_counter() - start, error=type(e).__name__)
+            raise
+        finally:
+            self._track_session_end()
+        metrics.record(
+            query.name,
+            time.perf_counter() - start,
+            available_after=summary.result_available_after,
+            consumed_after=summary.result_consumed_after,
+        )
+        return records
+
+    def explain(self, cypher_filename: str, database: str, **params) -> dict:
+        """Return the EXPLAIN plan of a registered query without running it."""
+        query = self.queries.get(cypher_filename)
+        parameters = query.bind(params)
+        self._track_session_start()
+        try:
+            with self.driver.session(database=database) as session:
+                return session.run("EXPLAIN\n" + query.text, parameters).consume().plan
+        except Exception:
+            self._increment("errors")
+            raise
+        finally:
+            self._track_session_end()
+
+    def run_page(
+        self,
+        cypher_filename: str,
+        database: str,
+        page: int = 0,
+        page_size: int = 100,
+        ttl: float = None,
+        **params,
+    ):
+        """Fetch one page of a query's rows, with SKIP/LIMIT pushed to the server.
+
+        Only the requested rows cross the network; pages are cached like
+        `run_query` results.
+        """
+        query = self.queries.get(cypher_filename)
+        parameters = query.bind_page(params, page, page_size)
+        self._check_data_version(database)
+        key = ResultCache.make_key(cypher_filename, parameters, database)
+        if ttl != 0:
+            df = self.cache.get(key)
+            if df is not None:
+                metrics.record_cache_hit(cypher_filename)
+                return df
+        pending = self._pending_future(key)
+        if pending is not None:
+            return pending.result().copy()
+
+        df = self._run(
+            query.paged_text, parameters, database, name=query.name, profile=self.profile
+        )
+        self.cache.put(key, df, ttl=ttl)
+        return df
+
+    def stream_query(
+        self,
+        cypher_filename: str,
+        database: str,
+        fetch_size: int = 1000,
+        arrow: bool = False,
+        **params,
+    ):
+        """Yield a query's rows in batches of `fetch_size` as they arrive.
+
+        Rows are pulled from the server `fetch_size` at a time, so memory stays
+        bounded by one batch and the first rows are available before the query
+        has finished. Batches are DataFrames, or `pyarrow.RecordBatch` when
+        `arrow` is set. The session stays open until the generator is
+        exhausted or closed. Results are not cached.
+        """
+        query = self.queries.get(cypher_filename)
+        parameters = query.bind(params)
+        self._track_session_start()
+        start = time.perf_counter()
+        rows = 0
         try:
-            with open(f'app/cypher/{cypher_filename}', 'r') as file:
-                query = file.read()
-            return query
-        except FileNotFoundError:
-            print(f"Error: The file '{cypher_filename}' was not found.")
+            with self.driver.session(database=database, fetch_size=fetch_size) as session:
+                result = session.run(query.text, parameters)
+                keys = result.keys()
+                while True:
+                    records = result.fetch(fetch_size)
+                    if not records:
+                        break
+                    rows += len(records)
+                    yield records_to_batch(keys, records, arrow)
+                summary = result.consume()
         except Exception as e:
-            print(f"An error occurred: {e}")
+            self._increment("errors")
+            metrics.record(query.name, time.perf_counter() - start, rows=rows, error=type(e).__name__)
+            raise
+        finally:
+            self._track_session_end()
+        metrics.record(
+            query.name,
+            time.perf_counter() - start,
+            rows=rows,
+            available_after=summary.result_available_after,
+            consumed_after=summary.result_consumed_after,
+        )
+
+    def submit(
+        self, cypher_filename: str, database: str, ttl: float = None, **params
+    ) -> Future:
+        """Start a registered query on the async driver and return a Future.
+
+        Takes the same arguments as `run_query` and shares its cache: cached
+        results resolve immediately, and a query already in flight with the
+        same arguments is joined rather than run twice.
+        """
+        query = self.queries.get(cypher_filename)
+        parameters = query.bind(params)
+        return self._submit(query, query.text, parameters, database, ttl)
+
+    def submit_page(
+        self,
+        cypher_filename: str,
+        database: str,
+        page: int = 0,
+        page_size: int = 100,
+        ttl: float = None,
+        **params,
+    ) -> Future:
+        """`submit` for one page of a query, as returned by `run_page`."""
+        query = self.queries.get(cypher_filename)
+        parameters = query.bind_page(params, page, page_size)
+        return self._submit(query, query.paged_text, parameters, database, ttl)
 
-    def run_cypher(self, query: str, database: str) -> dict:
-        with self.driver.session() as session:
-            results = session.run(query=query, database=database)
-            df = results.to_df()
+    def gather(self, *futures) -> list:
+        """Wait for submitted queries and return their DataFrames in order."""
+        return [future.result().copy() for future in futures]
+
+    def prefetch(self, cypher_filename: str, database: str, **params):
+        """Speculatively start a query whose result a page is likely to need next.
+
+        Errors are left for the eventual `run_query` to raise.
+        """
+        self.submit(cypher_filename, database, **params)
+
+    def _submit(self, query, text: str, parameters: dict, database: str, ttl: float) -> Future:
+        self._check_data_version(database)
+        key = ResultCache.make_key(query.name, parameters, database)
+        if ttl != 0:
+            df = self.cache.get(key)
+            if df is not None:
+                metrics.record_cache_hit(query.name)
+                future = Future()
+                future.set_result(df)
+                return future
+
+        loop = self._async_loop()
+        with self._pending_lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            future = asyncio.run_coroutine_threadsafe(
+                self._fetch(text, parameters, database, query.name, current_page()), loop
+            )
+            self._pending[key] = future
+
+        def done(future):
+            # Cache before leaving the in-flight table, so callers always find one or the other.
+            if not future.cancelled() and future.exception() is None:
+                self.cache.put(key, future.result(), ttl=ttl)
+            with self._pending_lock:
+                self._pending.pop(key, None)
+
+        future.add_done_callback(done)
+        return future
+
+    def _pending_future(self, key):
+        with self._pending_lock:
+            return self._pending.get(key)
+
+    async def _fetch(
+        self, text: str, parameters: dict, database: str, name: str, page: str
+    ) -> pd.DataFrame:
+        # The event loop thread doesn't see the caller's page tag, so it is passed in.
+        profile = self.profile
+        self._track_session_start()
+        start = time.perf_counter()
+        try:
+            async with self.async_driver.session(database=database) as session:
+                result = await session.run("PROFILE\n" + text if profile else text, parameters)
+                df = await result.to_df()
+                summary = await result.consume()
+        except Exception as e:
+            self._increment("errors")
+            metrics.record(name, time.perf_counter() - start, error=type(e).__name__, page=page)
+            raise
+        finally:
+            self._track_session_end()
+        metrics.record(
+            name,
+            time.perf_counter() - start,
+            rows=len(df),
+            bytes=result_bytes(df),
+            available_after=summary.result_available_after,
+            consumed_after=summary.result_consumed_after,
+            db_hits=profile_db_hits(summary.profile) if profile else None,
+            page=page,
+        )
         return df
-        
\ No newline at end of file
+
+    def _async_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop and async driver on first use."""
+        with self._async_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name=f"neo4j-async-{self.uri}", daemon=True
+                ).start()
+
+                async def create_driver():
+                    return AsyncGraphDatabase.driver(
+                        uri=self.uri, auth=self._auth, **self.pool_config
+                    )
+
+                self.async_driver = asyncio.run_coroutine_threadsafe(create_driver(), loop).result()
+                self._loop = loop
+        return self._loop
+
+    def invalidate_cache(self, cypher_filename: str = None):
+        """Drop cached results, e.g. after new data has been ingested."""
+        self.cache.invalidate(cypher_filename)
+
+    def bump_data_version(self, database: str) -> int:
+        """Mark the graph as changed so every serving process drops its cache."""
+        version = self._run(BUMP_DATA_VERSION_QUERY, None, database, name="bump_data_version")
+        self.invalidate_cache()
+        self._data_versions[database] = (int(version["version"][0]), time.monotonic())
+        return self._data_versions[database][0]
+
+    def data_version(self, database: str) -> int:
+        """The graph's current data version, re-read at most every `version_check_interval`."""
+        self._check_data_version(database)
+        return self._data_versions[database][0]
+
+    def _check_data_version(self, database: str):
+        known = self._data_versions.get(database)
+        if known is not None and time.monotonic() - known[1] < self.version_check_interval:
+            return
+        df = self._run(DATA_VERSION_QUERY, None, database, name="data_version")
+        version = int(df["version"][0]) if len(df) else 0
+        if known is not None and known[0] != version:
+            self.invalidate_cache()
+        self._data_versions[database] = (version, time.monotonic())
+
+    def plan_cache_stats(self, database: str):
+        """Hits, misses and hit rate of each of the server's Cypher caches for `database`.
+
+        Counters are cumulative since the server started and are re-read at
+        most every `version_check_interval`. None when the server doesn't
+        expose them.
+        """
+        known = self._plan_cache_stats.get(database)
+        if known is not None and time.monotonic() - known[1] < self.version_check_interval:
+            return known[0]
+        try:
+            df = self._run(PLAN_CACHE_QUERY, None, database, name="plan_cache")
+            stats = _plan_cache_counters(df, database)
+        except ClientError:
+            # No such procedure, or not allowed to call it.
+            stats = None
+        self._plan_cache_stats[database] = (stats, time.monotonic())
+        return stats
+
+    def pool_stats(self) -> dict:
+        """Return session counters for this driver alongside its pool settings."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update(self.pool_config)
+        return stats
+
+    def close(self):
+        """Close the driver and forget this instance so a new one can be created."""
+        with Database._instances_lock:
+            for key, instance in list(Database._instances.items()):
+                if instance is self:
+                    del Database._instances[key]
+        if self._initialized:
+            self.driver.close()
+            with self._async_lock:
+                if self._loop is not None:
+                    asyncio.run_coroutine_threadsafe(self.async_driver.close(), self._loop).result()
+                    self._loop.call_soon_threadsafe(self._loop.stop)
+                    self._loop = None
+            self._initialized = False
+
+    @classmethod
+    def close_all(cls):
+        """Close every shared driver. Registered to run at interpreter exit."""
+        with cls._instances_lock:
+            instances = list(cls._instances.values())
+        for instance in instances:
+            instance.close()
+
+    def _increment(self, counter: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[counter] += amount
+
+    def _track_session_start(self):
+        with self._stats_lock:
+            self._stats["sessions_opened"] += 1
+            self._stats["queries_run"] += 1
+            self._stats["sessions_active"] += 1
+            self._stats["sessions_peak"] = max(
+                self._stats["sessions_peak"], self._stats["sessions_active"]
+            )
+
+    def _track_session_end(self):
+        self._increment("sessions_active", -1)
+
+
+atexit.register(Database.close_all)
+
+
+def records_to_batch(keys: list, records: list, arrow: bool = False):
+    """Build a DataFrame (or Arrow record batch) column-wise from driver records."""
+    columns = list(zip(*records)) if records else [()] * len(keys)
+    if arrow:
+        import pyarrow as pa
+
+        return pa.RecordBatch.from_arrays(
+            [pa.array(column) for column in columns], names=list(keys)
+        )
+    return pd.DataFrame({key: list(column) for key, column in zip(keys, columns)}, columns=keys)
+
+
+def _plan_cache_counters(df: pd.DataFrame, database: str):
+    """PLAN_CACHE_QUERY rows as one row per cache of `database`, or None without any.
+
+    Metric names look like `neo4j.<database>.cypher.cache.<cache>.hits`; the
+    counter value is the JMX `Count` attribute.
+    """
+    prefix = f".{database}.cypher.cache."
+    counters = {}
+    for name, attributes in zip(df.get("name", []), df.get("attributes", [])):
+        metric = name.split("name=", 1)[-1]
+        if prefix not in metric:
+            continue
+        cache, _, counter = metric.split(prefix, 1)[1].rpartition(".")
+        if counter in ("hits", "misses"):
+            value = (attributes.get("Count") or attributes.get("Value") or {}).get("value")
+            counters.setdefault(cache, {})[counter] = int(value or 0)
+    if not counters:
+        return None
+    rows = []
+    for cache, counts in sorted(counters.items()):
+        hits, misses = counts.get("hits", 0), counts.get("misses", 0)
+        rows.append((cache, hits, misses, hits / (hits + misses) if hits + misses else 0.0))
+    return pd.DataFrame(rows, columns=PLAN_CACHE_COLUMNS)
+
+
+def concat_batches(batches, arrow: bool = False):
+    """Collect the batches yielded by `stream_query` into one table."""
+    batches = list(batches)
+    if arrow:
+        import pyarrow as pa
+
+        return pa.Table.from_batches(batches) if batches else pa.table({})
+    return pd.concat(batches, ignore_index=True) if batches else pd.DataFrame()
+
+
+def get_database(secrets):
+    """Return the backend configured in Streamlit secrets.
+
+    With `LOCAL_DATA_DIR` set, pages run against the in-process sparse-matrix
+    backend (`component.local.LocalDatabase`) loaded from the preprocessed
+    CSVs in that directory; otherwise they use the shared Neo4j driver.
+
+    Optional instrumentation settings: `METRICS_JSON_LOGS` writes one JSON
+    line per query to stderr, `METRICS_PORT` serves Prometheus metrics on
+    that port, and `PROFILE_QUERIES` records db hits for page queries.
+    """
+    if secrets.get("METRICS_JSON_LOGS"):
+        enable_json_logs()
+    if secrets.get("METRICS_PORT"):
+        serve_prometheus(int(secrets["METRICS_PORT"]))
+    if "LOCAL_DATA_DIR" in secrets:
+        from .local import LocalDatabase
+
+        return LocalDatabase.from_csv_dir(secrets["LOCAL_DATA_DIR"])
+    db = Database(
+        uri=secrets["NEO4J_URI"],
+        username=secrets["NEO4J_USERNAME"],
+        password=secrets["NEO4J_PASSWORD"],
+    )
+    db.profile = bool(secrets.get("PROFILE_QUERIES", False))
+    return db
@@ -0,0 +1,156 @@
+"""Prefix-sum engagement index for the post-5-star impact analysis.
+
+For every recipe, comments are sorted by `created_at` (ties by load order)
+and cumulative `reply_count` / `thumbs_up` sums are kept alongside the
+timestamps. The engagement of all comments posted after any moment is then
+a binary search plus one subtraction, instead of a scan over the recipe's
+comments:
+
+    after(t) = total - cumulative[position of last comment at or before t]
+
+The pivot of a recipe is its first 5-star comment by one of the top-N users
+by reputation. `lift` ranks every recipe at once by how much more engagement
+comments receive after the pivot than before it.
+
+The same structure is materialized in Neo4j by the `engagement_index` stage
+(`cypher/materialize/build_engagement_index.cypher`).
+"""
+
+import numpy as np
+import pandas as pd
+
+# Users counted as "high reputation" for the pivot comment.
+INFLUENCER_TOP_N = 100
+
+IMPACT_COLUMNS = [
+    "user",
+    "user_reputation",
+    "comment",
+    "created_at",
+    "total_reply_count",
+    "total_thumbs_up",
+]
+LIFT_COLUMNS = [
+    "recipe",
+    "user",
+    "created_at",
+    "comments_before",
+    "comments_after",
+    "total_reply_count",
+    "total_thumbs_up",
+    "engagement_before",
+    "engagement_after",
+    "lift",
+]
+
+
+class EngagementIndex():
+    """Per-recipe sorted timestamps, cumulative engagement and pivot comment.
+
+    All arrays are flattened into one CSR-style layout: the comments of
+    recipe r occupy `offsets[r]:offsets[r + 1]`, sorted by time.
+    """
+
+    def __init__(
+        self,
+        comment_recipe: np.ndarray,
+        comment_created: np.ndarray,
+        comment_reply_count: np.ndarray,
+        comment_thumbs_up: np.ndarray,
+        pivot_candidate: np.ndarray,
+        recipe_count: int,
+    ):
+        order = np.lexsort((comment_created, comment_recipe))
+        sorted_recipe = comment_recipe[order]
+        self.comments = order
+        self.created = comment_created[order]
+        self.cumulative_reply_count = np.cumsum(comment_reply_count[order])
+        self.cumulative_thumbs_up = np.cumsum(comment_thumbs_up[order])
+        self.offsets = np.searchsorted(sorted_recipe, np.arange(recipe_count + 1))
+        # Exclusive end of each run of comments sharing a recipe and timestamp,
+        # so "posted after comment i" starts at the end of i's run.
+        boundary = (sorted_recipe[1:] != sorted_recipe[:-1]) | (self.created[1:] != self.created[:-1])
+        self.run_ends = np.append(np.flatnonzero(boundary) + 1, len(order))
+
+        # Pivot: the first candidate comment of each recipe, as a sorted position.
+        candidates = np.flatnonzero(pivot_candidate[order])
+        recipes = sorted_recipe[candidates]
+        first = np.unique(recipes, return_index=True)[1]
+        self.pivot = np.full(recipe_count, -1, dtype=np.int64)
+        self.pivot[recipes[first]] = candidates[first]
+
+    @classmethod
+    def from_local(cls, db, top_n: int = INFLUENCER_TOP_N) -> "EngagementIndex":
+        """Build the index over a `LocalDatabase`'s columnar comment arrays."""
+        top = db.users_by_reputation[:top_n]
+        return cls(
+            db.comment_recipe,
+            db.comment_created,
+            db.comment_reply_count,
+            db.comment_thumbs_up,
+            np.isin(db.comment_user, top) & (db.comment_stars == 5),
+            len(db.recipe_names),
+        )
+
+    def _sum(self, cumulative: np.ndarray, start: int, end: int) -> int:
+        """Sum of the underlying values at sorted positions [start, end)."""
+        if end <= start:
+            return 0
+        return int(cumulative[end - 1] - (cumulative[start - 1] if start else 0))
+
+    def after(self, recipe: int, timestamp: int) -> tuple:
+        """(comment count, reply total, thumbs-up total) of comments posted after `timestamp`."""
+        start, end = self.offsets[recipe], self.offsets[recipe + 1]
+        split = start + np.searchsorted(self.created[start:end], timestamp, side="right")
+        return (
+            int(end - split),
+            self._sum(self.cumulative_reply_count, split, end),
+            self._sum(self.cumulative_thumbs_up, split, end),
+        )
+
+    def pivot_comment(self, recipe: int):
+        """Index of the recipe's pivot comment in the source arrays, or None."""
+        position = self.pivot[recipe]
+        return None if position < 0 else int(self.comments[position])
+
+    def lift(self) -> pd.DataFrame:
+        """Impact metrics for every recipe with a pivot, vectorized over recipes.
+
+        Returns one row per recipe with `recipe` and `pivot` as indexes into
+        the source arrays. Engagement is reply_count + thumbs_up per comment;
+        the pivot and comments sharing its timestamp count as "before".
+        `lift` is engagement_after / engagement_before.
+        """
+        recipes = np.flatnonzero(self.pivot >= 0)
+        pivots = self.pivot[recipes]
+        start, end = self.offsets[recipes], self.offsets[recipes + 1]
+        split = self.run_ends[np.searchsorted(self.run_ends, pivots, side="right")]
+
+        def between(cumulative, lo, hi):
+            at = lambda positions: np.where(positions > 0, cumulative[np.maximum(positions - 1, 0)], 0)
+            return at(hi) - at(lo)
+
+        comments_before = split - start
+        comments_after = end - split
+        engagement_before = (
+            between(self.cumulative_reply_count, start, split)
+            + between(self.cumulative_thumbs_up, start, split)
+        ) / comments_before
+        replies = between(self.cumulative_reply_count, split, end)
+        thumbs = between(self.cumulative_thumbs_up, split, end)
+        engagement_after = (replies + thumbs) / np.maximum(comments_after, 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            lift = np.where(engagement_before > 0, engagement_after / engagement_before, np.nan)
+        return pd.DataFrame(
+            {
+                "recipe": recipes,
+                "pivot": self.comments[pivots],
+                "comments_before": comments_before,
+                "comments_after": comments_after,
+                "total_reply_count": replies,
+                "total_thumbs_up": thumbs,
+                "engagement_before": engagement_before,
+                "engagement_after": engagement_after,
+                "lift": lift,
+            }
+        )
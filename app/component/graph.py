@@ -0,0 +1,149 @@
+"""Level-of-detail payloads for the neighborhood graphs on the pages.
+
+The Influential Commenter and Recipe Similarity graphs are stars: one
+center node linked to every reached user or shared commenter. For popular
+centers that is thousands of nodes, which is slow to build node by node and
+slow for the browser to lay out with physics. `star_payload` instead:
+
+- builds node and edge tables column-wise from the query result,
+- keeps the `max_nodes` heaviest neighbors visible,
+- collapses the rest into at most `MAX_CLUSTERS` cluster nodes by weight,
+- optionally computes a static layout (a sunflower spiral, heavier
+  neighbors nearest the center), so the client renders with physics off.
+
+`render` turns the tables into `streamlit_agraph` nodes and edges.
+"""
+
+import numpy as np
+import pandas as pd
+from streamlit_agraph import Config, Edge, Node, agraph
+
+MAX_VISIBLE_NODES = 100
+MAX_CLUSTERS = 8
+
+CENTER_SIZE = 25
+NODE_SIZE = 5
+# Spacing of the spiral layout, in vis.js canvas units.
+LAYOUT_SPACING = 18
+_GOLDEN_ANGLE = np.pi * (3 - np.sqrt(5))
+
+
+def _cluster_label(weights: np.ndarray, weight_label: str) -> str:
+    low, high = weights.min(), weights.max()
+    span = f"{low}" if low == high else f"{low}-{high}"
+    return f"{span} {weight_label}"
+
+
+def _clusters(center: str, tail: pd.DataFrame, noun: str, weight_label: str) -> pd.DataFrame:
+    """One node per band of tail weights, sized by the number of neighbors it stands for."""
+    if tail.empty:
+        return pd.DataFrame(columns=["id", "label", "title", "size", "weight"])
+    if weight_label is None:
+        bands = [tail["weight"].to_numpy()]
+    else:
+        distinct = np.sort(tail["weight"].unique())[::-1]
+        bands = np.array_split(distinct, min(len(distinct), MAX_CLUSTERS))
+    rows = []
+    for band in bands:
+        members = tail[tail["weight"].isin(band)]
+        count = len(members)
+        detail = "" if weight_label is None else f" ({_cluster_label(band, weight_label)})"
+        rows.append(
+            {
+                "id": f"{center} / cluster {len(rows)}",
+                "label": f"+{count:,} {noun}",
+                "title": f"{count:,} more {noun}{detail}",
+                "size": NODE_SIZE + 5 * np.log10(count + 1),
+                "weight": int(band.min()),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def spiral_layout(count: int, start_radius: float = 3 * LAYOUT_SPACING) -> tuple:
+    """x and y arrays placing `count` nodes on a sunflower spiral around the origin."""
+    i = np.arange(count)
+    radius = start_radius + LAYOUT_SPACING * np.sqrt(i)
+    angle = i * _GOLDEN_ANGLE
+    return radius * np.cos(angle), radius * np.sin(angle)
+
+
+def star_payload(
+    center: str,
+    neighbors: pd.Series,
+    weights: pd.Series = None,
+    max_nodes: int = MAX_VISIBLE_NODES,
+    noun: str = "users",
+    weight_label: str = None,
+    static_layout: bool = True,
+) -> tuple:
+    """Node and edge tables for a star graph around `center`.
+
+    `weights` ranks neighbors (heaviest shown first) and labels clusters with
+    `weight_label`, e.g. "shared recipes"; without weights, neighbors keep
+    their order and the tail becomes a single cluster. Returns (nodes, edges)
+    DataFrames; nodes have id, label, title and size (plus x and y when
+    `static_layout` is set), edges have source, target and weight.
+    """
+    neighbors = pd.DataFrame(
+        {
+            "id": neighbors.to_numpy(),
+            "weight": np.ones(len(neighbors), dtype=np.int64) if weights is None else weights.to_numpy(),
+        }
+    ).drop_duplicates("id")
+    # The center can't also be one of its own neighbors.
+    neighbors = neighbors[neighbors["id"] != center]
+    if weights is not None:
+        neighbors = neighbors.sort_values("weight", ascending=False, kind="stable")
+    visible, tail = neighbors.iloc[:max_nodes], neighbors.iloc[max_nodes:]
+
+    leaves = pd.DataFrame(
+        {
+            "id": visible["id"],
+            "label": visible["id"].astype(str),
+            "title": visible["id"].astype(str),
+            "size": NODE_SIZE,
+            "weight": visible["weight"],
+        }
+    )
+    leaves = pd.concat([leaves, _clusters(center, tail, noun, weight_label)], ignore_index=True)
+
+    if static_layout:
+        x, y = spiral_layout(len(leaves))
+        leaves["x"], leaves["y"] = x, y
+
+    nodes = pd.concat(
+        [
+            pd.DataFrame(
+                {"id": [center], "label": [str(center)], "title": [str(center)], "size": [CENTER_SIZE]}
+            ).assign(**({"x": [0.0], "y": [0.0]} if static_layout else {})),
+            leaves.drop(columns="weight"),
+        ],
+        ignore_index=True,
+    )
+    edges = pd.DataFrame(
+        {"source": center, "target": leaves["id"], "weight": leaves["weight"].astype(int)}
+    )
+    return nodes, edges
+
+
+def render(
+    nodes: pd.DataFrame,
+    edges: pd.DataFrame,
+    width: int = 400,
+    height: int = 300,
+    directed: bool = True,
+):
+    """Draw node and edge tables with `streamlit_agraph`.
+
+    Physics is only enabled when the nodes have no precomputed positions.
+    """
+    static = "x" in nodes.columns
+    config = Config(
+        width=width, height=height, directed=directed, physics=not static, hierarchical=False
+    )
+    return agraph(
+        nodes=[Node(**row) for row in nodes.to_dict("records")],
+        edges=[Edge(label="", **row) for row in edges.to_dict("records")],
+        config=config,
+    )
@@ -0,0 +1,459 @@
+"""Parallel, batched loader for the recipe review dataset.
+
+Replaces `cypher/ingest_csv.cypher` for large loads. Comments are streamed
+from the CSV in chunks and each comment row is written together with its
+POSTED and BELONGS_TO relationships in one UNWIND batch, with batches spread
+across a pool of worker threads. Users and recipes are deduplicated in
+memory (later rows win) and written once, before the comments; comments
+whose user or recipe is missing are skipped and counted.
+
+With --incremental, only new or changed rows are written (`ingest_delta`)
+and the precomputed data is refreshed for the users and recipes they touch
+instead of being rebuilt.
+
+Usage (from `app/`):
+
+    python -m component.ingest --raw "../data/Recipe Reviews and User Feedback Dataset.csv"
+    python -m component.ingest --data-dir ../data      # recipe.csv, user.csv, comment.csv
+    python -m component.ingest --data-dir ../data --incremental --changes-out changes.json
+"""
+
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import pandas as pd
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
+
+from . import materialize, schema
+from .cli import add_connection_arguments, connect
+from .database import Database
+
+RECIPE_COLUMNS = ["recipe_code", "recipe_number", "recipe_name"]
+USER_COLUMNS = ["user_id", "user_name", "user_reputation"]
+COMMENT_PROPERTIES = [
+    "created_at",
+    "reply_count",
+    "thumbs_up",
+    "thumbs_down",
+    "stars",
+    "best_score",
+    "text",
+]
+INTEGER_COLUMNS = [
+    "recipe_code",
+    "recipe_number",
+    "user_reputation",
+    "created_at",
+    "reply_count",
+    "thumbs_up",
+    "thumbs_down",
+    "stars",
+    "best_score",
+]
+STRING_IDS = {"comment_id": str, "user_id": str}
+
+RETRYABLE = (TransientError, ServiceUnavailable, SessionExpired)
+
+# created_at is in seconds for some recipes and in milliseconds for others.
+# Values from here up are milliseconds (in seconds, thousands of years away).
+MILLISECONDS_FROM = 100_000_000_000
+MS_PER_DAY = 86_400_000
+WATERMARK = "comments"
+# Comments this far before the watermark are compared again, so replies and
+# thumbs up added after a comment was first loaded are picked up.
+LOOKBACK_DAYS = 3
+
+
+def read_chunks(path, chunksize: int):
+    """Stream a CSV as typed DataFrame chunks (integer columns as nullable Int64)."""
+    for chunk in pd.read_csv(path, chunksize=chunksize, dtype=STRING_IDS):
+        for column in INTEGER_COLUMNS:
+            if column in chunk:
+                chunk[column] = pd.to_numeric(chunk[column], errors="coerce").astype("Int64")
+        yield chunk
+
+
+def to_records(df: pd.DataFrame) -> list:
+    """DataFrame rows as dicts of plain Python values, with NaN/NA as None."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def to_milliseconds(created_at: pd.Series) -> pd.Series:
+    created_at = pd.to_numeric(created_at).astype("Int64")
+    return created_at.where(created_at >= MILLISECONDS_FROM, created_at * 1000)
+
+
+def comment_rows(df: pd.DataFrame) -> list:
+    df = df.dropna(subset=["comment_id", "user_id", "recipe_code"])
+    ids = to_records(df[["comment_id", "user_id", "recipe_code"]])
+    properties = to_records(df[COMMENT_PROPERTIES])
+    for row, props in zip(ids, properties):
+        row["properties"] = props
+    return ids
+
+
+class IngestStats():
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.rows = 0
+        self.batches = 0
+        self.retries = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def add(self, rows: int = 0, batches: int = 0, retries: int = 0, skipped: int = 0):
+        with self._lock:
+            self.rows += rows
+            self.batches += batches
+            self.retries += retries
+            self.skipped += skipped
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.rows} rows in {self.batches} batches, {self.elapsed:.1f}s "
+            f"({self.rows_per_second:,.0f} rows/s, {self.retries} retries, "
+            f"{self.skipped} skipped)"
+        )
+
+
+class BatchWriter():
+    """Writes UNWIND batches across a thread pool with bounded in-flight work.
+
+    The driver already retries transient errors inside `execute_write`; batches
+    that still fail (e.g. repeated deadlocks on hot USER/RECIPE nodes) are
+    retried here with exponential backoff before the error is raised.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        database: str,
+        workers: int = 4,
+        retries: int = 5,
+        report_every: float = 5.0,
+    ):
+        self.db = db
+        self.database = database
+        self.retries = retries
+        self.report_every = report_every
+        self.stats = IngestStats()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._max_in_flight = workers * 2
+        self._in_flight = set()
+        self._last_report = time.perf_counter()
+
+    def submit(self, cypher_filename: str, rows: list):
+        if not rows:
+            return
+        while len(self._in_flight) >= self._max_in_flight:
+            self._collect(FIRST_COMPLETED)
+        self._in_flight.add(self._executor.submit(self._write, cypher_filename, rows))
+
+    def flush(self):
+        """Wait for every submitted batch, e.g. so nodes exist before their comments are written."""
+        self._collect(None)
+
+    def close(self) -> IngestStats:
+        try:
+            self._collect(None)
+        finally:
+            self._executor.shutdown()
+        print(self.stats)
+        return self.stats
+
+    def _write(self, cypher_filename: str, rows: list):
+        for attempt in range(self.retries + 1):
+            try:
+                records = self.db.write(cypher_filename, self.database, rows=rows)
+                break
+            except RETRYABLE:
+                if attempt == self.retries:
+                    raise
+                self.stats.add(retries=1)
+                time.sleep(0.1 * 2 ** attempt)
+        # Queries that can skip rows return how many they wrote.
+        written = records[0]["written"] if records and "written" in records[0] else len(rows)
+        self.stats.add(rows=written, batches=1, skipped=len(rows) - written)
+
+    def _collect(self, return_when):
+        done, self._in_flight = wait(
+            self._in_flight, return_when=return_when or ALL_COMPLETED
+        )
+        for future in done:
+            future.result()
+        if time.perf_counter() - self._last_report >= self.report_every:
+            self._last_report = time.perf_counter()
+            print(self.stats)
+
+
+def _batched(rows: list, batch_size: int):
+    for start in range(0, len(rows), batch_size):
+        yield rows[start:start + batch_size]
+
+
+def _write_nodes(writer: BatchWriter, recipes: pd.DataFrame, users: pd.DataFrame, batch_size: int):
+    for batch in _batched(to_records(recipes), batch_size):
+        writer.submit("ingest/merge_recipes.cypher", batch)
+    for batch in _batched(to_records(users), batch_size):
+        writer.submit("ingest/merge_users.cypher", batch)
+
+
+def ingest_raw(
+    db: Database, database: str, path, batch_size: int = 5000, workers: int = 4
+) -> IngestStats:
+    """Load the raw UCI file (one row per comment, user and recipe columns included).
+
+    The file is read twice: once for the users and recipes, which are written
+    first, then for the comments.
+    """
+    schema.apply(db, database)
+    writer = BatchWriter(db, database, workers=workers)
+    recipes, users = [], []
+    try:
+        for chunk in read_chunks(path, batch_size * 10):
+            recipes.append(chunk[RECIPE_COLUMNS].drop_duplicates("recipe_code", keep="last"))
+            users.append(chunk[USER_COLUMNS].drop_duplicates("user_id", keep="last"))
+        recipes = pd.concat(recipes).dropna(subset=["recipe_code"])
+        users = pd.concat(users).dropna(subset=["user_id"])
+        _write_nodes(
+            writer,
+            recipes.drop_duplicates("recipe_code", keep="last"),
+            users.drop_duplicates("user_id", keep="last"),
+            batch_size,
+        )
+        writer.flush()
+        for chunk in read_chunks(path, batch_size):
+            writer.submit("ingest/merge_comments.cypher", comment_rows(chunk))
+    finally:
+        stats = writer.close()
+    return stats
+
+
+def ingest_csv_dir(
+    db: Database, database: str, data_dir, batch_size: int = 5000, workers: int = 4
+) -> IngestStats:
+    """Load `recipe.csv`, `user.csv` and `comment.csv` as split by preprocess_data.ipynb."""
+    data_dir = Path(data_dir)
+    schema.apply(db, database)
+    writer = BatchWriter(db, database, workers=workers)
+    try:
+        recipes = pd.concat(read_chunks(data_dir / "recipe.csv", batch_size * 10))
+        users = pd.concat(read_chunks(data_dir / "user.csv", batch_size * 10))
+        _write_nodes(
+            writer,
+            recipes.dropna(subset=["recipe_code"]).drop_duplicates("recipe_code", keep="last"),
+            users.dropna(subset=["user_id"]).drop_duplicates("user_id", keep="last"),
+            batch_size,
+        )
+        writer.flush()
+        for chunk in read_chunks(data_dir / "comment.csv", batch_size):
+            writer.submit("ingest/merge_comments.cypher", comment_rows(chunk))
+    finally:
+        stats = writer.close()
+    return stats
+
+
+def changed_rows(incoming: pd.DataFrame, existing: pd.DataFrame, key: str, columns: list) -> pd.DataFrame:
+    """Rows of `incoming` whose `key` isn't in `existing` or whose `columns` differ from it."""
+    if existing.empty:
+        return incoming
+    existing = existing.astype({column: incoming[column].dtype for column in [key, *columns]})
+    merged = incoming[[key, *columns]].merge(
+        existing, on=key, how="left", suffixes=("", "_existing"), indicator=True
+    )
+    changed = merged["_merge"] == "left_only"
+    for column in columns:
+        new, old = merged[column], merged[f"{column}_existing"]
+        same = (new == old).fillna(False).astype(bool) | (new.isna() & old.isna())
+        changed |= ~same
+    return incoming[changed.to_numpy()]
+
+
+def renamed_recipes(incoming: pd.DataFrame, existing: pd.DataFrame) -> list:
+    """recipe_code of the `incoming` recipes that are in `existing` under another name."""
+    if existing.empty:
+        return []
+    existing = existing.astype({"recipe_code": incoming["recipe_code"].dtype})
+    merged = incoming.merge(existing, on="recipe_code", suffixes=("", "_existing"))
+    return merged.loc[merged["recipe_name"] != merged["recipe_name_existing"], "recipe_code"].tolist()
+
+
+def _lookup(db: Database, database: str, cypher_filename: str, key: str, values, batch_size: int) -> pd.DataFrame:
+    values = [value.item() if hasattr(value, "item") else value for value in values]
+    frames = [db.execute(cypher_filename, database, **{key: batch}) for batch in _batched(values, batch_size)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def read_watermark(db: Database, database: str):
+    """(created_at in ms, comment_id) of the latest ingested comment, or None for an empty graph."""
+    df = db.execute("ingest/get_watermark.cypher", database, name=WATERMARK)
+    if len(df) and df["created_at_ms"][0] is not None:
+        return int(df["created_at_ms"][0]), df["comment_id"][0]
+    # Loaded by a full ingest: start from the latest comment in the graph.
+    df = db.execute("ingest/get_latest_comment.cypher", database)
+    if df.empty:
+        return None
+    df["created_at_ms"] = to_milliseconds(df["created_at"])
+    latest = df.sort_values(["created_at_ms", "comment_id"]).iloc[-1]
+    return int(latest["created_at_ms"]), latest["comment_id"]
+
+
+def ingest_delta(
+    db: Database,
+    database: str,
+    data_dir,
+    lookback_days: float = LOOKBACK_DAYS,
+    batch_size: int = 5000,
+    workers: int = 4,
+) -> dict:
+    """Load only the new or changed rows of `recipe.csv`, `user.csv` and `comment.csv`.
+
+    The files can be a full export or just the latest rows. Comments from the
+    watermark (the latest ingested created_at, then comment_id) minus
+    `lookback_days` on are compared with the graph; older comments are
+    assumed unchanged and skipped. Users and recipes are looked up by ID and
+    written when new or changed. The watermark is advanced once everything
+    is written.
+
+    Returns the change set for `materialize.refresh`: {"user_ids": [...]
+    (including everyone who commented on a renamed recipe),
+    "recipe_codes": [...], "comments": number of comments written,
+    "skipped_comments": number skipped because their user or recipe is missing}.
+    """
+    data_dir = Path(data_dir)
+    schema.apply(db, database)
+    watermark = read_watermark(db, database)
+    since = None if watermark is None else watermark[0] - int(lookback_days * MS_PER_DAY)
+
+    # Step 1: incoming comments inside the window (all of them for an empty graph).
+    comments = []
+    for chunk in read_chunks(data_dir / "comment.csv", batch_size * 10):
+        chunk = chunk.dropna(subset=["comment_id", "user_id", "recipe_code"])
+        chunk = chunk.assign(created_at_ms=to_milliseconds(chunk["created_at"]))
+        if since is not None:
+            # Comments without created_at can't be placed against the watermark.
+            chunk = chunk[(chunk["created_at_ms"] >= since).fillna(False).to_numpy()]
+        comments.append(chunk)
+    comments = pd.concat(comments).drop_duplicates("comment_id", keep="last")
+    latest = comments.dropna(subset=["created_at_ms"]).sort_values(["created_at_ms", "comment_id"]).tail(1)
+
+    # Step 2: keep the new or changed rows.
+    if since is not None:
+        existing = db.execute(
+            "ingest/get_comments_since.cypher", database, since_ms=since, since_s=since // 1000
+        )
+        comments = changed_rows(comments, existing, "comment_id", COMMENT_PROPERTIES)
+    recipes = pd.concat(read_chunks(data_dir / "recipe.csv", batch_size * 10))
+    recipes = recipes.dropna(subset=["recipe_code"]).drop_duplicates("recipe_code", keep="last")
+    existing = _lookup(
+        db, database, "ingest/get_recipes_by_code.cypher", "recipe_codes", recipes["recipe_code"], batch_size
+    )
+    renamed = renamed_recipes(recipes[RECIPE_COLUMNS], existing)
+    recipes = changed_rows(recipes[RECIPE_COLUMNS], existing, "recipe_code", RECIPE_COLUMNS[1:])
+    # USER.recipe_sequence stores recipe names, so everyone who commented on a
+    # renamed recipe has a changed sequence.
+    commenters = _lookup(
+        db, database, "ingest/get_commenters_of_recipes.cypher", "recipe_codes", renamed, batch_size
+    )
+    users = pd.concat(read_chunks(data_dir / "user.csv", batch_size * 10))
+    users = users.dropna(subset=["user_id"]).drop_duplicates("user_id", keep="last")
+    existing = _lookup(db, database, "ingest/get_users_by_id.cypher", "user_ids", users["user_id"], batch_size)
+    users = changed_rows(users[USER_COLUMNS], existing, "user_id", USER_COLUMNS[1:])
+
+    # Step 3: write them, then advance the watermark.
+    writer = BatchWriter(db, database, workers=workers)
+    try:
+        _write_nodes(writer, recipes, users, batch_size)
+        writer.flush()
+        for batch in _batched(comment_rows(comments), batch_size):
+            writer.submit("ingest/merge_comments.cypher", batch)
+    finally:
+        stats = writer.close()
+    if len(latest):
+        candidate = (int(latest["created_at_ms"].iloc[0]), latest["comment_id"].iloc[0])
+        created_at_ms, comment_id = max(candidate, watermark) if watermark else candidate
+        db.execute(
+            "ingest/set_watermark.cypher",
+            database,
+            name=WATERMARK,
+            created_at_ms=created_at_ms,
+            comment_id=comment_id,
+        )
+
+    return {
+        "user_ids": sorted(
+            set(users["user_id"]) | set(comments["user_id"]) | set(commenters.get("user_id", []))
+        ),
+        "recipe_codes": sorted(int(code) for code in set(recipes["recipe_code"]) | set(comments["recipe_code"])),
+        "comments": len(comments) - stats.skipped,
+        "skipped_comments": stats.skipped,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_connection_arguments(parser)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--raw", help="raw UCI dataset CSV")
+    source.add_argument("--data-dir", help="folder with recipe.csv, user.csv and comment.csv")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--skip-materialize",
+        action="store_true",
+        help="don't rebuild the precomputed relationships after loading",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only load rows that are new or changed since the last ingest (needs --data-dir)",
+    )
+    parser.add_argument("--lookback-days", type=float, default=LOOKBACK_DAYS)
+    parser.add_argument("--changes-out", help="--incremental: write the change set to this JSON file")
+    args = parser.parse_args()
+    if args.incremental and not args.data_dir:
+        parser.error("--incremental needs --data-dir")
+
+    db = connect(args)
+    if args.incremental:
+        changes = ingest_delta(
+            db, args.database, args.data_dir, args.lookback_days, args.batch_size, args.workers
+        )
+        print(
+            f"{changes['comments']} comments, {len(changes['user_ids'])} users "
+            f"and {len(changes['recipe_codes'])} recipes changed "
+            f"({changes['skipped_comments']} comments skipped: user or recipe missing)"
+        )
+        if args.changes_out:
+            Path(args.changes_out).write_text(json.dumps(changes, indent=2) + "\n")
+        if not changes["user_ids"] and not changes["recipe_codes"]:
+            return
+        if args.skip_materialize:
+            db.bump_data_version(args.database)
+        else:
+            materialize.refresh(db, args.database, changes)
+        return
+    if args.raw:
+        ingest_raw(db, args.database, args.raw, args.batch_size, args.workers)
+    else:
+        ingest_csv_dir(db, args.database, args.data_dir, args.batch_size, args.workers)
+    if args.skip_materialize:
+        db.bump_data_version(args.database)
+    else:
+        materialize.build(db, args.database)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,521 @@
+"""In-process analytics backend built on sparse user x recipe matrices.
+
+`LocalDatabase` answers the page queries from the CSV files produced by
+`jupyter_nb/preprocess_data.ipynb` without a Neo4j server. It exposes the
+same `run_query(cypher_filename, database, **params)` interface as
+`component.database.Database` and returns DataFrames with the same columns,
+so pages and batch jobs can switch backends without other changes.
+
+All graph traversals are expressed as sparse matrix products over the
+binary incidence matrix A (users x recipes):
+
+- users sharing recipes with user u: row u of A @ A.T
+- recipes sharing commenters with recipe r: row r of A.T @ A
+
+Tribes are Louvain communities of A @ A.T (`component.communities`),
+computed on first use.
+
+Every top-level query in `app/cypher/` (the read queries run by the pages,
+the API and the CLIs) must have a handler; construction fails with
+`UnsupportedQueryError` otherwise. Queries under `ingest/` and
+`materialize/` write to the graph and need Neo4j.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .cache import ResultCache
+from .communities import co_comment_graph, louvain
+from .database import records_to_batch
+from .engagement import IMPACT_COLUMNS, LIFT_COLUMNS, EngagementIndex
+from .metrics import metrics, result_bytes
+from .queries import UnsupportedQueryError, get_registry
+from .search import SEARCH_LIMIT, NameIndex, fulltext_terms
+from .sketches import RecipeSketches, hash_users
+
+
+class LocalDatabase():
+    """Sparse-matrix stand-in for `Database`, one instance per data directory."""
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def from_csv_dir(cls, data_dir: str) -> "LocalDatabase":
+        """Load `recipe.csv`, `user.csv` and `comment.csv` from `data_dir` once per process."""
+        key = str(Path(data_dir).resolve())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                data_dir = Path(data_dir)
+                cls._instances[key] = cls(
+                    recipes=pd.read_csv(data_dir / "recipe.csv"),
+                    users=pd.read_csv(data_dir / "user.csv"),
+                    comments=pd.read_csv(data_dir / "comment.csv"),
+                )
+        return cls._instances[key]
+
+    def __init__(self, recipes: pd.DataFrame, users: pd.DataFrame, comments: pd.DataFrame):
+        # Later rows win, matching the MERGE ... SET behaviour of ingest_csv.cypher.
+        recipes = recipes.drop_duplicates("recipe_code", keep="last").reset_index(drop=True)
+        users = users.drop_duplicates("user_id", keep="last").reset_index(drop=True)
+        comments = comments.drop_duplicates("comment_id", keep="last")
+
+        recipe_index = pd.Index(recipes["recipe_code"])
+        user_index = pd.Index(users["user_id"].astype(str))
+        recipe_idx = recipe_index.get_indexer(comments["recipe_code"])
+        user_idx = user_index.get_indexer(comments["user_id"].astype(str))
+        # Comments whose user or recipe is missing have no relationships in the graph.
+        keep = (recipe_idx >= 0) & (user_idx >= 0)
+        comments = comments[keep].reset_index(drop=True)
+
+        self.recipe_codes = recipes["recipe_code"].to_numpy()
+        self.user_ids = user_index.to_numpy()
+        self.recipe_names = recipes["recipe_name"].to_numpy(dtype=object)
+        self.user_names = users["user_name"].to_numpy(dtype=object)
+        self.user_reputation = users["user_reputation"].fillna(0).to_numpy(dtype=np.int64)
+
+        # Columnar comment storage.
+        self.comment_user = user_idx[keep]
+        self.comment_recipe = recipe_idx[keep]
+        self.comment_created = comments["created_at"].fillna(0).to_numpy(dtype=np.int64)
+        self.comment_reply_count = comments["reply_count"].fillna(0).to_numpy(dtype=np.int64)
+        self.comment_thumbs_up = comments["thumbs_up"].fillna(0).to_numpy(dtype=np.int64)
+        self.comment_stars = comments["stars"].fillna(0).to_numpy(dtype=np.int64)
+        self.comment_text = comments["text"].to_numpy(dtype=object)
+
+        # Binary incidence matrix: A[u, r] = 1 if user u commented on recipe r.
+        incidence = sparse.coo_matrix(
+            (np.ones(len(self.comment_user), dtype=np.int32), (self.comment_user, self.comment_recipe)),
+            shape=(len(self.user_names), len(self.recipe_names)),
+        ).tocsr()
+        incidence.data[:] = 1
+        self.user_recipe = incidence
+        self.recipe_user = incidence.T.tocsr()
+
+        # Users ordered by reputation, ties by user_id (as reputation_rank in the graph).
+        self.users_by_reputation = np.lexsort((user_index.to_numpy(dtype=str), -self.user_reputation))
+
+        self._user_lookup = pd.Series(np.arange(len(self.user_names))).groupby(self.user_names).agg(list).to_dict()
+        self._recipe_lookup = pd.Series(np.arange(len(self.recipe_names))).groupby(self.recipe_names).agg(list).to_dict()
+
+        self.engagement = EngagementIndex.from_local(self)
+        self.recipe_search = NameIndex(self.recipe_names)
+        self.user_search = NameIndex(self.user_names, order=self.users_by_reputation)
+
+        self.queries = get_registry()
+        self.cache = ResultCache()
+        self._handlers = {
+            "get_all_recipes.cypher": self.all_recipes,
+            "get_users_sort_by_rep.cypher": self.users_sort_by_rep,
+            "get_high_rep_user_comment_reach.cypher": self.high_rep_user_comment_reach,
+            "get_reached_user.cypher": self.reached_user,
+            "get_similar_recipes.cypher": self.similar_recipes,
+            "get_comments.cypher": self.comments,
+            "get_user_commenting_paths.cypher": self.user_commenting_paths,
+            "get_new_user_commenting_journey.cypher": self.new_user_commenting_journey,
+            "get_recipe_sequences.cypher": self.recipe_sequences,
+            "get_all_recipe_sequences.cypher": self.all_recipe_sequences,
+            "get_reply_count_thumbs_up.cypher": self.reply_count_thumbs_up,
+            "get_influencer_lift.cypher": self.influencer_lift,
+            "search_recipes.cypher": self.search_recipes,
+            "search_users.cypher": self.search_users,
+            "get_tribes.cypher": self.tribes,
+            "get_bridge_users.cypher": self.bridge_users,
+            "get_recipe_sketches.cypher": self.recipe_sketches,
+            "get_high_rep_user_recipes.cypher": self.high_rep_user_recipes,
+        }
+        missing = sorted(
+            query.name for query in self.queries if "/" not in query.name and query.name not in self._handlers
+        )
+        if missing:
+            raise UnsupportedQueryError(f"No local implementation of {', '.join(missing)}")
+        self._communities = None
+        self._communities_lock = threading.Lock()
+
+    # --- Database interface --- #
+
+    def generate_query(self, cypher_filename: str):
+        return self.queries.get(cypher_filename).text
+
+    def run_cypher(self, query: str, database: str, parameters: dict = None):
+        raise UnsupportedQueryError("LocalDatabase only runs registered page queries; use run_query")
+
+    def run_query(self, cypher_filename: str, database: str, ttl: float = None, **params):
+        self.queries.get(cypher_filename).bind(params)
+        key = ResultCache.make_key(cypher_filename, params, database)
+        if ttl != 0:
+            df = self.cache.get(key)
+            if df is not None:
+                metrics.record_cache_hit(cypher_filename)
+                return df
+        df = self.execute(cypher_filename, database, **params)
+        self.cache.put(key, df, ttl=ttl)
+        return df
+
+    def execute(self, cypher_filename: str, database: str, **params):
+        self.queries.get(cypher_filename).bind(params)
+        handler = self._handlers.get(cypher_filename)
+        if handler is None:
+            raise UnsupportedQueryError(f"'{cypher_filename}' has no local implementation")
+        start = time.perf_counter()
+        try:
+            df = handler(**params)
+        except Exception as e:
+            metrics.record(cypher_filename, time.perf_counter() - start, error=type(e).__name__, backend="local")
+            raise
+        metrics.record(
+            cypher_filename,
+            time.perf_counter() - start,
+            rows=len(df),
+            bytes=result_bytes(df),
+            backend="local",
+        )
+        return df
+
+    def run_page(
+        self,
+        cypher_filename: str,
+        database: str,
+        page: int = 0,
+        page_size: int = 100,
+        ttl: float = None,
+        **params,
+    ):
+        self.queries.get(cypher_filename).bind_page(params, page, page_size)
+        df = self.run_query(cypher_filename, database, ttl=ttl, **params)
+        return df.iloc[page * page_size:(page + 1) * page_size].reset_index(drop=True)
+
+    def stream_query(
+        self,
+        cypher_filename: str,
+        database: str,
+        fetch_size: int = 1000,
+        arrow: bool = False,
+        **params,
+    ):
+        df = self.execute(cypher_filename, database, **params)
+        keys = list(df.columns)
+        for start in range(0, len(df), fetch_size):
+            records = list(df.iloc[start:start + fetch_size].itertuples(index=False, name=None))
+            yield records_to_batch(keys, records, arrow)
+
+    def submit(self, cypher_filename: str, database: str, ttl: float = None, **params) -> Future:
+        # Handlers are in-process numpy work, so "submitting" runs them right away.
+        return self._completed(self.run_query, cypher_filename, database, ttl=ttl, **params)
+
+    def submit_page(
+        self,
+        cypher_filename: str,
+        database: str,
+        page: int = 0,
+        page_size: int = 100,
+        ttl: float = None,
+        **params,
+    ) -> Future:
+        return self._completed(
+            self.run_page, cypher_filename, database, page=page, page_size=page_size, ttl=ttl, **params
+        )
+
+    def gather(self, *futures) -> list:
+        return [future.result() for future in futures]
+
+    def prefetch(self, cypher_filename: str, database: str, **params):
+        pass
+
+    @staticmethod
+    def _completed(function, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(function(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def invalidate_cache(self, cypher_filename: str = None):
+        self.cache.invalidate(cypher_filename)
+
+    def plan_cache_stats(self, database: str):
+        # Nothing is planned in-process.
+        return None
+
+    def data_version(self, database: str) -> int:
+        # The CSVs are loaded once, so the data never changes.
+        return 0
+
+    def close(self):
+        pass
+
+    # --- Helpers --- #
+
+    def _users_named(self, user_name: str) -> list:
+        return self._user_lookup.get(user_name, [])
+
+    def _recipes_named(self, recipe_name: str) -> list:
+        return self._recipe_lookup.get(recipe_name, [])
+
+    def _co_commenters(self, user_idx) -> sparse.csr_matrix:
+        """Shared recipe counts between each user in `user_idx` and every user."""
+        user_idx = np.asarray(user_idx)
+        co = (self.user_recipe[user_idx] @ self.user_recipe.T).tocsr()
+        # Drop each user's count against themselves.
+        rows = np.arange(len(user_idx))
+        own = np.asarray(co[rows, user_idx]).ravel()
+        co = co - sparse.csr_matrix((own, (rows, user_idx)), shape=co.shape)
+        co.eliminate_zeros()
+        return co
+
+    def _chronological_paths(self, users: np.ndarray) -> pd.Series:
+        """Distinct recipes per user in order of their first comment, for `users`."""
+        mask = np.isin(self.comment_user, users)
+        df = pd.DataFrame(
+            {
+                "user": self.comment_user[mask],
+                "recipe": self.comment_recipe[mask],
+                "created": self.comment_created[mask],
+            }
+        )
+        df = df.sort_values(["user", "created"], kind="stable")
+        df = df.drop_duplicates(["user", "recipe"], keep="first")
+        names = self.recipe_names[df["recipe"].to_numpy()]
+        return pd.Series(names, index=df["user"].to_numpy()).groupby(level=0).agg(tuple)
+
+    def _community_ids(self) -> np.ndarray:
+        """Community per user, numbered by size (0 is the largest)."""
+        with self._communities_lock:
+            if self._communities is None:
+                self._communities = louvain(co_comment_graph(self.user_recipe))
+        return self._communities
+
+    def _tribe_sample(self, limit: int) -> pd.DataFrame:
+        """Comments of the first 5 users by name of each of the `limit` largest communities.
+
+        One row per comment (recipe -1 for users without comments), like the
+        OPTIONAL MATCH in get_tribes.cypher and get_bridge_users.cypher.
+        """
+        communities = self._community_ids()
+        users = np.flatnonzero(communities < limit)
+        users = users[np.lexsort((self.user_names[users].astype(str), communities[users]))]
+        # Position of each user within its community, to keep the first 5.
+        starts = np.r_[True, communities[users][1:] != communities[users][:-1]]
+        group_start = np.maximum.accumulate(np.where(starts, np.arange(len(users)), 0))
+        users = users[np.arange(len(users)) - group_start < 5]
+
+        mask = np.isin(self.comment_user, users)
+        commented = pd.DataFrame({"user": self.comment_user[mask], "recipe": self.comment_recipe[mask]})
+        silent = np.setdiff1d(users, commented["user"])
+        df = pd.concat([commented, pd.DataFrame({"user": silent, "recipe": -1})], ignore_index=True)
+        df["communityId"] = communities[df["user"].to_numpy()]
+        return df
+
+    @staticmethod
+    def _count_paths(paths: pd.Series) -> pd.DataFrame:
+        counts = paths.value_counts(sort=True)
+        return pd.DataFrame(
+            {"commenting_path": [list(p) for p in counts.index], "user_count": counts.to_numpy()}
+        )
+
+    # --- Page queries --- #
+
+    def all_recipes(self) -> pd.DataFrame:
+        return pd.DataFrame({"recipe_name": np.sort(self.recipe_names.astype(str))})
+
+    def users_sort_by_rep(self, limit: int) -> pd.DataFrame:
+        order = self.users_by_reputation[:limit]
+        return pd.DataFrame(
+            {"user_name": self.user_names[order], "user_reputation": self.user_reputation[order]}
+        )
+
+    def search_recipes(self, search: str, limit: int = SEARCH_LIMIT) -> pd.DataFrame:
+        matches = self.recipe_search.search(fulltext_terms(search), limit)
+        return pd.DataFrame({"recipe_name": self.recipe_names[matches]})
+
+    def search_users(self, search: str, limit: int = SEARCH_LIMIT) -> pd.DataFrame:
+        matches = self.user_search.search(fulltext_terms(search), limit)
+        return pd.DataFrame(
+            {"user_name": self.user_names[matches], "user_reputation": self.user_reputation[matches]}
+        )
+
+    def high_rep_user_comment_reach(self, n: int) -> pd.DataFrame:
+        top = self.users_by_reputation[:n]
+        co = self._co_commenters(top)
+        reach = np.diff(co.indptr)
+        rows = []
+        for i, u in enumerate(top):
+            if reach[i] == 0:
+                continue
+            reached = co.indices[co.indptr[i]:co.indptr[i + 1]]
+            recipes = self.user_recipe.indices[self.user_recipe.indptr[u]:self.user_recipe.indptr[u + 1]]
+            rows.append(
+                {
+                    "top_users.user_name": self.user_names[u],
+                    "top_users.user_reputation": self.user_reputation[u],
+                    "recipe_name": list(self.recipe_names[recipes]),
+                    "reach": int(reach[i]),
+                    "users_reached": list(self.user_names[reached]),
+                }
+            )
+        return pd.DataFrame(
+            rows,
+            columns=["top_users.user_name", "top_users.user_reputation", "recipe_name", "reach", "users_reached"],
+        )
+
+    def high_rep_user_recipes(self, n: int) -> pd.DataFrame:
+        top = self.users_by_reputation[:n]
+        recipes = [self.user_recipe.indices[self.user_recipe.indptr[u]:self.user_recipe.indptr[u + 1]] for u in top]
+        keep = [i for i, r in enumerate(recipes) if len(r)]
+        return pd.DataFrame(
+            {
+                "user_name": self.user_names[top[keep]],
+                "user_reputation": self.user_reputation[top[keep]],
+                "recipe_name": [list(self.recipe_names[recipes[i]]) for i in keep],
+            }
+        )
+
+    def recipe_sketches(self) -> pd.DataFrame:
+        sketches = RecipeSketches.from_pairs(
+            self.recipe_codes,
+            self.recipe_names,
+            self.comment_recipe,
+            hash_users(self.user_ids[self.comment_user]),
+        )
+        df = sketches.to_frame()
+        # Like the MATCH in get_recipe_sketches.cypher, recipes without comments have no sketch.
+        return df[df["commenter_count"] > 0].reset_index(drop=True)
+
+    def reached_user(self, user: str, recipe_count: int) -> pd.DataFrame:
+        users = self._users_named(user)
+        if not users:
+            return pd.DataFrame(columns=["reached_user", "recipe_count", "reached_user_reputation"])
+        co = self._co_commenters(users).tocoo()
+        keep = co.data >= recipe_count
+        reached, counts = co.col[keep], co.data[keep]
+        order = np.argsort(-counts, kind="stable")
+        return pd.DataFrame(
+            {
+                "reached_user": self.user_names[reached[order]],
+                "recipe_count": counts[order],
+                "reached_user_reputation": self.user_reputation[reached[order]],
+            }
+        )
+
+    def similar_recipes(self, recipe: str, limit: int = 5) -> pd.DataFrame:
+        columns = ["recipe_name", "shared_commenter_count", "shared_commenters"]
+        recipes = self._recipes_named(recipe)
+        if not recipes:
+            return pd.DataFrame(columns=columns)
+        commenters = np.unique(self.recipe_user[recipes].indices)
+        shared = np.asarray(self.user_recipe[commenters].sum(axis=0)).ravel()
+        # Compared by name, like the original `r1.recipe_name <> r2.recipe_name`.
+        shared[self.recipe_names == recipe] = 0
+        candidates = np.flatnonzero(shared)
+        order = np.lexsort((self.recipe_names[candidates].astype(str), -shared[candidates]))[:limit]
+        rows = []
+        for r in candidates[order]:
+            users = self.recipe_user.indices[self.recipe_user.indptr[r]:self.recipe_user.indptr[r + 1]]
+            users = np.intersect1d(users, commenters, assume_unique=True)
+            rows.append(
+                {
+                    "recipe_name": self.recipe_names[r],
+                    "shared_commenter_count": int(shared[r]),
+                    "shared_commenters": list(self.user_names[users]),
+                }
+            )
+        return pd.DataFrame(rows, columns=columns)
+
+    def comments(self, user: str) -> pd.DataFrame:
+        mask = np.isin(self.comment_user, self._users_named(user))
+        df = pd.DataFrame(
+            {
+                "comment": self.comment_text[mask],
+                "thumbs_up": self.comment_thumbs_up[mask],
+                "created_at": self.comment_created[mask],
+                "recipe": self.recipe_names[self.comment_recipe[mask]],
+            }
+        )
+        return df.sort_values("thumbs_up", ascending=False, kind="stable").reset_index(drop=True)
+
+    def user_commenting_paths(self, recipe: str) -> pd.DataFrame:
+        commenters = np.unique(self.recipe_user[self._recipes_named(recipe)].indices)
+        paths = self._chronological_paths(commenters)
+        # Users need at least one comment on another recipe to have a path.
+        paths = paths[paths.map(len) > 1]
+        counts = self._count_paths(paths)
+        return counts[counts["user_count"] > 1].reset_index(drop=True)
+
+    def new_user_commenting_journey(self, length: int = 3, min_users: int = 1) -> pd.DataFrame:
+        paths = self._chronological_paths(np.arange(len(self.user_names)))
+        paths = paths[paths.map(len) >= length].map(lambda p: p[:length])
+        counts = self._count_paths(paths)
+        return counts[counts["user_count"] >= min_users].reset_index(drop=True)
+
+    def recipe_sequences(self, recipe: str) -> pd.DataFrame:
+        commenters = np.unique(self.recipe_user[self._recipes_named(recipe)].indices)
+        paths = self._chronological_paths(commenters)
+        return pd.DataFrame({"recipe_sequence": [list(p) for p in paths if len(p) > 1]})
+
+    def all_recipe_sequences(self) -> pd.DataFrame:
+        paths = self._chronological_paths(np.arange(len(self.user_names)))
+        return pd.DataFrame({"recipe_sequence": [list(p) for p in paths]})
+
+    def reply_count_thumbs_up(self, recipe: str) -> pd.DataFrame:
+        pivots = [
+            (self.comment_created[pivot], pivot)
+            for pivot in map(self.engagement.pivot_comment, self._recipes_named(recipe))
+            if pivot is not None
+        ]
+        if not pivots:
+            return pd.DataFrame(columns=IMPACT_COLUMNS)
+        created_at, pivot = min(pivots)
+        comments_after, total_reply_count, total_thumbs_up = self.engagement.after(
+            self.comment_recipe[pivot], created_at
+        )
+        if not comments_after:
+            return pd.DataFrame(columns=IMPACT_COLUMNS)
+        u = self.comment_user[pivot]
+        return pd.DataFrame(
+            [
+                {
+                    "user": self.user_names[u],
+                    "user_reputation": self.user_reputation[u],
+                    "comment": self.comment_text[pivot],
+                    "created_at": created_at,
+                    "total_reply_count": total_reply_count,
+                    "total_thumbs_up": total_thumbs_up,
+                }
+            ],
+            columns=IMPACT_COLUMNS,
+        )
+
+    def tribes(self, limit: int) -> pd.DataFrame:
+        df = self._tribe_sample(limit)
+        df = df.groupby(["communityId", "user", "recipe"]).size().rename("user_count").reset_index()
+        df = pd.DataFrame(
+            {
+                "communityId": df["communityId"],
+                "user_name": self.user_names[df["user"].to_numpy()],
+                "recipe": np.where(df["recipe"] >= 0, self.recipe_names[df["recipe"].clip(lower=0)], None),
+                "user_count": df["user_count"],
+            }
+        )
+        return df.sort_values(["communityId", "user_name", "recipe"], kind="stable").reset_index(drop=True)
+
+    def bridge_users(self, limit: int) -> pd.DataFrame:
+        df = self._tribe_sample(limit)
+        # Recipes reached by sampled users from 2 or more communities.
+        tribe_count = df.groupby("recipe")["communityId"].nunique()
+        bridges = df[df["recipe"].isin(tribe_count.index[tribe_count >= 2])]["user"].unique()
+        return pd.DataFrame({"user_name": np.sort(self.user_names[bridges].astype(str))})
+
+    def influencer_lift(self) -> pd.DataFrame:
+        df = self.engagement.lift()
+        df["user"] = self.user_names[self.comment_user[df["pivot"]]]
+        df["created_at"] = self.comment_created[df["pivot"]]
+        df["recipe"] = self.recipe_names[df["recipe"]]
+        df = df.sort_values(["lift", "recipe"], ascending=[False, True], na_position="last")
+        return df[LIFT_COLUMNS].reset_index(drop=True)
@@ -0,0 +1,244 @@
+"""Batch jobs that precompute derived graph structures for the page queries.
+
+Each stage has a full build (a sequence of cypher files run in order) and an
+incremental refresh that takes the keys touched by newly ingested data.
+Stages without an incremental refresh are rebuilt when their key changes.
+Stages that need a plugin (the `tribes` stage needs Graph Data Science) run
+their fallback instead when the server doesn't have it; for `tribes` that
+is the NumPy community detection in `component.communities`. Stages can
+also run Python jobs after their build queries or in place of a refresh
+query, e.g. the `sketches` stage computes and refreshes recipe sketches in
+`component.sketches`.
+
+Usage (from `app/`):
+
+    python -m component.materialize                 # rebuild every stage
+    python -m component.materialize co_commented    # rebuild one stage
+"""
+
+import argparse
+import time
+
+from neo4j.exceptions import ClientError
+
+from . import communities, schema, sketches
+from .cli import add_connection_arguments, connect
+from .database import Database
+from .engagement import INFLUENCER_TOP_N
+
+# Similar recipes kept per recipe. The Recipe Similarity page shows 5; the
+# rest are available for "users also commented on" recommendations.
+SIMILARITY_TOP_K = 20
+
+# Name of the in-memory GDS projection used for community detection.
+TRIBE_GRAPH = "userCoComment"
+
+
+class Stage():
+    def __init__(
+        self,
+        name: str,
+        build: list,
+        refresh: str,
+        refresh_key: str,
+        params: dict = None,
+        plugin: str = None,
+        fallback=None,
+        job=None,
+        refresh_job=None,
+    ):
+        self.name = name
+        self.build = build
+        # None when the stage can only be rebuilt in full (unless it has a refresh_job).
+        self.refresh = refresh
+        # Which change-set key the refresh query takes, e.g. "user_ids" or "recipe_codes".
+        self.refresh_key = refresh_key
+        # Extra parameters passed to the build and refresh queries that declare them.
+        self.params = params or {}
+        # Server plugin the stage's procedures come from, e.g. "gds".
+        self.plugin = plugin
+        # Called as fallback(db, database) in place of the build when the plugin is missing.
+        self.fallback = fallback
+        # Called as job(db, database) after the build queries, for work done in Python.
+        self.job = job
+        # Called as refresh_job(db, database, keys) in place of a refresh query, for
+        # incremental work done in Python.
+        self.refresh_job = refresh_job
+
+    def params_for(self, db: Database, cypher_filename: str) -> dict:
+        declared = db.queries.get(cypher_filename).parameters
+        return {name: value for name, value in self.params.items() if name in declared}
+
+
+STAGES = {
+    stage.name: stage
+    for stage in [
+        # First, so later stages can anchor on :INFLUENCER users.
+        Stage(
+            name="reputation_rank",
+            build=[
+                "materialize/build_reputation_rank.cypher",
+                "materialize/label_influencers.cypher",
+            ],
+            refresh=None,
+            refresh_key="user_ids",
+            params={"top_n": INFLUENCER_TOP_N},
+        ),
+        Stage(
+            name="co_commented",
+            build=[
+                "materialize/clear_co_commented.cypher",
+                "materialize/build_co_commented.cypher",
+            ],
+            refresh="materialize/refresh_co_commented.cypher",
+            refresh_key="user_ids",
+        ),
+        Stage(
+            name="similar_audience",
+            build=["materialize/build_similar_audience.cypher"],
+            refresh="materialize/refresh_similar_audience.cypher",
+            refresh_key="user_ids",
+            params={"k": SIMILARITY_TOP_K},
+        ),
+        Stage(
+            name="recipe_sequence",
+            build=["materialize/build_recipe_sequence.cypher"],
+            refresh="materialize/refresh_recipe_sequence.cypher",
+            refresh_key="user_ids",
+        ),
+        Stage(
+            name="engagement_index",
+            build=["materialize/build_engagement_index.cypher"],
+            refresh="materialize/refresh_engagement_index.cypher",
+            refresh_key="recipe_codes",
+        ),
+        # After co_commented: projects its CO_COMMENTED weights whenever users change,
+        # Louvain writes communityId, and the projection is dropped again. Without GDS,
+        # communities.write_communities exports CO_COMMENTED and runs Louvain in NumPy
+        # instead.
+        Stage(
+            name="tribes",
+            build=[
+                "materialize/drop_tribe_projection.cypher",
+                "materialize/project_tribe_graph.cypher",
+                "materialize/write_tribes.cypher",
+                "materialize/drop_tribe_projection.cypher",
+            ],
+            refresh=None,
+            refresh_key="user_ids",
+            params={"graph_name": TRIBE_GRAPH},
+            plugin="gds",
+            fallback=communities.write_communities,
+        ),
+        # HyperLogLog and MinHash sketches of each recipe's commenters, for the
+        # pages' approximate mode. Computed in Python and written to RECIPE nodes;
+        # a refresh re-sketches only the recipes that received new comments.
+        Stage(
+            name="sketches",
+            build=[],
+            refresh=None,
+            refresh_key="recipe_codes",
+            job=sketches.write_sketches,
+            refresh_job=sketches.refresh_sketches,
+        ),
+    ]
+}
+
+
+def _missing_plugin(stage: Stage, error: ClientError) -> bool:
+    return stage.plugin is not None and "ProcedureNotFound" in (error.code or "")
+
+
+def _build_stage(db: Database, database: str, stage: Stage) -> bool:
+    """Run the stage's build queries; False if it was skipped for a missing plugin."""
+    try:
+        for cypher_filename in stage.build:
+            db.execute(cypher_filename, database, **stage.params_for(db, cypher_filename))
+    except ClientError as e:
+        if not _missing_plugin(stage, e):
+            raise
+        if stage.fallback is None:
+            print(f"{stage.name}: skipped, the server doesn't have the {stage.plugin} plugin")
+            return False
+        print(f"{stage.name}: the server doesn't have the {stage.plugin} plugin, using the fallback")
+        stage.fallback(db, database)
+        return True
+    if stage.job is not None:
+        stage.job(db, database)
+    return True
+
+
+def build(db: Database, database: str, stages: list = None):
+    """Fully rebuild the given stages (default: all), then invalidate caches.
+
+    Constraints and indexes are applied first, since graphs loaded with
+    `cypher/ingest_csv.cypher` may predate some of them.
+    """
+    schema.apply(db, database)
+    for name in stages or STAGES:
+        start = time.perf_counter()
+        if _build_stage(db, database, STAGES[name]):
+            print(f"{name}: rebuilt in {time.perf_counter() - start:.1f}s")
+    db.bump_data_version(database)
+
+
+def _influencer_ids(db: Database, database: str) -> set:
+    return set(db.execute("materialize/get_influencer_ids.cypher", database)["user_id"])
+
+
+def _refresh_reputation_rank(db: Database, database: str, stage: Stage, changes: dict) -> dict:
+    """Rebuild reputation_rank and return `changes` extended for the moved :INFLUENCER labels.
+
+    The engagement index anchors its pivot comments on :INFLUENCER, so recipes
+    commented on by users who entered or left the top N need a refresh even
+    without new comments.
+    """
+    before = _influencer_ids(db, database)
+    _build_stage(db, database, stage)
+    moved = sorted(before ^ _influencer_ids(db, database))
+    if not moved:
+        return changes
+    recipes = db.execute("materialize/get_recipes_commented_by.cypher", database, user_ids=moved)
+    recipe_codes = set(changes.get("recipe_codes") or []) | set(recipes["recipe_code"])
+    return {**changes, "recipe_codes": sorted(recipe_codes)}
+
+
+def refresh(db: Database, database: str, changes: dict, stages: list = None):
+    """Refresh stages for the keys in `changes`, e.g. {"user_ids": [...], "recipe_codes": [...]}.
+
+    Stages whose key is absent or empty in `changes` are skipped.
+    """
+    for name in stages or STAGES:
+        stage = STAGES[name]
+        keys = sorted(changes.get(stage.refresh_key) or [])
+        if not keys:
+            continue
+        if name == "reputation_rank":
+            changes = _refresh_reputation_rank(db, database, stage, changes)
+        elif stage.refresh_job is not None:
+            stage.refresh_job(db, database, keys)
+        elif stage.refresh is None:
+            _build_stage(db, database, stage)
+        else:
+            db.execute(
+                stage.refresh,
+                database,
+                **{stage.refresh_key: keys},
+                **stage.params_for(db, stage.refresh),
+            )
+    db.bump_data_version(database)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_connection_arguments(parser)
+    parser.add_argument("stages", nargs="*", help=f"any of {', '.join(STAGES)}")
+    args = parser.parse_args()
+    unknown = set(args.stages) - STAGES.keys()
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    build(connect(args), args.database, args.stages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""Per-query instrumentation shared by both database backends.
+
+Every query execution is recorded with its cypher file, the page that ran
+it, wall time, the server's `result_available_after` / `result_consumed_after`,
+row count, result size in bytes and (when profiling is enabled) db hits.
+Samples are kept in a rolling window per (query, page) for p50/p95/p99 and
+can be exported three ways:
+
+- `summary()` as a DataFrame, shown by the sidebar panel in `component.panel`,
+- one JSON object per execution on the `component.metrics` logger
+  (`enable_json_logs`),
+- Prometheus text exposition (`prometheus_text`, served by `serve_prometheus`).
+
+Pages tag their queries with `tag_page`; untagged queries (batch jobs,
+CLIs) are reported under page "-".
+"""
+
+import contextvars
+import json
+import logging
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+# Samples kept per (query, page) for the rolling percentiles.
+WINDOW = 500
+QUANTILES = (0.5, 0.95, 0.99)
+NO_PAGE = "-"
+# Name used for ad-hoc cypher that isn't a registered query file.
+ADHOC = "adhoc"
+
+logger = logging.getLogger(__name__)
+
+_page = contextvars.ContextVar("page", default=NO_PAGE)
+
+
+def tag_page(page: str):
+    """Attribute queries run by the current script run (thread) to `page`."""
+    _page.set(page)
+
+
+def current_page() -> str:
+    return _page.get()
+
+
+def result_bytes(df) -> int:
+    """In-memory size of a result DataFrame, as a proxy for transferred bytes."""
+    if isinstance(df, pd.DataFrame):
+        return int(df.memory_usage(index=False, deep=True).sum())
+    return 0
+
+
+def profile_db_hits(profile: dict) -> int:
+    """Total db hits of a PROFILE plan tree."""
+    if not profile:
+        return 0
+    return profile.get("dbHits", 0) + sum(
+        profile_db_hits(child) for child in profile.get("children", [])
+    )
+
+
+class QueryStats():
+    """Totals and a rolling window of wall times for one (query, page)."""
+
+    def __init__(self, window: int = WINDOW):
+        self.wall_times = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.wall_time_total = 0.0
+        self.rows_total = 0
+        self.bytes_total = 0
+        self.db_hits_total = 0
+        self.last = None
+
+    def quantiles(self) -> dict:
+        if not self.wall_times:
+            return {q: None for q in QUANTILES}
+        values = np.percentile(np.fromiter(self.wall_times, dtype=float), [q * 100 for q in QUANTILES])
+        return dict(zip(QUANTILES, values))
+
+
+class QueryMetrics():
+    """Thread-safe store of query samples keyed by (query, page)."""
+
+    def __init__(self, window: int = WINDOW):
+        self.window = window
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _get(self, query: str, page: str) -> QueryStats:
+        key = (query, page)
+        if key not in self._stats:
+            self._stats[key] = QueryStats(self.window)
+        return self._stats[key]
+
+    def record(
+        self,
+        query: str,
+        wall_time: float,
+        rows: int = 0,
+        bytes: int = 0,
+        available_after: int = None,
+        consumed_after: int = None,
+        db_hits: int = None,
+        error: str = None,
+        page: str = None,
+        backend: str = "neo4j",
+    ):
+        """Record one execution. Times from the server summary are in ms."""
+        page = page or current_page()
+        with self._lock:
+            stats = self._get(query, page)
+            stats.count += 1
+            if error is not None:
+                stats.errors += 1
+            else:
+                stats.wall_times.append(wall_time)
+                stats.wall_time_total += wall_time
+                stats.rows_total += rows
+                stats.bytes_total += bytes
+                stats.db_hits_total += db_hits or 0
+            stats.last = time.time()
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                json.dumps(
+                    {
+                        "event": "query",
+                        "timestamp": time.time(),
+                        "query": query,
+                        "page": page,
+                        "backend": backend,
+                        "wall_time_ms": round(wall_time * 1000, 3),
+                        "result_available_after_ms": available_after,
+                        "result_consumed_after_ms": consumed_after,
+                        "rows": rows,
+                        "bytes": bytes,
+                        "db_hits": db_hits,
+                        "error": error,
+                    }
+                )
+            )
+
+    def record_cache_hit(self, query: str, page: str = None):
+        with self._lock:
+            self._get(query, page or current_page()).cache_hits += 1
+
+    def summary(self, page: str = None) -> pd.DataFrame:
+        """One row per (query, page) with totals and rolling percentiles in ms."""
+        rows = []
+        with self._lock:
+            for (query, query_page), stats in self._stats.items():
+                if page is not None and query_page != page:
+                    continue
+                quantiles = stats.quantiles()
+                runs = stats.count - stats.errors
+                rows.append(
+                    {
+                        "query": query,
+                        "page": query_page,
+                        "runs": stats.count,
+                        "cache_hits": stats.cache_hits,
+                        "errors": stats.errors,
+                        "p50_ms": _ms(quantiles[0.5]),
+                        "p95_ms": _ms(quantiles[0.95]),
+                        "p99_ms": _ms(quantiles[0.99]),
+                        "mean_rows": stats.rows_total / runs if runs else None,
+                        "mean_bytes": stats.bytes_total / runs if runs else None,
+                        "db_hits": stats.db_hits_total,
+                    }
+                )
+        df = pd.DataFrame(rows)
+        return df.sort_values("p95_ms", ascending=False, na_position="last") if len(df) else df
+
+    def prometheus_text(self) -> str:
+        """Metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP recipe_query_duration_seconds Query wall time (rolling window quantiles).",
+            "# TYPE recipe_query_duration_seconds summary",
+        ]
+        counters = {
+            "recipe_query_errors_total": ("Failed query executions.", "errors"),
+            "recipe_query_cache_hits_total": ("Queries answered from the result cache.", "cache_hits"),
+            "recipe_query_rows_total": ("Rows returned.", "rows_total"),
+            "recipe_query_bytes_total": ("Result bytes returned.", "bytes_total"),
+            "recipe_query_db_hits_total": ("Database hits of profiled queries.", "db_hits_total"),
+        }
+        with self._lock:
+            items = list(self._stats.items())
+            for (query, page), stats in items:
+                labels = f'query="{_escape(query)}",page="{_escape(page)}"'
+                for q, value in stats.quantiles().items():
+                    if value is not None:
+                        lines.append(f'recipe_query_duration_seconds{{{labels},quantile="{q}"}} {value:.6f}')
+                lines.append(f"recipe_query_duration_seconds_sum{{{labels}}} {stats.wall_time_total:.6f}")
+                lines.append(f"recipe_query_duration_seconds_count{{{labels}}} {stats.count - stats.errors}")
+            for name, (help_text, attribute) in counters.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for (query, page), stats in items:
+                    labels = f'query="{_escape(query)}",page="{_escape(page)}"'
+                    lines.append(f"{name}{{{labels}}} {getattr(stats, attribute)}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = QueryMetrics()
+
+
+def enable_json_logs(stream=None, level: int = logging.INFO):
+    """Write one JSON object per query execution to `stream` (default stderr)."""
+    if any(getattr(handler, "_json_metrics", False) for handler in logger.handlers):
+        return
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler._json_metrics = True
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+class _PrometheusHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_prometheus(port: int, host: str = "0.0.0.0"):
+    """Serve `GET /metrics` on a background thread; later calls are no-ops."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _PrometheusHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    return _server
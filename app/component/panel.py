@@ -0,0 +1,38 @@
+"""Sidebar performance panel shown on every page.
+
+Lists the rolling query timings from `component.metrics` for the current
+page (or every page) together with the result cache hit rate, so a slow
+query can be traced to its cypher file without server access. When the
+server exposes its metrics, the hit rates of its query-plan caches are shown
+too.
+"""
+
+import streamlit as st
+
+from .metrics import current_page, metrics
+
+
+def performance_panel(db):
+    """Render the performance panel in the sidebar. Call at the end of a page."""
+    with st.sidebar.expander("Performance"):
+        all_pages = st.checkbox("All pages", value=False, key="performance_all_pages")
+        summary = metrics.summary(page=None if all_pages else current_page())
+        if summary.empty:
+            st.caption("No queries recorded yet.")
+        else:
+            st.dataframe(
+                summary.drop(columns=[] if all_pages else ["page"]),
+                hide_index=True,
+            )
+        cache = db.cache.stats()
+        st.caption(
+            f"Result cache: {cache['entries']} entries, "
+            f"{cache['bytes'] / 1e6:.1f} MB, hit rate {cache['hit_rate']:.0%}"
+        )
+        plan_cache = db.plan_cache_stats(st.secrets["NEO4J_DATABASE"])
+        if plan_cache is None:
+            st.caption("Query-plan cache: no server metrics available.")
+        else:
+            # Cumulative since the server started, across every client of the database.
+            st.caption("Query-plan cache (server)")
+            st.dataframe(plan_cache, hide_index=True)
@@ -0,0 +1,173 @@
+"""Sequential pattern mining over users' chronological recipe sequences.
+
+`frequent_subsequences` finds recipe sequences (in order, gaps allowed) that
+appear in at least `min_support` users' histories, using PrefixSpan with
+min-support and max-length pruning. Large inputs are split into user shards
+and mined in a process pool with the SON two-pass scheme: each shard is mined
+at the proportional threshold to collect candidates, then every candidate's
+exact support is counted across all shards. The result is identical to
+mining the whole input at once.
+
+Sequences come from the `recipe_sequence` property built by the
+`recipe_sequence` materialization stage.
+
+Usage (from `app/`):
+
+    python -m component.patterns --min-support 0.005 --max-length 3
+"""
+
+import argparse
+import math
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .cli import add_connection_arguments, connect
+
+# Below this many sequences, mining runs in-process; pool start-up would
+# cost more than it saves.
+PARALLEL_THRESHOLD = 20_000
+
+COLUMNS = ["commenting_path", "user_count", "support"]
+
+
+def _min_count(min_support, total: int) -> int:
+    """Absolute user count for `min_support` given as a count (int) or fraction (float)."""
+    if isinstance(min_support, float) and min_support < 1:
+        return max(1, math.ceil(min_support * total))
+    return max(1, int(min_support))
+
+
+def prefixspan(sequences: list, min_count: int, max_length: int) -> dict:
+    """Return {pattern tuple: support} for all patterns with support >= min_count.
+
+    Each sequence must contain distinct items (true for recipe sequences), so
+    an item's position in a sequence is unique and projections are a single
+    dictionary lookup.
+    """
+    positions = [{item: i for i, item in enumerate(sequence)} for sequence in sequences]
+    results = {}
+
+    def mine(prefix: tuple, projected: list):
+        counts = defaultdict(int)
+        for seq_idx, start in projected:
+            for item in sequences[seq_idx][start:]:
+                counts[item] += 1
+        for item, count in counts.items():
+            if count < min_count:
+                continue
+            pattern = prefix + (item,)
+            results[pattern] = count
+            if len(pattern) < max_length:
+                mine(
+                    pattern,
+                    [
+                        (seq_idx, positions[seq_idx][item] + 1)
+                        for seq_idx, start in projected
+                        if positions[seq_idx].get(item, -1) >= start
+                    ],
+                )
+
+    mine((), [(seq_idx, 0) for seq_idx in range(len(sequences))])
+    return results
+
+
+def _contains(positions: dict, pattern: tuple) -> bool:
+    last = -1
+    for item in pattern:
+        position = positions.get(item, -1)
+        if position <= last:
+            return False
+        last = position
+    return True
+
+
+def _mine_shard(args) -> set:
+    shard, fraction, max_length = args
+    min_count = max(1, math.ceil(fraction * len(shard)))
+    return set(prefixspan(shard, min_count, max_length))
+
+
+def _count_shard(args) -> Counter:
+    shard, candidates = args
+    counts = Counter()
+    for sequence in shard:
+        positions = {item: i for i, item in enumerate(sequence)}
+        for pattern in candidates:
+            if _contains(positions, pattern):
+                counts[pattern] += 1
+    return counts
+
+
+def frequent_subsequences(
+    sequences: list,
+    min_support=2,
+    max_length: int = 3,
+    min_length: int = 2,
+    workers: int = None,
+) -> pd.DataFrame:
+    """Mine frequent ordered recipe subsequences.
+
+    `min_support` is an absolute user count (int) or a fraction of users
+    (float < 1). Returns commenting_path, user_count and support (fraction of
+    users), sorted by user_count descending.
+    """
+    sequences = [tuple(sequence) for sequence in sequences if sequence]
+    total = len(sequences)
+    if not total:
+        return pd.DataFrame(columns=COLUMNS)
+    min_count = _min_count(min_support, total)
+
+    if workers == 1 or (workers is None and total < PARALLEL_THRESHOLD):
+        support = prefixspan(sequences, min_count, max_length)
+    else:
+        shard_count = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=shard_count) as pool:
+            shards = [sequences[i::shard_count] for i in range(shard_count)]
+            fraction = min_count / total
+            candidates = set().union(
+                *pool.map(_mine_shard, [(shard, fraction, max_length) for shard in shards])
+            )
+            support = Counter()
+            for counts in pool.map(_count_shard, [(shard, candidates) for shard in shards]):
+                support.update(counts)
+        support = {pattern: count for pattern, count in support.items() if count >= min_count}
+
+    rows = sorted(
+        (
+            (list(pattern), count, count / total)
+            for pattern, count in support.items()
+            if len(pattern) >= min_length
+        ),
+        key=lambda row: (-row[1], row[0]),
+    )
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_connection_arguments(parser)
+    parser.add_argument("--min-support", type=float, default=0.01)
+    parser.add_argument("--max-length", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", help="write results to this CSV instead of printing")
+    args = parser.parse_args()
+
+    db = connect(args)
+    sequences = [
+        sequence
+        for batch in db.stream_query("get_all_recipe_sequences.cypher", args.database, fetch_size=10_000)
+        for sequence in batch["recipe_sequence"]
+    ]
+    min_support = args.min_support if args.min_support < 1 else int(args.min_support)
+    df = frequent_subsequences(sequences, min_support, args.max_length, workers=args.workers)
+    if args.output:
+        df.to_csv(args.output, index=False)
+    else:
+        print(df.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Search-as-you-type pickers shared by the pages.
+
+Each picker is a text box plus a dropdown of the top matches for what has
+been typed. Only those matches are fetched, so a page's cost no longer
+depends on the size of the catalog. Streamlit sends the text when the user
+presses Enter or leaves the box, which debounces the search; results are
+cached per search text by the backend's result cache.
+
+A picker can also prefetch the page's detail query for its first few
+options: the queries start in parallel on the async driver, so the default
+selection's result is already in flight when the page asks for it, and the
+next likely picks are warm.
+"""
+
+import pandas as pd
+import streamlit as st
+
+from .search import MIN_SEARCH_LENGTH, SEARCH_LIMIT, to_fulltext_query
+
+# Number of options whose detail query is prefetched.
+PREFETCH_OPTIONS = 3
+
+
+def _pick(label: str, options, key: str):
+    if len(options) == 0:
+        st.warning("No matches. Try a shorter or different search.")
+        st.stop()
+    return st.selectbox(label, options, key=key)
+
+
+def _prefetch(db, database: str, cypher_filename: str, parameter: str, options):
+    """Start `cypher_filename` for the first options, with each option as `parameter`."""
+    if cypher_filename is None:
+        return
+    for option in list(options)[:PREFETCH_OPTIONS]:
+        db.prefetch(cypher_filename=cypher_filename, database=database, **{parameter: option})
+
+
+def recipe_picker(
+    db, database: str, label: str = "Select recipe", key: str = "recipe", prefetch: str = None
+) -> str:
+    """Recipe search box and dropdown; returns the selected recipe name.
+
+    `prefetch` names a query taking the recipe name as `recipe`, started for
+    the first few options.
+    """
+    search = st.text_input(
+        "Search recipe", key=f"{key}_search", placeholder="Type part of a recipe name"
+    )
+    query = to_fulltext_query(search)
+    if len(search.strip()) >= MIN_SEARCH_LENGTH and query:
+        recipes = db.run_query(
+            cypher_filename="search_recipes.cypher",
+            database=database,
+            search=query,
+            limit=SEARCH_LIMIT,
+        )
+    else:
+        # Nothing typed yet: offer the first recipes alphabetically.
+        recipes = db.run_page(
+            cypher_filename="get_all_recipes.cypher",
+            database=database,
+            page=0,
+            page_size=SEARCH_LIMIT,
+        )
+    _prefetch(db, database, prefetch, "recipe", recipes["recipe_name"])
+    return _pick(label, recipes["recipe_name"], key)
+
+
+def user_picker(
+    db, database: str, label: str = "Select user", key: str = "user", prefetch: str = None
+) -> pd.Series:
+    """User search box and dropdown; returns the selected user's row.
+
+    The row has `user_name` and `user_reputation`, so pages don't need a
+    second lookup for the reputation. `prefetch` names a query taking the
+    user name as `user`, started for the first few options.
+    """
+    search = st.text_input(
+        "Search user", key=f"{key}_search", placeholder="Type part of a user name"
+    )
+    query = to_fulltext_query(search)
+    if len(search.strip()) >= MIN_SEARCH_LENGTH and query:
+        users = db.run_query(
+            cypher_filename="search_users.cypher",
+            database=database,
+            search=query,
+            limit=SEARCH_LIMIT,
+        )
+    else:
+        # Nothing typed yet: offer the users with the highest reputation.
+        users = db.run_query(
+            cypher_filename="get_users_sort_by_rep.cypher",
+            database=database,
+            limit=SEARCH_LIMIT,
+        )
+    _prefetch(db, database, prefetch, "user", users["user_name"])
+    user = _pick(label, users["user_name"], key)
+    return users[users["user_name"] == user].iloc[0]
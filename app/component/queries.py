@@ -0,0 +1,124 @@
+import re
+import threading
+from pathlib import Path
+
+CYPHER_DIR = Path(__file__).resolve().parent.parent / "cypher"
+
+_PARAMETER = re.compile(r"\$(\w+)")
+# `{name}` with nothing else inside the braces is a leftover str.format
+# placeholder; map literals such as `{recipe: r.recipe_name}` are not matched.
+_FORMAT_PLACEHOLDER = re.compile(r"\{\s*(\w+)\s*\}")
+_BLOCK_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_LINE_COMMENT = re.compile(r"//[^\n]*")
+_TRAILING = re.compile(r"[\s;]+$")
+_ENDS_WITH_LIMIT = re.compile(r"\b(LIMIT|SKIP)\s+\S+$", re.IGNORECASE)
+_RETURN = re.compile(r"\bRETURN\b", re.IGNORECASE)
+_IN_TRANSACTIONS = re.compile(r"\bIN\s+TRANSACTIONS\b", re.IGNORECASE)
+
+# Parameter names used by `Query.paged_text`.
+PAGE_SKIP = "page_skip"
+PAGE_LIMIT = "page_limit"
+
+
+class QueryError(ValueError):
+    pass
+
+
+class UnsupportedQueryError(QueryError):
+    """A backend has no implementation of a registered query."""
+
+
+def _strip_comments(text: str) -> str:
+    return _LINE_COMMENT.sub("", _BLOCK_COMMENT.sub("", text))
+
+
+class Query():
+    """A validated cypher file and the `$parameters` it expects."""
+
+    def __init__(self, name: str, text: str):
+        self.name = name
+        self.text = text
+        body = _strip_comments(text)
+        if not body.strip():
+            raise QueryError(f"'{name}' contains no cypher statement")
+        placeholders = _FORMAT_PLACEHOLDER.findall(body)
+        if placeholders:
+            raise QueryError(
+                f"'{name}' uses str.format placeholders {sorted(set(placeholders))}; "
+                "use $parameters instead"
+            )
+        self.parameters = frozenset(_PARAMETER.findall(body))
+        self.paged_text = self._paged(body)
+
+    def bind(self, params: dict) -> dict:
+        """Check `params` against the query's declared parameters."""
+        missing = self.parameters - params.keys()
+        unexpected = params.keys() - self.parameters
+        if missing or unexpected:
+            raise QueryError(
+                f"'{self.name}' expects parameters {sorted(self.parameters)}, "
+                f"got {sorted(params)}"
+            )
+        return dict(params)
+
+    @staticmethod
+    def _paged(body: str):
+        """The query with SKIP/LIMIT appended, or None if it can't be paged.
+
+        Only read queries whose last clause is RETURN/ORDER BY qualify; a query
+        that already ends in LIMIT keeps its own bound.
+        """
+        body = _TRAILING.sub("", body)
+        if not _RETURN.search(body) or _IN_TRANSACTIONS.search(body):
+            return None
+        if _ENDS_WITH_LIMIT.search(body):
+            return None
+        return f"{body}\nSKIP ${PAGE_SKIP} LIMIT ${PAGE_LIMIT}"
+
+    def bind_page(self, params: dict, page: int, page_size: int) -> dict:
+        if self.paged_text is None:
+            raise QueryError(f"'{self.name}' cannot be paginated")
+        parameters = self.bind(params)
+        parameters[PAGE_SKIP] = page * page_size
+        parameters[PAGE_LIMIT] = page_size
+        return parameters
+
+
+class QueryRegistry():
+    """All cypher files under `app/cypher/`, loaded and validated once.
+
+    Queries are keyed by their path relative to the cypher directory, e.g.
+    `get_similar_recipes.cypher` or `archive/get_outlier_users.cypher`.
+    """
+
+    def __init__(self, directory: Path = CYPHER_DIR):
+        self.directory = Path(directory)
+        self._queries = {}
+        for path in sorted(self.directory.rglob("*.cypher")):
+            name = path.relative_to(self.directory).as_posix()
+            self._queries[name] = Query(name, path.read_text())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._queries
+
+    def __iter__(self):
+        return iter(self._queries.values())
+
+    def get(self, name: str) -> Query:
+        try:
+            return self._queries[name]
+        except KeyError:
+            raise QueryError(f"Unknown query file '{name}'") from None
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_registry() -> QueryRegistry:
+    """Return the process-wide registry, loading it on first use."""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = QueryRegistry()
+    return _default_registry
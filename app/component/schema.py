@@ -0,0 +1,205 @@
+"""Schema management and plan checks for the registered queries.
+
+`apply` creates every constraint and index the queries rely on (all
+statements use IF NOT EXISTS, so it is safe to rerun). `check_plans` runs
+EXPLAIN on each registered query and fails when a plan scans a whole label
+or builds a cartesian product that isn't listed as expected for that query.
+
+Usage (from `app/`):
+
+    python -m component.schema apply
+    python -m component.schema check
+"""
+
+import argparse
+
+from neo4j.exceptions import ClientError
+
+from .cli import add_connection_arguments, connect
+from .database import Database
+
+CONSTRAINTS = [
+    "CREATE CONSTRAINT comment_id_COMMENT_uniq IF NOT EXISTS "
+    "FOR (n:COMMENT) REQUIRE (n.comment_id) IS UNIQUE",
+    "CREATE CONSTRAINT recipe_code_RECIPE_uniq IF NOT EXISTS "
+    "FOR (n:RECIPE) REQUIRE (n.recipe_code) IS UNIQUE",
+    "CREATE CONSTRAINT user_id_USER_uniq IF NOT EXISTS "
+    "FOR (n:USER) REQUIRE (n.user_id) IS UNIQUE",
+    "CREATE CONSTRAINT name_DATA_VERSION_uniq IF NOT EXISTS "
+    "FOR (n:DATA_VERSION) REQUIRE (n.name) IS UNIQUE",
+    "CREATE CONSTRAINT name_INGEST_WATERMARK_uniq IF NOT EXISTS "
+    "FOR (n:INGEST_WATERMARK) REQUIRE (n.name) IS UNIQUE",
+]
+
+# Index name -> (statement, queries that filter or sort on the property).
+INDEXES = {
+    "recipe_name_RECIPE": (
+        "CREATE INDEX recipe_name_RECIPE IF NOT EXISTS FOR (n:RECIPE) ON (n.recipe_name)",
+        [
+            "get_similar_recipes.cypher",
+            "get_user_commenting_paths.cypher",
+            "get_recipe_sequences.cypher",
+            "get_reply_count_thumbs_up.cypher",
+        ],
+    ),
+    "user_name_USER": (
+        "CREATE INDEX user_name_USER IF NOT EXISTS FOR (n:USER) ON (n.user_name)",
+        ["get_comments.cypher", "get_reached_user.cypher"],
+    ),
+    "user_reputation_USER": (
+        "CREATE INDEX user_reputation_USER IF NOT EXISTS FOR (n:USER) ON (n.user_reputation)",
+        [
+            "materialize/build_reputation_rank.cypher",
+        ],
+    ),
+    "reputation_rank_USER": (
+        "CREATE INDEX reputation_rank_USER IF NOT EXISTS FOR (n:USER) ON (n.reputation_rank)",
+        [
+            "get_high_rep_user_comment_reach.cypher",
+            "get_users_sort_by_rep.cypher",
+            "materialize/label_influencers.cypher",
+        ],
+    ),
+    "recipe_name_fulltext": (
+        "CREATE FULLTEXT INDEX recipe_name_fulltext IF NOT EXISTS FOR (n:RECIPE) ON EACH [n.recipe_name]",
+        ["search_recipes.cypher"],
+    ),
+    "user_name_fulltext": (
+        "CREATE FULLTEXT INDEX user_name_fulltext IF NOT EXISTS FOR (n:USER) ON EACH [n.user_name]",
+        ["search_users.cypher"],
+    ),
+    "community_id_USER": (
+        "CREATE INDEX community_id_USER IF NOT EXISTS FOR (n:USER) ON (n.communityId)",
+        ["get_tribes.cypher", "get_bridge_users.cypher"],
+    ),
+    "created_at_COMMENT": (
+        "CREATE INDEX created_at_COMMENT IF NOT EXISTS FOR (n:COMMENT) ON (n.created_at)",
+        [
+            "materialize/build_engagement_index.cypher",
+            "materialize/build_recipe_sequence.cypher",
+            "ingest/get_latest_comment.cypher",
+            "ingest/get_comments_since.cypher",
+        ],
+    ),
+}
+
+FORBIDDEN_OPERATORS = {"AllNodesScan", "NodeByLabelScan", "CartesianProduct"}
+
+# Operators that are expected for a query, usually because it deliberately
+# reads every node of a label (catalog lists, global aggregations, batch jobs).
+EXPECTED_OPERATORS = {
+    "get_all_recipes.cypher": {"NodeByLabelScan"},
+    "get_influencer_lift.cypher": {"NodeByLabelScan"},
+    "get_new_user_commenting_journey.cypher": {"NodeByLabelScan"},
+    "get_all_recipe_sequences.cypher": {"NodeByLabelScan"},
+    "ingest/clear_graph.cypher": {"AllNodesScan"},
+    "materialize/build_reputation_rank.cypher": {"NodeByLabelScan"},
+    "materialize/label_influencers.cypher": {"NodeByLabelScan"},
+    "materialize/get_influencer_ids.cypher": {"NodeByLabelScan"},
+    "materialize/clear_co_commented.cypher": {"NodeByLabelScan"},
+    "materialize/build_co_commented.cypher": {"NodeByLabelScan"},
+    "materialize/build_similar_audience.cypher": {"NodeByLabelScan"},
+    "materialize/build_recipe_sequence.cypher": {"NodeByLabelScan"},
+    "materialize/build_engagement_index.cypher": {"NodeByLabelScan"},
+    "materialize/refresh_engagement_index.cypher": {"NodeByLabelScan"},
+    "materialize/export_user_ids.cypher": {"NodeByLabelScan"},
+    "materialize/export_co_commented.cypher": {"NodeByLabelScan"},
+    "materialize/export_recipe_commenters.cypher": {"NodeByLabelScan"},
+    "get_recipe_sketches.cypher": {"NodeByLabelScan"},
+}
+
+# Queries that need plugins (GDS) or are no longer served are not checked.
+SKIPPED_PREFIXES = ("archive/",)
+
+# Placeholder values so parameterized queries can be planned.
+EXPLAIN_PARAMETERS = {
+    "recipe": "",
+    "user": "",
+    "n": 10,
+    "recipe_count": 2,
+    "k": 5,
+    "limit": 1000,
+    "search": "a*",
+    "length": 3,
+    "min_users": 1,
+    "top_n": 100,
+    "user_ids": [],
+    "recipe_codes": [],
+    "rows": [],
+    "graph_name": "userCoComment",
+    "name": "comments",
+    "created_at_ms": 0,
+    "comment_id": "",
+    "since_ms": 0,
+    "since_s": 0,
+}
+
+
+class SchemaError(RuntimeError):
+    pass
+
+
+def apply(db: Database, database: str):
+    """Create all constraints and indexes, then wait for them to come online."""
+    for statement in CONSTRAINTS:
+        db.run_cypher(query=statement, database=database)
+    for statement, _ in INDEXES.values():
+        db.run_cypher(query=statement, database=database)
+    db.run_cypher(query="CALL db.awaitIndexes(300)", database=database)
+
+
+def _operators(plan: dict):
+    yield plan["operatorType"].split("@")[0]
+    for child in plan.get("children", []):
+        yield from _operators(child)
+
+
+def check_plans(db: Database, database: str) -> dict:
+    """EXPLAIN every registered query; raise SchemaError on unexpected scans.
+
+    Returns {query name: sorted operator list} for the queries that were
+    planned. Queries whose procedures are unavailable (e.g. GDS) are skipped.
+    """
+    plans, failures = {}, []
+    for query in db.queries:
+        if query.name.startswith(SKIPPED_PREFIXES):
+            continue
+        params = {name: EXPLAIN_PARAMETERS.get(name) for name in query.parameters}
+        try:
+            plan = db.explain(query.name, database, **params)
+        except ClientError as e:
+            if "ProcedureNotFound" in (e.code or ""):
+                print(f"{query.name}: skipped ({e.message})")
+                continue
+            raise
+        operators = set(_operators(plan))
+        plans[query.name] = sorted(operators)
+        unexpected = (operators & FORBIDDEN_OPERATORS) - EXPECTED_OPERATORS.get(query.name, set())
+        if unexpected:
+            failures.append(f"{query.name}: {', '.join(sorted(unexpected))}")
+    if failures:
+        raise SchemaError("Unexpected plan operators:\n" + "\n".join(failures))
+    return plans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_connection_arguments(parser)
+    parser.add_argument("command", choices=["apply", "check"])
+    args = parser.parse_args()
+
+    db = connect(args)
+    if args.command == "apply":
+        apply(db, args.database)
+        print(f"{len(CONSTRAINTS)} constraints and {len(INDEXES)} indexes in place")
+    else:
+        try:
+            plans = check_plans(db, args.database)
+        except SchemaError as e:
+            raise SystemExit(str(e))
+        for name, operators in plans.items():
+            print(f"{name}: {', '.join(operators)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Search-as-you-type lookups for the recipe and user pickers.
+
+Search text is turned into word-prefix terms: "choc cak" matches names with
+a word starting with "choc" and a word starting with "cak". On Neo4j this
+runs against the full-text indexes created by `component.schema`
+(`search_recipes.cypher`, `search_users.cypher`); `NameIndex` gives the
+same matching in-process for `LocalDatabase`, using binary search over a
+sorted word list.
+"""
+
+import re
+
+import numpy as np
+
+# Searches shorter than this show the default list instead (first recipes
+# alphabetically, top users by reputation).
+MIN_SEARCH_LENGTH = 2
+# Matches offered in a picker.
+SEARCH_LIMIT = 50
+
+_WORD = re.compile(r"\w+")
+_FULLTEXT_TERM = re.compile(r"(\w+)\*")
+
+
+def search_terms(text: str) -> list:
+    """Lower-cased words of the search text; punctuation is dropped."""
+    return _WORD.findall((text or "").lower())
+
+
+def to_fulltext_query(text: str) -> str:
+    """Lucene query requiring a word-prefix match for every search term.
+
+    Only word characters survive `search_terms`, so no Lucene escaping is
+    needed. Returns "" when there is nothing to search for.
+    """
+    return " AND ".join(f"{term}*" for term in search_terms(text))
+
+
+def fulltext_terms(query: str) -> list:
+    """The search terms of a query built by `to_fulltext_query`."""
+    return _FULLTEXT_TERM.findall(query or "")
+
+
+class NameIndex():
+    """Sorted (word, name) index answering word-prefix searches by bisection.
+
+    `order` ranks names for display (e.g. alphabetical for recipes, by
+    reputation for users); matches are returned best-ranked first.
+    """
+
+    def __init__(self, names: np.ndarray, order: np.ndarray = None):
+        self.names = np.asarray(names, dtype=object)
+        self.rank = np.empty(len(self.names), dtype=np.int64)
+        self.rank[np.argsort(self.names.astype(str)) if order is None else order] = np.arange(len(self.names))
+        words, owners = [], []
+        for i, name in enumerate(self.names):
+            for word in set(search_terms(str(name))):
+                words.append(word)
+                owners.append(i)
+        words = np.array(words, dtype=str)
+        sort = np.argsort(words, kind="stable")
+        self.words = words[sort]
+        self.owners = np.array(owners, dtype=np.int64)[sort]
+
+    def _prefix_owners(self, term: str) -> np.ndarray:
+        start = np.searchsorted(self.words, term, side="left")
+        # Every word with this prefix sorts before term + the largest code point.
+        end = np.searchsorted(self.words, term + "\U0010ffff", side="left")
+        return np.unique(self.owners[start:end])
+
+    def search(self, terms: list, limit: int = SEARCH_LIMIT) -> np.ndarray:
+        """Indexes into `names` matching every term as a word prefix, best-ranked first."""
+        matches = None
+        for term in terms:
+            owners = self._prefix_owners(term)
+            matches = owners if matches is None else np.intersect1d(matches, owners, assume_unique=True)
+            if not len(matches):
+                break
+        if matches is None:
+            return np.array([], dtype=np.int64)
+        return matches[np.argsort(self.rank[matches])][:limit]
@@ -0,0 +1,322 @@
+"""Approximate reach and audience overlap from per-recipe sketches.
+
+Every recipe keeps two fixed-size summaries of its commenters:
+
+- a HyperLogLog sketch (2^11 = 2048 one-byte registers) for distinct counts.
+  Sketches merge by element-wise max, so a user's reach is estimated from
+  the union of the sketches of the recipes they commented on.
+- a MinHash signature (128 hash values) for Jaccard similarity. Similar
+  recipe candidates come from LSH banding (64 bands of 2 rows), then are
+  ranked by estimated shared commenters.
+
+Error bounds:
+
+- HyperLogLog: relative standard error 1.04 / sqrt(2048) = 2.3%, so about
+  95% of reach estimates are within 4.6% of the exact count. Counts below
+  5,120 use linear counting, which is more accurate.
+- MinHash: the Jaccard estimate J' has standard error sqrt(J (1 - J) / 128),
+  at most 0.044. The shared commenter estimate J' / (1 + J') * (|A| + |B|)
+  uses exact commenter counts and inherits J's relative error.
+- LSH: a recipe with Jaccard J is a candidate with probability
+  1 - (1 - J^2)^64: 47% at J = 0.1, 93% at J = 0.2, over 99% from J = 0.3.
+  Catalogs smaller than LSH_MIN_RECIPES skip banding and score every
+  recipe, as does a lookup where banding finds fewer candidates than
+  requested. Ranking by estimated shared commenters can still differ from
+  the exact ranking when those estimates are within their error.
+
+Sketches are built from (recipe, user) pairs by `RecipeSketches.from_pairs`,
+in memory by the local backend and by the `sketches` materialization stage
+(`write_sketches`) for Neo4j, where they are stored on RECIPE nodes. Its
+incremental refresh (`refresh_sketches`) re-sketches only the recipes that
+received new comments.
+
+`load` keeps the rebuilt sketches per backend and database until the graph's
+data version changes.
+"""
+
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from .database import concat_batches
+
+PRECISION = 11
+REGISTERS = 1 << PRECISION
+NUM_HASHES = 128
+BANDS = 64
+ROWS = NUM_HASHES // BANDS
+# Hash functions are chunked so memory stays at (pairs x HASH_CHUNK).
+HASH_CHUNK = 16
+SEED = 20240611
+WRITE_BATCH_SIZE = 1000
+# Below this many recipes, comparing every signature is cheaper than banding.
+LSH_MIN_RECIPES = 10_000
+
+SKETCH_COLUMNS = [
+    "recipe_code",
+    "recipe_name",
+    "commenter_count",
+    "commenter_minhash",
+    "commenter_hll",
+]
+SIMILAR_COLUMNS = ["recipe_name", "shared_commenter_count", "jaccard"]
+
+_rng = np.random.default_rng(SEED)
+_XOR = _rng.integers(0, 2**63, NUM_HASHES, dtype=np.uint64)
+# Odd multipliers for multiply-shift hashing.
+_MULTIPLY = _rng.integers(0, 2**63, NUM_HASHES, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_EMPTY = np.iinfo(np.uint32).max
+
+
+def hash_users(user_ids) -> np.ndarray:
+    """Stable 64-bit hashes of user IDs (the same in every process)."""
+    return pd.util.hash_array(np.asarray(user_ids, dtype=str).astype(object))
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    # uint32 values are exact in float64, so frexp's exponent is the bit length.
+    return np.frexp(values.astype(np.float64))[1]
+
+
+def _leading_zeros(values: np.ndarray) -> np.ndarray:
+    high = (values >> np.uint64(32)).astype(np.uint32)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+    return np.where(high > 0, 32 - _bit_length(high), 64 - _bit_length(low))
+
+
+def _group_starts(sorted_keys: np.ndarray) -> np.ndarray:
+    return np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+
+
+def hll_estimate(registers: np.ndarray) -> np.ndarray:
+    """Distinct count estimate of HyperLogLog registers (last axis)."""
+    registers = np.asarray(registers)
+    m = registers.shape[-1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)), axis=-1)
+    zeros = np.sum(registers == 0, axis=-1)
+    # Linear counting is more accurate for small cardinalities.
+    linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+
+class RecipeSketches():
+    """HyperLogLog registers and MinHash signatures for every recipe."""
+
+    def __init__(
+        self,
+        recipe_codes: np.ndarray,
+        recipe_names: np.ndarray,
+        commenter_counts: np.ndarray,
+        minhash: np.ndarray,
+        hll: np.ndarray,
+    ):
+        self.recipe_codes = np.asarray(recipe_codes)
+        self.recipe_names = np.asarray(recipe_names, dtype=object)
+        self.commenter_counts = np.asarray(commenter_counts, dtype=np.int64)
+        self.minhash = minhash
+        self.hll = hll
+        self._positions = pd.Series(np.arange(len(self.recipe_names))).groupby(self.recipe_names).first()
+
+        # LSH: one bucket key per band, and per band the recipes sorted by key.
+        band_keys = np.zeros((len(self.recipe_names), BANDS), dtype=np.uint64)
+        for row in range(ROWS):
+            band_keys = band_keys * np.uint64(0x100000001B3) + minhash[:, row::ROWS].astype(np.uint64)
+        self._band_keys = band_keys
+        self._band_order = np.argsort(band_keys, axis=0, kind="stable")
+        self._band_sorted = np.take_along_axis(band_keys, self._band_order, axis=0)
+
+    @classmethod
+    def from_pairs(
+        cls,
+        recipe_codes: np.ndarray,
+        recipe_names: np.ndarray,
+        pair_recipes: np.ndarray,
+        pair_user_hashes: np.ndarray,
+    ) -> "RecipeSketches":
+        """Sketch every recipe from (recipe position, user hash) comment pairs."""
+        n = len(recipe_codes)
+        pairs = pd.DataFrame({"recipe": pair_recipes, "user": pair_user_hashes}).drop_duplicates()
+        order = np.argsort(pairs["recipe"].to_numpy(), kind="stable")
+        recipes = pairs["recipe"].to_numpy()[order]
+        users = pairs["user"].to_numpy(dtype=np.uint64)[order]
+        starts = _group_starts(recipes)
+        present = recipes[starts]
+        counts = np.bincount(recipes, minlength=n)
+
+        # MinHash: minimum of each hash function over the recipe's commenters.
+        minhash = np.full((n, NUM_HASHES), _EMPTY, dtype=np.uint32)
+        if len(users):
+            for first in range(0, NUM_HASHES, HASH_CHUNK):
+                chunk = slice(first, first + HASH_CHUNK)
+                values = ((users[:, None] ^ _XOR[chunk]) * _MULTIPLY[chunk]) >> np.uint64(32)
+                minhash[present, chunk] = np.minimum.reduceat(values, starts, axis=0)
+
+        # HyperLogLog: register = top PRECISION bits, rank = leading zeros of the rest + 1.
+        hll = np.zeros((n, REGISTERS), dtype=np.uint8)
+        if len(users):
+            index = (users >> np.uint64(64 - PRECISION)).astype(np.int64)
+            rest = (users << np.uint64(PRECISION)) | np.uint64(1 << (PRECISION - 1))
+            rank = (_leading_zeros(rest) + 1).astype(np.uint8)
+            cells = recipes * REGISTERS + index
+            order = np.lexsort((rank, cells))
+            cells, rank = cells[order], rank[order]
+            last = np.r_[cells[1:] != cells[:-1], True]
+            hll.reshape(-1)[cells[last]] = rank[last]
+
+        return cls(recipe_codes, recipe_names, counts, minhash, hll)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "RecipeSketches":
+        """Rebuild from a `get_recipe_sketches.cypher` result."""
+        if df.empty:
+            return cls([], [], [], np.empty((0, NUM_HASHES), np.uint32), np.empty((0, REGISTERS), np.uint8))
+        minhash = np.array(df["commenter_minhash"].tolist(), dtype=np.uint32).reshape(-1, NUM_HASHES)
+        hll = np.frombuffer(b"".join(map(bytes, df["commenter_hll"])), dtype=np.uint8).reshape(-1, REGISTERS)
+        return cls(df["recipe_code"], df["recipe_name"], df["commenter_count"], minhash, hll)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "recipe_code": self.recipe_codes,
+                "recipe_name": self.recipe_names,
+                "commenter_count": self.commenter_counts,
+                "commenter_minhash": [row.astype(np.int64).tolist() for row in self.minhash],
+                "commenter_hll": [row.tobytes() for row in self.hll],
+            },
+            columns=SKETCH_COLUMNS,
+        )
+
+    def _position(self, recipe_name: str):
+        return self._positions.get(recipe_name)
+
+    def reach(self, recipe_names) -> float:
+        """Estimated distinct commenters over all of `recipe_names`."""
+        positions = [p for p in map(self._position, recipe_names) if p is not None]
+        if not positions:
+            return 0.0
+        return float(hll_estimate(self.hll[positions].max(axis=0)))
+
+    def candidates(self, position: int) -> np.ndarray:
+        """Recipes sharing at least one LSH band with the recipe at `position`."""
+        keys = self._band_keys[position]
+        left = [np.searchsorted(self._band_sorted[:, b], keys[b], side="left") for b in range(BANDS)]
+        right = [np.searchsorted(self._band_sorted[:, b], keys[b], side="right") for b in range(BANDS)]
+        found = [self._band_order[lo:hi, b] for b, (lo, hi) in enumerate(zip(left, right))]
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+    def similar(self, recipe_name: str, limit: int = 5) -> pd.DataFrame:
+        """Recipes with the most (estimated) shared commenters."""
+        position = self._position(recipe_name)
+        if position is None or self.commenter_counts[position] == 0:
+            # Typed like a full result, so callers can still round and format the columns.
+            return pd.DataFrame(
+                {
+                    "recipe_name": pd.Series(dtype=object),
+                    "shared_commenter_count": pd.Series(dtype=np.int64),
+                    "jaccard": pd.Series(dtype=float),
+                },
+                columns=SIMILAR_COLUMNS,
+            )
+        if len(self.recipe_names) >= LSH_MIN_RECIPES:
+            candidates = self.candidates(position)
+        else:
+            candidates = np.arange(len(self.recipe_names))
+        candidates = candidates[
+            (self.recipe_names[candidates] != recipe_name) & (self.commenter_counts[candidates] > 0)
+        ]
+        if len(candidates) < limit:
+            candidates = np.flatnonzero(
+                (self.recipe_names != recipe_name) & (self.commenter_counts > 0)
+            )
+        jaccard = (self.minhash[candidates] == self.minhash[position]).mean(axis=1)
+        shared = jaccard / (1 + jaccard) * (self.commenter_counts[candidates] + self.commenter_counts[position])
+        keep = shared > 0
+        candidates, jaccard, shared = candidates[keep], jaccard[keep], shared[keep]
+        order = np.lexsort((self.recipe_names[candidates].astype(str), -shared))[:limit]
+        return pd.DataFrame(
+            {
+                "recipe_name": self.recipe_names[candidates[order]],
+                "shared_commenter_count": np.round(shared[order]).astype(np.int64),
+                "jaccard": jaccard[order],
+            },
+            columns=SIMILAR_COLUMNS,
+        )
+
+
+# Backend -> {database: (data version, RecipeSketches)}. Decoding the sketches and
+# building the LSH tables costs far more than the cached query result.
+_loaded = weakref.WeakKeyDictionary()
+_loaded_lock = threading.Lock()
+
+
+def load(db, database: str) -> RecipeSketches:
+    """Recipe sketches from either backend, rebuilt only when the data version changes."""
+    version = db.data_version(database)
+    with _loaded_lock:
+        cached = _loaded.get(db, {}).get(database)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    sketches = RecipeSketches.from_frame(db.run_query("get_recipe_sketches.cypher", database))
+    with _loaded_lock:
+        _loaded.setdefault(db, {})[database] = (version, sketches)
+    return sketches
+
+
+def _write(db, database: str, pairs: pd.DataFrame):
+    """Sketch the recipes in a (recipe_code, recipe_name, user_id) frame and store them."""
+    recipes = pairs.drop_duplicates("recipe_code")
+    index = pd.Index(recipes["recipe_code"])
+    sketches = RecipeSketches.from_pairs(
+        recipes["recipe_code"].to_numpy(),
+        recipes["recipe_name"].to_numpy(),
+        index.get_indexer(pairs["recipe_code"]),
+        hash_users(pairs["user_id"]),
+    )
+    rows = sketches.to_frame().drop(columns="recipe_name").to_dict("records")
+    _write_rows(db, database, rows)
+
+
+def _write_rows(db, database: str, rows: list):
+    for start in range(0, len(rows), WRITE_BATCH_SIZE):
+        db.write("materialize/write_recipe_sketches.cypher", database, rows=rows[start:start + WRITE_BATCH_SIZE])
+
+
+def write_sketches(db, database: str):
+    """Sketch every recipe's commenters and store them on the RECIPE nodes."""
+    pairs = concat_batches(
+        db.stream_query("materialize/export_recipe_commenters.cypher", database, fetch_size=100_000)
+    )
+    if pairs.empty:
+        # No comments yet, so no recipe has a sketch to store.
+        return
+    _write(db, database, pairs)
+
+
+def refresh_sketches(db, database: str, recipe_codes: list):
+    """Re-sketch only the given recipes, e.g. those that received new comments.
+
+    A sketch depends only on its own recipe's commenters, so the others stay
+    valid. Given recipes without any commenters lose their sketch, as they
+    would in a full build.
+    """
+    pairs = concat_batches(
+        db.stream_query(
+            "materialize/export_commenters_of_recipes.cypher",
+            database,
+            fetch_size=100_000,
+            recipe_codes=recipe_codes,
+        )
+    )
+    sketched = set()
+    if not pairs.empty:
+        _write(db, database, pairs)
+        sketched = set(pairs["recipe_code"])
+    cleared = [
+        {"recipe_code": code, "commenter_count": None, "commenter_minhash": None, "commenter_hll": None}
+        for code in recipe_codes
+        if code not in sketched
+    ]
+    _write_rows(db, database, cleared)
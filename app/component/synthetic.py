@@ -0,0 +1,198 @@
+"""Synthetic, scaled-up versions of the recipe review dataset.
+
+Produces `recipe.csv`, `user.csv` and `comment.csv` in the same shape as
+`jupyter_nb/preprocess_data.ipynb`, at a multiple of the UCI dataset's
+size, with the skew that makes the real graph expensive to query:
+
+- recipe popularity follows a power law (a few recipes get most comments),
+- user activity is heavy-tailed (most users comment once),
+- reputation is mostly 0-1 with a long tail, correlated with activity,
+- stars are mostly 5 with a cluster of 0 (unrated),
+- `created_at` is in seconds, milliseconds, or mixed per recipe.
+
+Comments are generated and written in chunks, so memory stays bounded at
+large scales.
+
+Usage (from `app/`):
+
+    python -m component.synthetic ../data/synthetic_x10 --scale 10
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Approximate size of the UCI dataset at scale 1.
+BASE_RECIPES = 100
+BASE_USERS = 13_800
+BASE_COMMENTS = 18_200
+
+# Power-law exponents for recipe popularity and user activity.
+RECIPE_ZIPF = 1.1
+USER_ZIPF = 0.9
+
+# created_at range: 2020-01-01 to 2023-01-01, in seconds.
+START_TIME = 1_577_836_800
+END_TIME = 1_672_531_200
+
+TIMESTAMP_UNITS = ("s", "ms", "mixed")
+CHUNK_SIZE = 500_000
+
+_WORDS = np.array(
+    "easy delicious quick family favorite creamy spicy sweet simple perfect "
+    "loved added extra less more bake cook minutes recipe again next time "
+    "great flavor texture kids dinner".split()
+)
+_DISHES = np.array(
+    "Chili Soup Cake Bread Cookies Casserole Salad Pie Muffins Stew Pasta "
+    "Curry Tacos Brownies Lasagna Pancakes Risotto Meatloaf Cobbler Dip".split()
+)
+_ADJECTIVES = np.array(
+    "Creamy White Spicy Easy Classic Grandma's Slow-Cooker Baked Cheesy "
+    "Lemon Garlic Honey Chocolate Best Quick Rustic Smoky Fresh".split()
+)
+
+
+def _zipf_weights(count: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+
+def sizes(scale: float) -> dict:
+    """Row counts for a scale factor."""
+    return {
+        "recipes": max(1, int(BASE_RECIPES * scale)),
+        "users": max(1, int(BASE_USERS * scale)),
+        "comments": max(1, int(BASE_COMMENTS * scale)),
+    }
+
+
+def generate_recipes(count: int, rng: np.random.Generator) -> pd.DataFrame:
+    names = (
+        pd.Series(rng.choice(_ADJECTIVES, count))
+        + " "
+        + pd.Series(rng.choice(_DISHES, count))
+        + " #"
+        + pd.Series(np.arange(1, count + 1)).astype(str)
+    )
+    return pd.DataFrame(
+        {
+            "recipe_number": np.arange(1, count + 1),
+            "recipe_code": 10_000 + rng.permutation(count * 10)[:count],
+            "recipe_name": names,
+        }
+    )
+
+
+def generate_users(count: int, rng: np.random.Generator) -> pd.DataFrame:
+    # Users are generated in activity order (user 0 is the most active), so
+    # reputation can follow activity: geometric for the bulk, larger for the head.
+    activity_rank = np.arange(count)
+    reputation = rng.geometric(0.7, count) - 1
+    head = activity_rank < max(1, count // 100)
+    reputation[head] += rng.pareto(1.5, head.sum()).astype(np.int64) * 10
+    return pd.DataFrame(
+        {
+            "user_id": pd.Series(activity_rank).map(lambda i: f"u_{i:010d}"),
+            "user_name": pd.Series(rng.choice(_WORDS, count)).str.capitalize()
+            + pd.Series(activity_rank).astype(str),
+            "user_reputation": reputation,
+        }
+    )
+
+
+def generate_comments(
+    recipes: pd.DataFrame,
+    users: pd.DataFrame,
+    count: int,
+    rng: np.random.Generator,
+    timestamp_unit: str = "s",
+    chunk_size: int = CHUNK_SIZE,
+):
+    """Yield comment DataFrames of up to `chunk_size` rows."""
+    if timestamp_unit not in TIMESTAMP_UNITS:
+        raise ValueError(f"timestamp_unit must be one of {TIMESTAMP_UNITS}")
+    recipe_weights = _zipf_weights(len(recipes), RECIPE_ZIPF)
+    # Popularity rank is independent of recipe_number.
+    recipe_order = rng.permutation(len(recipes))
+    user_weights = _zipf_weights(len(users), USER_ZIPF)
+    recipe_codes = recipes["recipe_code"].to_numpy()
+    user_ids = users["user_id"].to_numpy()
+    # Each recipe is published at some point and collects comments afterwards.
+    published = rng.integers(START_TIME, END_TIME - 86_400 * 30, len(recipes))
+    if timestamp_unit == "mixed":
+        in_ms = rng.random(len(recipes)) < 0.5
+    else:
+        in_ms = np.full(len(recipes), timestamp_unit == "ms")
+
+    for start in range(0, count, chunk_size):
+        n = min(chunk_size, count - start)
+        recipe = recipe_order[rng.choice(len(recipes), n, p=recipe_weights)]
+        user = rng.choice(len(users), n, p=user_weights)
+        created = published[recipe] + (rng.exponential(0.25, n) * (END_TIME - published[recipe])).astype(np.int64)
+        created = np.minimum(created, END_TIME)
+        created = np.where(in_ms[recipe], created * 1000 + rng.integers(0, 1000, n), created)
+        stars = rng.choice([0, 1, 2, 3, 4, 5], n, p=[0.09, 0.01, 0.02, 0.03, 0.1, 0.75])
+        yield pd.DataFrame(
+            {
+                "comment_id": [f"sp_{recipe_codes[r]}_c_{start + i:012d}" for i, r in enumerate(recipe)],
+                "recipe_code": recipe_codes[recipe],
+                "user_id": user_ids[user],
+                "created_at": created,
+                "reply_count": rng.geometric(0.85, n) - 1,
+                "thumbs_up": rng.geometric(0.4, n) - 1,
+                "thumbs_down": rng.geometric(0.8, n) - 1,
+                "stars": stars,
+                "best_score": np.where(rng.random(n) < 0.8, 100, rng.integers(100, 900, n)),
+                "text": [" ".join(words) for words in rng.choice(_WORDS, (n, 6))],
+            }
+        )
+
+
+def generate(scale: float = 1, seed: int = 0, timestamp_unit: str = "s") -> tuple:
+    """(recipes, users, comments) DataFrames for `scale`, held in memory."""
+    rng = np.random.default_rng(seed)
+    counts = sizes(scale)
+    recipes = generate_recipes(counts["recipes"], rng)
+    users = generate_users(counts["users"], rng)
+    comments = pd.concat(
+        generate_comments(recipes, users, counts["comments"], rng, timestamp_unit),
+        ignore_index=True,
+    )
+    return recipes, users, comments
+
+
+def write_csv_dir(output_dir, scale: float = 1, seed: int = 0, timestamp_unit: str = "s") -> dict:
+    """Write recipe.csv, user.csv and comment.csv for `scale`; returns row counts."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    counts = sizes(scale)
+    recipes = generate_recipes(counts["recipes"], rng)
+    users = generate_users(counts["users"], rng)
+    recipes.to_csv(output_dir / "recipe.csv", index=False)
+    users.to_csv(output_dir / "user.csv", index=False)
+    with open(output_dir / "comment.csv", "w", newline="", encoding="utf-8") as f:
+        for i, chunk in enumerate(
+            generate_comments(recipes, users, counts["comments"], rng, timestamp_unit)
+        ):
+            chunk.to_csv(f, header=i == 0, index=False)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output_dir")
+    parser.add_argument("--scale", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timestamp-unit", choices=TIMESTAMP_UNITS, default="s")
+    args = parser.parse_args()
+
+    counts = write_csv_dir(args.output_dir, args.scale, args.seed, args.timestamp_unit)
+    print(", ".join(f"{count:,} {name}" for name, count in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
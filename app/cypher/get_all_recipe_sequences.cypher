@@ -0,0 +1,12 @@
+//
+// Purpose: Retrieves every user's chronological recipe sequence for offline pattern mining
+// (see component/patterns.py).
+//
+// Returns:
+// - recipe_sequence: Distinct recipe names the user commented on, in order of their first comment on each.
+//
+
+MATCH (u:USER)
+WHERE size(u.recipe_sequence) > 0
+RETURN u.recipe_sequence AS recipe_sequence
+;
@@ -7,11 +7,14 @@
  * community groups, making them valuable for cross-community insights and recommendations.
  * 
  * Algorithm Flow:
- * 1. Runs Louvain community detection on the 'userCoComment' projected graph
- * 2. Samples up to 5 members from each community
+ * 1. Reads the communities written as USER.communityId by the `tribes` materialization stage
+ * 2. Samples up to 5 members from each of the $limit largest communities
  * 3. Finds recipes commented on by sampled members
  * 4. Identifies users appearing in 2+ communities (bridge users)
  * 
+ * Parameters:
+ * - $limit: Number of communities considered, largest first (matches get_tribes.cypher).
+ * 
  * Returns:
  * A deduplicated list of bridge users (user_name) who connect multiple communities.
  * - Column: user_name (string) - Username of bridge users
@@ -20,22 +23,22 @@
  * Bridge users are key influencers for community analysis and recommendation systems.
  */
 
-// Step 1: Run Louvain community detection and stream results with node IDs and community assignments
-CALL gds.louvain.stream('userCoComment')
-YIELD nodeId, communityId
-// Convert nodeId (internal graph ID) back to actual database node with user properties
-
-WITH gds.util.asNode(nodeId) AS user, communityId
-// Sort by community and user name to prepare for sampling
-ORDER BY communityId, user.user_name
+// Step 1: Read users with a community assignment (index scan on communityId)
+MATCH (user:USER)
+WHERE user.communityId IS NOT NULL
+WITH user
+// Sort by user name to prepare for sampling
+ORDER BY user.user_name
 
-// Group users by their community membership
-WITH communityId, collect(user) AS users
+// Group users by their community membership and keep the largest communities
+WITH user.communityId AS communityId, collect(user) AS users
+ORDER BY size(users) DESC, communityId
+LIMIT $limit
 // Sample up to 5 users from each community (to avoid bias from large communities)
 UNWIND users[0..5] AS user
 
 // Find recipes that sampled users have commented on
-OPTIONAL MATCH (user)-[:POSTED]-(:COMMENT)-[:BELONGS_TO]->(r:RECIPE)
+OPTIONAL MATCH (user)-[:POSTED]->(:COMMENT)-[:BELONGS_TO]->(r:RECIPE)
 
 // Count how many distinct communities have interacted with each recipe
 // Bridge users will appear on recipes linked to multiple communities
@@ -46,5 +49,5 @@ WHERE tribe_count >= 2
 UNWIND users AS user
 
 RETURN DISTINCT user.user_name AS user_name
-ORDER BY user.user_name
-;
\ No newline at end of file
+ORDER BY user_name
+;
@@ -18,7 +18,7 @@
 MATCH (r:RECIPE) <- [:BELONGS_TO] - (c:COMMENT) - [:POSTED] - (u:USER)
 
 // Filter for only the specified user by matching their username parameter
-WHERE u.user_name = '{user}'
+WHERE u.user_name = $user
 
 // Project the relevant fields from the comment and recipe nodes, aliased for clarity
 RETURN c.text AS comment, c.thumbs_up AS thumbs_up, c.created_at AS created_at, r.recipe_name AS recipe
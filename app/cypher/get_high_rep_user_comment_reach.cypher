@@ -6,6 +6,13 @@
 //  * finding all other users who have engaged in the same recipe comment conversations. This reveals
 //  * key network hubs where influential users drive community engagement.
 //  * 
+//  * The top N users are read from the materialized `reputation_rank` index
+//  * (see materialize/build_reputation_rank.cypher) instead of sorting every user.
+//  * 
+//  * Co-commenters are read from the materialized CO_COMMENTED relationships
+//  * (see materialize/build_co_commented.cypher), so the cost per user is their degree rather
+//  * than the combined audience of every recipe they commented on.
+//  * 
 //  * RETURNS (for each high-reputation user):
 //  *   - user_name: Name of the high-reputation user
 //  *   - user_reputation: Reputation score of the high-reputation user
@@ -14,25 +21,28 @@
 //  *   - users_reached: List of usernames of influenced users
 //  */
 
-// STAGE 1: Identify the top N highest-reputation users, ordered by their reputation score descending
+// STAGE 1: Identify the top N highest-reputation users with a range seek on their reputation rank
 MATCH (top_users:USER)
-ORDER BY top_users.user_reputation DESC
-LIMIT {n}
+WHERE top_users.reputation_rank <= $n
 
-// STAGE 2: For each high-reputation user, find all other users in the same recipe comment network
-WITH top_users
-// Pattern: OTHER_USER -> posts COMMENT -> belongs to RECIPE <- commented by TOP_USER
-// This identifies users who have commented on recipes that the high-reputation user also commented on
-MATCH (u:USER) - [:POSTED] - (:COMMENT) - [:BELONGS_TO] -> (r:RECIPE) <- [:BELONGS_TO] - (:COMMENT) - [:POSTED] - (top_users)
+// STAGE 2: For each high-reputation user, read the users they share at least one recipe with
+MATCH (top_users) - [:CO_COMMENTED] - (u:USER)
+WITH top_users,
+    count(u) AS reach,                                   // Number of other users in the same conversation network
+    collect(u.user_name) AS users_reached                // List of those other users (network members)
 
-// Exclude the high-reputation user themselves from the reach count
-WHERE u.user_id <> top_users.user_id
+// STAGE 3: Collect the recipes commented on by the high-reputation user
+CALL {
+    WITH top_users
+    MATCH (top_users) - [:POSTED] - (:COMMENT) - [:BELONGS_TO] -> (r:RECIPE)
+    RETURN collect(DISTINCT r.recipe_name) AS recipe_name
+}
 
-// STAGE 3: Aggregate and return results grouped by high-reputation user
 RETURN 
     top_users.user_name, 
     top_users.user_reputation,
-    collect(DISTINCT r.recipe_name) AS recipe_name,      // All recipes commented on by the high-rep user
-    count(DISTINCT u.user_name) AS reach,                // Number of other users in the same conversation network
-    collect(DISTINCT u.user_name) AS users_reached       // List of those other users (network members)
+    recipe_name,
+    reach,
+    users_reached
+ORDER BY top_users.reputation_rank
 ;
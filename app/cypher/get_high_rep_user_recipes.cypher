@@ -0,0 +1,27 @@
+//
+// Purpose: Lists the recipes each of the top N highest-reputation users has commented on. In the
+// approximate mode of the Influential Commenter page, a user's reach is estimated from the union
+// of these recipes' HyperLogLog sketches instead of counting co-commenters.
+//
+// Parameters:
+// - $n: Number of top users, by the materialized reputation_rank.
+//
+// Returns:
+// - user_name, user_reputation: The high-reputation user.
+// - recipe_name: List of recipes the user has commented on.
+//
+
+// Step 1: Range seek on the reputation rank for the top N users.
+MATCH (top_users:USER)
+WHERE top_users.reputation_rank <= $n
+
+// Step 2: Collect each user's distinct recipes.
+MATCH (top_users) - [:POSTED] -> (:COMMENT) - [:BELONGS_TO] -> (r:RECIPE)
+WITH top_users, collect(DISTINCT r.recipe_name) AS recipe_name
+
+RETURN
+    top_users.user_name AS user_name,
+    top_users.user_reputation AS user_reputation,
+    recipe_name
+ORDER BY top_users.reputation_rank
+;
@@ -0,0 +1,51 @@
+//
+// Purpose: Ranks every recipe by "influencer lift": how much more engagement (reply_count + thumbs_up)
+// comments receive on average after the recipe's first 5-star comment from a top-100 reputation user,
+// compared with the comments posted up to that point. This is the batch form of
+// get_reply_count_thumbs_up.cypher, read from the same precomputed engagement index.
+//
+// Returns:
+// - recipe: The name of the recipe.
+// - user: The username of the high-reputation user who posted the pivot comment.
+// - created_at: The timestamp of the pivot comment.
+// - comments_before / comments_after: Comments posted at or before / after the pivot.
+// - total_reply_count / total_thumbs_up: Sums over the comments posted after the pivot.
+// - engagement_before / engagement_after: Average reply_count + thumbs_up per comment.
+// - lift: engagement_after / engagement_before (null when nothing before the pivot was engaged with).
+//
+
+// Step 1: Every recipe with a pivot comment, and the author of that comment.
+MATCH (r:RECIPE)
+WHERE r.pivot_comment_id IS NOT NULL
+MATCH (top_user:USER) - [:POSTED] -> (c1:COMMENT {comment_id: r.pivot_comment_id})
+
+// Step 2: Split the running sums at the pivot.
+WITH r, top_user, c1,
+    r.pivot_position AS comments_before,
+    size(r.comment_times) - r.pivot_position AS comments_after,
+    r.cumulative_reply_count[r.pivot_position - 1] AS replies_before,
+    r.cumulative_thumbs_up[r.pivot_position - 1] AS thumbs_up_before
+WITH r, top_user, c1, comments_before, comments_after,
+    (replies_before + thumbs_up_before) * 1.0 / comments_before AS engagement_before,
+    last(r.cumulative_reply_count) - replies_before AS total_reply_count,
+    last(r.cumulative_thumbs_up) - thumbs_up_before AS total_thumbs_up
+WITH r, top_user, c1, comments_before, comments_after, total_reply_count, total_thumbs_up,
+    engagement_before,
+    CASE WHEN comments_after > 0
+        THEN (total_reply_count + total_thumbs_up) * 1.0 / comments_after
+        ELSE 0.0 END AS engagement_after
+
+// Step 3: Rank recipes by lift; recipes without a defined lift go last.
+RETURN
+    r.recipe_name AS recipe,
+    top_user.user_name AS user,
+    c1.created_at AS created_at,
+    comments_before,
+    comments_after,
+    total_reply_count,
+    total_thumbs_up,
+    engagement_before,
+    engagement_after,
+    CASE WHEN engagement_before > 0 THEN engagement_after / engagement_before END AS lift
+ORDER BY lift IS NULL, lift DESC, recipe
+;
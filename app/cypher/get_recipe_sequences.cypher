@@ -0,0 +1,18 @@
+//
+// Purpose: Retrieves the chronological recipe sequences of all users who commented on a given recipe
+// and on at least one other recipe. These are the input to frequent sub-path mining on the
+// User Recipe Commenting Paths page (see component/patterns.py).
+//
+// Returns:
+// - recipe_sequence: Distinct recipe names the user commented on, in order of their first comment on each.
+//
+
+// Step 1: Find all users who commented on the target recipe.
+MATCH (r1:RECIPE) <- [:BELONGS_TO] - (:COMMENT) - [:POSTED] - (u:USER)
+WHERE r1.recipe_name = $recipe
+WITH DISTINCT u
+
+// Step 2: Return the sequences of users who have moved on to other recipes.
+WHERE size(u.recipe_sequence) > 1
+RETURN u.recipe_sequence AS recipe_sequence
+;
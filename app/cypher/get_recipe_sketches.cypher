@@ -0,0 +1,23 @@
+//
+// Purpose: Reads the commenter sketches of every recipe for the approximate modes of the
+// Influential Commenter and Recipe Similarity pages (see component/sketches.py). Sketches are
+// fixed size, so this result grows with the number of recipes, not the number of comments.
+// They are written by the `sketches` materialization stage.
+//
+// Returns:
+// - recipe_code, recipe_name: The recipe.
+// - commenter_count: Exact number of distinct commenters.
+// - commenter_minhash: MinHash signature of the commenters (128 integers).
+// - commenter_hll: HyperLogLog registers of the commenters (2048 bytes).
+//
+
+MATCH (r:RECIPE)
+WHERE r.commenter_minhash IS NOT NULL
+RETURN
+    r.recipe_code AS recipe_code,
+    r.recipe_name AS recipe_name,
+    r.commenter_count AS commenter_count,
+    r.commenter_minhash AS commenter_minhash,
+    r.commenter_hll AS commenter_hll
+ORDER BY r.recipe_code
+;
@@ -4,6 +4,13 @@
 // It then calculates the total number of replies and thumbs-up on all subsequent comments for that same recipe,
 // to measure the engagement lift following a positive review from an influential user.
 //
+// The pivot comment and per-recipe running sums are precomputed by the `engagement_index`
+// materialization stage (see materialize/build_engagement_index.cypher), so the totals are a
+// subtraction of two prefix sums rather than a scan of the recipe's comments.
+//
+// Parameters:
+// - $recipe: The name of the recipe to analyze.
+//
 // Returns:
 // - user: The username of the high-reputation user.
 // - user_reputation: The reputation score of that user.
@@ -13,30 +20,23 @@
 // - total_thumbs_up: The sum of thumbs-up for all comments posted *after* the influential comment.
 //
 
-// Step 1: Identify the top 100 users by reputation score. These are considered our "influencers".
-MATCH (top_users:USER)
-ORDER BY top_users.user_reputation DESC
-LIMIT 100
+// Step 1: Find the recipe and check that at least one comment was posted after its pivot comment.
+MATCH (r:RECIPE)
+WHERE r.recipe_name = $recipe
+AND r.pivot_position < size(r.comment_times)
 
-// Step 2: Find the earliest 5-star comment (`c1`) on a specific recipe posted by one of our top users.
-// This comment acts as a temporal anchor or "pivot point" for our analysis.
-MATCH (r:RECIPE) <- [:BELONGS_TO] - (c1:COMMENT) - [:POSTED] - (top_users)
-WHERE c1.stars = 5
-AND r.recipe_name = '{recipe}'
-ORDER BY c1.created_at
-LIMIT 1
+// Step 2: Look up the pivot comment and its author through the comment_id constraint.
+MATCH (top_user:USER) - [:POSTED] -> (c1:COMMENT {comment_id: r.pivot_comment_id})
 
-// Step 3: Gather all comments (`c2`) on the same recipe that were posted *after* the influential 5-star comment.
-MATCH (r) <- [:BELONGS_TO] - (c2:COMMENT) 
-WHERE c2.created_at > c1.created_at
-
-// Step 4: Return details of the influential user and their comment, along with aggregated engagement metrics from all subsequent comments.
-RETURN 
-    top_users.user_name AS user,
-    top_users.user_reputation AS user_reputation,
+// Step 3: Return details of the influential user and their comment. Engagement after the pivot is the
+// recipe's final running total minus the running total at the pivot.
+RETURN
+    top_user.user_name AS user,
+    top_user.user_reputation AS user_reputation,
     c1.text AS comment,
     c1.created_at AS created_at,
-    // Sum the engagement metrics from all comments that came after the influencer's comment.
-    SUM(c2.reply_count) AS total_reply_count, 
-    SUM(c2.thumbs_up) AS total_thumbs_up
-;
\ No newline at end of file
+    last(r.cumulative_reply_count) - r.cumulative_reply_count[r.pivot_position - 1] AS total_reply_count,
+    last(r.cumulative_thumbs_up) - r.cumulative_thumbs_up[r.pivot_position - 1] AS total_thumbs_up
+ORDER BY c1.created_at
+LIMIT 1
+;
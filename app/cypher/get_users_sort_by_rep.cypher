@@ -1,15 +1,23 @@
 //
-// Purpose: This query retrieves a list of all users in the database, sorted by their reputation score in descending order.
+// Purpose: This query retrieves the top users in the database, sorted by their reputation score in descending order.
 // It's a straightforward way to generate a user leaderboard or identify the most reputable users in the system for analysis.
 //
+// Users are read in order from the `reputation_rank` index (see materialize/build_reputation_rank.cypher),
+// so only the first $limit users are touched rather than sorting every user.
+//
+// Parameters:
+// - $limit: The number of users to return.
+//
 // Returns:
 // - user_name: The username of the user.
 // - user_reputation: The reputation score of the user.
 //
 
-// Find all nodes with the label 'USER'.
+// Find the highest-ranked users through the rank index.
 MATCH (u:USER)
+WHERE u.reputation_rank <= $limit
 // Return the username and reputation for each user.
 RETURN u.user_name AS user_name, u.user_reputation AS user_reputation
-// Order the results by reputation in descending order (highest first) to create a ranked list.
-ORDER BY u.user_reputation DESC
\ No newline at end of file
+// Order the results by rank (highest reputation first) to create a ranked list.
+ORDER BY u.reputation_rank
+;
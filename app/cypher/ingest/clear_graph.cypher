@@ -0,0 +1,14 @@
+//
+// Purpose: Deletes every node and relationship so a dataset can be loaded from scratch,
+// e.g. before loading a different scale of synthetic data in component.benchmark.
+// Deletes run in batches so large graphs don't exhaust transaction memory.
+//
+// Returns: nothing.
+//
+
+MATCH (n)
+CALL {
+    WITH n
+    DETACH DELETE n
+} IN TRANSACTIONS OF 10000 ROWS
+;
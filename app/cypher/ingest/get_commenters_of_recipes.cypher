@@ -0,0 +1,16 @@
+//
+// Purpose: Finds everyone who commented on a batch of recipes. An incremental ingest uses it for
+// renamed recipes: USER.recipe_sequence stores recipe names, so all of their commenters need a
+// refresh, not only the authors of new comments.
+//
+// Parameters:
+// - $recipe_codes: recipe_code of every renamed recipe.
+//
+// Returns:
+// - user_id: one row per distinct commenter.
+//
+
+UNWIND $recipe_codes AS recipe_code
+MATCH (:RECIPE {recipe_code: recipe_code}) <- [:BELONGS_TO] - (:COMMENT) <- [:POSTED] - (u:USER)
+RETURN DISTINCT u.user_id AS user_id
+;
@@ -0,0 +1,32 @@
+//
+// Purpose: Reads the comments posted since a point in time, so an incremental ingest can tell
+// which incoming comments are new or changed. Comments stored in seconds and in milliseconds
+// are read by two range seeks on the created_at index.
+//
+// Parameters:
+// - $since_ms: Start of the window, in milliseconds.
+// - $since_s: The same instant in seconds.
+//
+// Returns one row per comment:
+// - comment_id, created_at, reply_count, thumbs_up, thumbs_down, stars, best_score, text
+//
+
+CALL {
+    MATCH (c:COMMENT)
+    WHERE c.created_at >= $since_ms
+    RETURN c
+  UNION
+    MATCH (c:COMMENT)
+    WHERE $since_s <= c.created_at < 100000000000
+    RETURN c
+}
+RETURN
+    c.comment_id AS comment_id,
+    c.created_at AS created_at,
+    c.reply_count AS reply_count,
+    c.thumbs_up AS thumbs_up,
+    c.thumbs_down AS thumbs_down,
+    c.stars AS stars,
+    c.best_score AS best_score,
+    c.text AS text
+;
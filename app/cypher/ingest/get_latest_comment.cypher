@@ -0,0 +1,26 @@
+//
+// Purpose: Finds the latest comment in the graph, used as the starting watermark when the data
+// was loaded by a full ingest. created_at is in seconds for some recipes and in milliseconds for
+// others, so the latest comment of each unit is returned and compared after conversion.
+// Values from 100000000000 up are milliseconds (in seconds, that is thousands of years away).
+//
+// Returns (up to 2 rows):
+// - created_at: created_at of the latest comment, in its own unit.
+// - comment_id: Its comment_id.
+//
+
+CALL {
+    MATCH (c:COMMENT)
+    WHERE c.created_at >= 100000000000
+    RETURN c
+    ORDER BY c.created_at DESC, c.comment_id DESC
+    LIMIT 1
+  UNION
+    MATCH (c:COMMENT)
+    WHERE c.created_at < 100000000000
+    RETURN c
+    ORDER BY c.created_at DESC, c.comment_id DESC
+    LIMIT 1
+}
+RETURN c.created_at AS created_at, c.comment_id AS comment_id
+;
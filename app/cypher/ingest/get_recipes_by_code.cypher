@@ -0,0 +1,15 @@
+//
+// Purpose: Reads the stored properties of a batch of recipes, so an incremental ingest only
+// writes recipes that are new or changed.
+//
+// Parameters:
+// - $recipe_codes: recipe_code of every incoming recipe.
+//
+// Returns one row per recipe already in the graph:
+// - recipe_code, recipe_number, recipe_name
+//
+
+UNWIND $recipe_codes AS recipe_code
+MATCH (r:RECIPE {recipe_code: recipe_code})
+RETURN r.recipe_code AS recipe_code, r.recipe_number AS recipe_number, r.recipe_name AS recipe_name
+;
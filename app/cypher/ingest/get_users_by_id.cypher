@@ -0,0 +1,15 @@
+//
+// Purpose: Reads the stored properties of a batch of users, so an incremental ingest only
+// writes users that are new or changed.
+//
+// Parameters:
+// - $user_ids: user_id of every incoming user.
+//
+// Returns one row per user already in the graph:
+// - user_id, user_name, user_reputation
+//
+
+UNWIND $user_ids AS user_id
+MATCH (u:USER {user_id: user_id})
+RETURN u.user_id AS user_id, u.user_name AS user_name, u.user_reputation AS user_reputation
+;
@@ -0,0 +1,15 @@
+//
+// Purpose: Reads an incremental ingest watermark: the latest comment loaded by
+// `python -m component.ingest --incremental`.
+//
+// Parameters:
+// - $name: Watermark name, e.g. "comments".
+//
+// Returns:
+// - created_at_ms: created_at of the latest ingested comment, in milliseconds.
+// - comment_id: Its comment_id, which breaks ties between comments with the same created_at.
+//
+
+MATCH (w:INGEST_WATERMARK {name: $name})
+RETURN w.created_at_ms AS created_at_ms, w.comment_id AS comment_id
+;
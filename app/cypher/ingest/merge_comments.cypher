@@ -0,0 +1,26 @@
+//
+// Purpose: Creates or updates a batch of COMMENT nodes together with their POSTED and BELONGS_TO
+// relationships, so each comment row is written in a single pass. Users and recipes are matched by
+// ID and must already exist (merge_users.cypher and merge_recipes.cypher run first); rows whose user
+// or recipe is missing are skipped entirely. Loading with cypher/ingest_csv.cypher differs: it
+// merges every COMMENT node first and only skips the relationships, leaving orphan comments.
+//
+// Parameters:
+// - $rows: List of maps with comment_id, user_id, recipe_code and a `properties` map holding
+//   created_at, reply_count, thumbs_up, thumbs_down, stars, best_score and text.
+//
+// Returns:
+// - written: Number of rows written; the rest of the batch was skipped.
+//
+
+UNWIND $rows AS row
+MATCH (u:USER {user_id: row.user_id})
+MATCH (r:RECIPE {recipe_code: row.recipe_code})
+MERGE (c:COMMENT {comment_id: row.comment_id})
+SET c += row.properties,
+    c.user_id = row.user_id,
+    c.recipe_code = row.recipe_code
+MERGE (u) - [:POSTED] -> (c)
+MERGE (c) - [:BELONGS_TO] -> (r)
+RETURN count(c) AS written
+;
@@ -0,0 +1,12 @@
+//
+// Purpose: Creates or updates a batch of RECIPE nodes. Used by `python -m component.ingest`.
+//
+// Parameters:
+// - $rows: List of maps with recipe_code, recipe_number and recipe_name.
+//
+
+UNWIND $rows AS row
+MERGE (r:RECIPE {recipe_code: row.recipe_code})
+SET r.recipe_number = row.recipe_number,
+    r.recipe_name = row.recipe_name
+;
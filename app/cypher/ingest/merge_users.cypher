@@ -0,0 +1,12 @@
+//
+// Purpose: Creates or updates a batch of USER nodes. Used by `python -m component.ingest`.
+//
+// Parameters:
+// - $rows: List of maps with user_id, user_name and user_reputation.
+//
+
+UNWIND $rows AS row
+MERGE (u:USER {user_id: row.user_id})
+SET u.user_name = row.user_name,
+    u.user_reputation = row.user_reputation
+;
@@ -0,0 +1,14 @@
+//
+// Purpose: Stores an incremental ingest watermark once a delta has been written.
+//
+// Parameters:
+// - $name: Watermark name, e.g. "comments".
+// - $created_at_ms: created_at of the latest ingested comment, in milliseconds.
+// - $comment_id: Its comment_id.
+//
+
+MERGE (w:INGEST_WATERMARK {name: $name})
+SET w.created_at_ms = $created_at_ms,
+    w.comment_id = $comment_id,
+    w.updated_at = datetime()
+;
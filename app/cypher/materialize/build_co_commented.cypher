@@ -0,0 +1,27 @@
+//
+// Purpose: Materializes a weighted CO_COMMENTED relationship between every pair of users who
+// have commented on at least one common recipe. Reach queries then read a user's co-commenters
+// directly instead of expanding USER -> COMMENT -> RECIPE <- COMMENT <- USER on every request.
+//
+// Each pair is stored once, directed from the lower user_id to the higher one, and should be
+// matched without direction: (u1) - [:CO_COMMENTED] - (u2).
+//
+// Properties:
+// - shared_recipes: Number of distinct recipes both users have commented on.
+//
+// Run clear_co_commented.cypher first; this query creates relationships without checking for
+// existing ones.
+//
+
+// Step 1: Walk users one at a time so each batch only holds one user's neighbourhood.
+MATCH (u1:USER)
+CALL {
+    WITH u1
+    // Step 2: Find other users on the same recipes. Keeping only u1.user_id < u2.user_id
+    // visits each pair from one side, so every pair is counted and created once.
+    MATCH (u1) - [:POSTED] -> (:COMMENT) - [:BELONGS_TO] -> (r:RECIPE) <- [:BELONGS_TO] - (:COMMENT) <- [:POSTED] - (u2:USER)
+    WHERE u1.user_id < u2.user_id
+    WITH u1, u2, count(DISTINCT r) AS shared_recipes
+    CREATE (u1) - [:CO_COMMENTED {shared_recipes: shared_recipes}] -> (u2)
+} IN TRANSACTIONS OF 1000 ROWS
+;
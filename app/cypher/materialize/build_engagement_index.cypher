@@ -0,0 +1,48 @@
+//
+// Purpose: Builds the prefix-sum engagement index behind the Impact of High-Rated Comments page.
+// For every recipe it stores its comments' timestamps in chronological order together with running
+// totals of reply_count and thumbs_up, plus the "pivot": the first 5-star comment by one of the
+// :INFLUENCER users (the top users by reputation). The engagement of all comments posted after the
+// pivot (or after any other moment) is then one subtraction instead of a scan over the recipe's comments:
+//
+//     after = last(cumulative) - cumulative[pivot_position - 1]
+//
+// Properties written on each RECIPE:
+// - comment_times: created_at of every comment, ascending (ties broken by comment_id).
+// - cumulative_reply_count / cumulative_thumbs_up: running sums aligned with comment_times.
+// - pivot_comment_id: comment_id of the pivot comment (removed if the recipe has none).
+// - pivot_position: number of comments posted at or before the pivot.
+//
+// The pivot depends on the :INFLUENCER set, so a change in reputations calls for a full rebuild;
+// new comments only need refresh_engagement_index.cypher.
+//
+
+// Step 1: Read the high-reputation users (the :INFLUENCER label maintained by label_influencers.cypher).
+MATCH (top_user:INFLUENCER)
+WITH collect(top_user.user_id) AS top_user_ids
+
+// Step 2: Process recipes in batches so each transaction holds a bounded number of comments.
+MATCH (r:RECIPE)
+CALL {
+    WITH r, top_user_ids
+    // Step 3: Walk the recipe's comments in chronological order, flagging pivot candidates.
+    MATCH (r) <- [:BELONGS_TO] - (c:COMMENT)
+    OPTIONAL MATCH (author:USER) - [:POSTED] -> (c)
+    WITH r, c, c.stars = 5 AND author.user_id IN top_user_ids AS candidate
+    ORDER BY c.created_at, c.comment_id
+    WITH r,
+        collect(c.created_at) AS times,
+        collect(coalesce(c.reply_count, 0)) AS replies,
+        collect(coalesce(c.thumbs_up, 0)) AS thumbs,
+        // collect() skips nulls, so the head of each list is the earliest candidate.
+        head(collect(CASE WHEN candidate THEN c.comment_id END)) AS pivot_comment_id,
+        head(collect(CASE WHEN candidate THEN c.created_at END)) AS pivot_time
+    // Step 4: Store the running sums and the pivot.
+    SET r.comment_times = times,
+        r.cumulative_reply_count = reduce(sums = [], x IN replies | sums + (coalesce(sums[-1], 0) + x)),
+        r.cumulative_thumbs_up = reduce(sums = [], x IN thumbs | sums + (coalesce(sums[-1], 0) + x)),
+        r.pivot_comment_id = pivot_comment_id,
+        r.pivot_position = CASE WHEN pivot_comment_id IS NULL THEN null
+            ELSE size([t IN times WHERE t <= pivot_time]) END
+} IN TRANSACTIONS OF 100 ROWS
+;
@@ -0,0 +1,23 @@
+//
+// Purpose: Stores each user's chronological commenting history as a compact `recipe_sequence`
+// property: the distinct recipe names they commented on, in the order of their first comment on
+// each. The commenting-path and journey queries then read one list per user instead of building
+// a per-user cartesian product of comments and re-sorting it.
+//
+// Ties on created_at are broken by comment_id so the sequence is deterministic.
+//
+
+// Step 1: Process users one at a time so each batch only holds one user's comments.
+MATCH (u:USER)
+CALL {
+    WITH u
+    // Step 2: Walk the user's comments in chronological order.
+    MATCH (u) - [:POSTED] -> (c:COMMENT) - [:BELONGS_TO] -> (r:RECIPE)
+    WITH u, c, r
+    ORDER BY c.created_at, c.comment_id
+    WITH u, collect(r.recipe_name) AS recipes
+    // Step 3: Keep only the first occurrence of each recipe.
+    SET u.recipe_sequence = reduce(sequence = [], name IN recipes |
+        CASE WHEN name IN sequence THEN sequence ELSE sequence + name END)
+} IN TRANSACTIONS OF 1000 ROWS
+;
@@ -0,0 +1,22 @@
+//
+// Purpose: Stores every user's position in the reputation leaderboard as an indexed `reputation_rank`
+// property (1 = highest reputation; ties broken by user_id). Influencer-anchored queries then read
+// "the top N users" with a range seek on the rank index instead of sorting every user per request.
+//
+// Reputation changes can move any user's rank, so this always reranks all users.
+//
+
+// Step 1: Sort all users once.
+MATCH (u:USER)
+WITH u
+ORDER BY u.user_reputation DESC, u.user_id
+WITH collect(u) AS users
+
+// Step 2: Write each user's 1-based rank in batches.
+UNWIND range(0, size(users) - 1) AS i
+WITH users[i] AS u, i + 1 AS rank
+CALL {
+    WITH u, rank
+    SET u.reputation_rank = rank
+} IN TRANSACTIONS OF 10000 ROWS
+;
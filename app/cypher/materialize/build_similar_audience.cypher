@@ -0,0 +1,42 @@
+//
+// Purpose: Precomputes the top-k most similar recipes for every recipe, where similarity is the
+// number of users who commented on both (the same collaborative-filtering measure used by
+// get_similar_recipes.cypher). Results are stored as ranked SIMILAR_AUDIENCE relationships so the
+// Recipe Similarity page reads them directly instead of traversing every shared commenter.
+//
+// Parameters:
+// - $k: Number of similar recipes to keep per recipe.
+//
+// Properties (on (recipe) - [:SIMILAR_AUDIENCE] -> (similar recipe)):
+// - rank: 1 for the most similar recipe.
+// - shared_commenter_count: Number of users who commented on both recipes.
+// - shared_commenters: Names of those users.
+//
+
+// Step 1: Process recipes one at a time so each batch only holds one recipe's neighbourhood.
+MATCH (r1:RECIPE)
+CALL {
+    WITH r1
+    // Step 2: Drop the recipe's previous top-k before recomputing it.
+    OPTIONAL MATCH (r1) - [old:SIMILAR_AUDIENCE] -> (:RECIPE)
+    DELETE old
+    WITH DISTINCT r1
+
+    // Step 3: Count shared commenters against every other recipe.
+    MATCH (r1) <- [:BELONGS_TO] - (:COMMENT) <- [:POSTED] - (u:USER) - [:POSTED] -> (:COMMENT) - [:BELONGS_TO] -> (r2:RECIPE)
+    WHERE r2 <> r1
+    WITH r1, r2, count(DISTINCT u) AS shared_commenter_count, collect(DISTINCT u.user_name) AS shared_commenters
+    ORDER BY shared_commenter_count DESC, r2.recipe_name
+
+    // Step 4: Keep the top k and store them with their rank.
+    WITH r1, collect({recipe: r2, shared_commenter_count: shared_commenter_count, shared_commenters: shared_commenters})[0..$k] AS top
+    UNWIND range(0, size(top) - 1) AS i
+    WITH r1, i + 1 AS rank, top[i] AS similar
+    WITH r1, rank, similar, similar.recipe AS r2
+    CREATE (r1) - [:SIMILAR_AUDIENCE {
+        rank: rank,
+        shared_commenter_count: similar.shared_commenter_count,
+        shared_commenters: similar.shared_commenters
+    }] -> (r2)
+} IN TRANSACTIONS OF 100 ROWS
+;
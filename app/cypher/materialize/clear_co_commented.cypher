@@ -0,0 +1,13 @@
+//
+// Purpose: Removes every materialized CO_COMMENTED relationship before a full rebuild.
+// Deletes run in batches so large graphs don't exhaust transaction memory.
+//
+// Returns: nothing.
+//
+
+MATCH (:USER) - [c:CO_COMMENTED] -> (:USER)
+CALL {
+    WITH c
+    DELETE c
+} IN TRANSACTIONS OF 10000 ROWS
+;
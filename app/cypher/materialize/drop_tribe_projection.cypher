@@ -0,0 +1,16 @@
+//
+// Purpose: Drops the in-memory GDS projection of the co-comment graph. The `tribes` stage runs
+// it after write_tribes.cypher, so the projection doesn't hold server memory between builds,
+// and before project_tribe_graph.cypher, in case an earlier build failed before dropping it.
+// Does nothing if the projection doesn't exist.
+//
+// Parameters:
+// - $graph_name: Name of the projection (component.materialize.TRIBE_GRAPH).
+//
+// Returns: graphName of the dropped projection, or no rows.
+//
+
+CALL gds.graph.drop($graph_name, false)
+YIELD graphName
+RETURN graphName
+;
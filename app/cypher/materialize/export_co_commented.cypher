@@ -0,0 +1,13 @@
+//
+// Purpose: Exports the materialized co-comment graph (see build_co_commented.cypher) as a weighted
+// edge list, for community detection in component.communities when GDS isn't available.
+// Each pair of users is returned once.
+//
+// Returns:
+// - source, target: user_id of the two users.
+// - shared_recipes: Number of recipes both users have commented on (the edge weight).
+//
+
+MATCH (u1:USER) - [c:CO_COMMENTED] -> (u2:USER)
+RETURN u1.user_id AS source, u2.user_id AS target, c.shared_recipes AS shared_recipes
+;
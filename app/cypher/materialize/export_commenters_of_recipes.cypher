@@ -0,0 +1,17 @@
+//
+// Purpose: Exports one row per distinct (recipe, commenter) pair of the given recipes, for the
+// incremental refresh of the `sketches` materialization stage (component/sketches.py). The full
+// build uses export_recipe_commenters.cypher.
+//
+// Parameters:
+// - $recipe_codes: recipe_code of every recipe that received a new comment.
+//
+// Returns:
+// - recipe_code, recipe_name: The recipe. Recipes without comments have no rows.
+// - user_id: A user who commented on it.
+//
+
+UNWIND $recipe_codes AS recipe_code
+MATCH (r:RECIPE {recipe_code: recipe_code}) <- [:BELONGS_TO] - (:COMMENT) <- [:POSTED] - (u:USER)
+RETURN DISTINCT r.recipe_code AS recipe_code, r.recipe_name AS recipe_name, u.user_id AS user_id
+;
@@ -0,0 +1,12 @@
+//
+// Purpose: Exports one row per distinct (recipe, commenter) pair, for the recipe sketches built by
+// component/sketches.py (the `sketches` materialization stage).
+//
+// Returns:
+// - recipe_code, recipe_name: The recipe.
+// - user_id: A user who commented on it.
+//
+
+MATCH (r:RECIPE) <- [:BELONGS_TO] - (:COMMENT) <- [:POSTED] - (u:USER)
+RETURN DISTINCT r.recipe_code AS recipe_code, r.recipe_name AS recipe_name, u.user_id AS user_id
+;
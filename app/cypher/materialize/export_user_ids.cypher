@@ -0,0 +1,11 @@
+//
+// Purpose: Lists every user, for component.communities on servers without the Graph Data Science
+// plugin. Users without CO_COMMENTED relationships become single-member communities.
+//
+// Returns:
+// - user_id: ID of every USER node.
+//
+
+MATCH (u:USER)
+RETURN u.user_id AS user_id
+;
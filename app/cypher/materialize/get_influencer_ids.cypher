@@ -0,0 +1,11 @@
+//
+// Purpose: Lists the users currently labelled :INFLUENCER, so an incremental refresh can tell which
+// users entered or left the top N when reputation_rank is rebuilt.
+//
+// Returns:
+// - user_id: one row per :INFLUENCER user.
+//
+
+MATCH (u:INFLUENCER)
+RETURN u.user_id AS user_id
+;
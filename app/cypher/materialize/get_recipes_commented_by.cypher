@@ -0,0 +1,15 @@
+//
+// Purpose: Finds the recipes a set of users commented on. Used to refresh the engagement index of
+// recipes whose pivot comment may change because their commenters entered or left :INFLUENCER.
+//
+// Parameters:
+// - $user_ids: user_id of every user whose :INFLUENCER label changed.
+//
+// Returns:
+// - recipe_code: one row per distinct recipe.
+//
+
+UNWIND $user_ids AS user_id
+MATCH (:USER {user_id: user_id}) - [:POSTED] -> (:COMMENT) - [:BELONGS_TO] -> (r:RECIPE)
+RETURN DISTINCT r.recipe_code AS recipe_code
+;
@@ -0,0 +1,31 @@
+//
+// Purpose: Maintains the :INFLUENCER label on the top-$top_n users by `reputation_rank`, so queries
+// anchored on "high-reputation users" (e.g. the engagement index) start from a label lookup over a
+// few nodes. Run after build_reputation_rank.cypher.
+//
+// Parameters:
+// - $top_n: number of users, by reputation rank, labelled :INFLUENCER.
+//
+// Returns:
+// - removed: users that dropped out of the top N.
+// - added: users labelled (or relabelled) :INFLUENCER.
+//
+
+// Step 1: Remove the label from users that are no longer in the top N.
+CALL {
+    MATCH (u:INFLUENCER)
+    WHERE NOT coalesce(u.reputation_rank <= $top_n, false)
+    REMOVE u:INFLUENCER
+    RETURN count(u) AS removed
+}
+
+// Step 2: Label the current top N through the rank index.
+CALL {
+    MATCH (u:USER)
+    WHERE u.reputation_rank <= $top_n
+    SET u:INFLUENCER
+    RETURN count(u) AS added
+}
+
+RETURN removed, added
+;
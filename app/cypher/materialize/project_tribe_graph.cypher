@@ -0,0 +1,24 @@
+//
+// Purpose: Projects the user co-comment graph into GDS memory for community detection. The
+// `tribes` stage drops any existing projection first and drops this one again once Louvain has
+// written, so every build projects the current CO_COMMENTED relationships.
+//
+// The projection is native: it reads the materialized CO_COMMENTED relationships (see
+// build_co_commented.cypher) and their shared_recipes weights directly, instead of running
+// a Cypher projection that enumerates every pair of users per recipe.
+//
+// Parameters:
+// - $graph_name: Name of the projection (component.materialize.TRIBE_GRAPH).
+//
+// Returns: nodeCount and relationshipCount of the new projection.
+//
+
+// Project every user, with CO_COMMENTED undirected (each pair is stored once).
+CALL gds.graph.project(
+    $graph_name,
+    'USER',
+    {CO_COMMENTED: {orientation: 'UNDIRECTED', properties: 'shared_recipes'}}
+)
+YIELD nodeCount, relationshipCount
+RETURN nodeCount, relationshipCount
+;
@@ -0,0 +1,31 @@
+//
+// Purpose: Incrementally maintains CO_COMMENTED after new comments are ingested.
+// A new comment only changes the pairs that include its author, so for each touched user this
+// query drops their existing CO_COMMENTED relationships and recomputes them from scratch.
+//
+// Parameters:
+// - $user_ids: user_id of every user who posted a new comment.
+//
+
+UNWIND $user_ids AS user_id
+MATCH (u:USER {user_id: user_id})
+CALL {
+    WITH u
+    // Step 1: Drop the user's current co-comment relationships (in either direction).
+    OPTIONAL MATCH (u) - [old:CO_COMMENTED] - (:USER)
+    DELETE old
+    WITH DISTINCT u
+
+    // Step 2: Recompute shared recipe counts against every co-commenter.
+    MATCH (u) - [:POSTED] -> (:COMMENT) - [:BELONGS_TO] -> (r:RECIPE) <- [:BELONGS_TO] - (:COMMENT) <- [:POSTED] - (other:USER)
+    WHERE other <> u
+    WITH u, other, count(DISTINCT r) AS shared_recipes
+
+    // Step 3: Store the pair directed from the lower user_id, matching build_co_commented.cypher.
+    WITH shared_recipes,
+        CASE WHEN u.user_id < other.user_id THEN u ELSE other END AS low,
+        CASE WHEN u.user_id < other.user_id THEN other ELSE u END AS high
+    MERGE (low) - [c:CO_COMMENTED] -> (high)
+    SET c.shared_recipes = shared_recipes
+} IN TRANSACTIONS OF 100 ROWS
+;
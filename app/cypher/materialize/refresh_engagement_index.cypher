@@ -0,0 +1,34 @@
+//
+// Purpose: Incrementally maintains the engagement index after new comments are ingested.
+// Only recipes that received new comments have changed timestamps or running sums; each is rebuilt
+// with the same logic as build_engagement_index.cypher.
+//
+// Parameters:
+// - $recipe_codes: recipe_code of every recipe that received a new comment.
+//
+
+MATCH (top_user:INFLUENCER)
+WITH collect(top_user.user_id) AS top_user_ids
+
+UNWIND $recipe_codes AS recipe_code
+MATCH (r:RECIPE {recipe_code: recipe_code})
+CALL {
+    WITH r, top_user_ids
+    MATCH (r) <- [:BELONGS_TO] - (c:COMMENT)
+    OPTIONAL MATCH (author:USER) - [:POSTED] -> (c)
+    WITH r, c, c.stars = 5 AND author.user_id IN top_user_ids AS candidate
+    ORDER BY c.created_at, c.comment_id
+    WITH r,
+        collect(c.created_at) AS times,
+        collect(coalesce(c.reply_count, 0)) AS replies,
+        collect(coalesce(c.thumbs_up, 0)) AS thumbs,
+        head(collect(CASE WHEN candidate THEN c.comment_id END)) AS pivot_comment_id,
+        head(collect(CASE WHEN candidate THEN c.created_at END)) AS pivot_time
+    SET r.comment_times = times,
+        r.cumulative_reply_count = reduce(sums = [], x IN replies | sums + (coalesce(sums[-1], 0) + x)),
+        r.cumulative_thumbs_up = reduce(sums = [], x IN thumbs | sums + (coalesce(sums[-1], 0) + x)),
+        r.pivot_comment_id = pivot_comment_id,
+        r.pivot_position = CASE WHEN pivot_comment_id IS NULL THEN null
+            ELSE size([t IN times WHERE t <= pivot_time]) END
+} IN TRANSACTIONS OF 100 ROWS
+;
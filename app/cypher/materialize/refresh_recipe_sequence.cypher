@@ -0,0 +1,21 @@
+//
+// Purpose: Incrementally maintains `recipe_sequence` after new comments are ingested.
+// Only the authors of new comments have a changed sequence; each is rebuilt with the same logic as
+// build_recipe_sequence.cypher.
+//
+// Parameters:
+// - $user_ids: user_id of every user who posted a new comment.
+//
+
+UNWIND $user_ids AS user_id
+MATCH (u:USER {user_id: user_id})
+CALL {
+    WITH u
+    MATCH (u) - [:POSTED] -> (c:COMMENT) - [:BELONGS_TO] -> (r:RECIPE)
+    WITH u, c, r
+    ORDER BY c.created_at, c.comment_id
+    WITH u, collect(r.recipe_name) AS recipes
+    SET u.recipe_sequence = reduce(sequence = [], name IN recipes |
+        CASE WHEN name IN sequence THEN sequence ELSE sequence + name END)
+} IN TRANSACTIONS OF 100 ROWS
+;
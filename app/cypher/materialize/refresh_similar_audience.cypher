@@ -0,0 +1,40 @@
+//
+// Purpose: Incrementally refreshes SIMILAR_AUDIENCE after new comments are ingested.
+// A new comment by user U on recipe R changes the shared-commenter counts between R and every other
+// recipe U has commented on, so those recipes (R included) are exactly the ones recomputed here.
+// The per-recipe logic matches build_similar_audience.cypher.
+//
+// Parameters:
+// - $user_ids: user_id of every user who posted a new comment.
+// - $k: Number of similar recipes to keep per recipe.
+//
+
+// Step 1: Find every recipe whose top-k may have changed.
+UNWIND $user_ids AS user_id
+MATCH (:USER {user_id: user_id}) - [:POSTED] -> (:COMMENT) - [:BELONGS_TO] -> (touched:RECIPE)
+WITH DISTINCT touched AS r1
+CALL {
+    WITH r1
+    // Step 2: Drop the recipe's previous top-k before recomputing it.
+    OPTIONAL MATCH (r1) - [old:SIMILAR_AUDIENCE] -> (:RECIPE)
+    DELETE old
+    WITH DISTINCT r1
+
+    // Step 3: Count shared commenters against every other recipe.
+    MATCH (r1) <- [:BELONGS_TO] - (:COMMENT) <- [:POSTED] - (u:USER) - [:POSTED] -> (:COMMENT) - [:BELONGS_TO] -> (r2:RECIPE)
+    WHERE r2 <> r1
+    WITH r1, r2, count(DISTINCT u) AS shared_commenter_count, collect(DISTINCT u.user_name) AS shared_commenters
+    ORDER BY shared_commenter_count DESC, r2.recipe_name
+
+    // Step 4: Keep the top k and store them with their rank.
+    WITH r1, collect({recipe: r2, shared_commenter_count: shared_commenter_count, shared_commenters: shared_commenters})[0..$k] AS top
+    UNWIND range(0, size(top) - 1) AS i
+    WITH r1, i + 1 AS rank, top[i] AS similar
+    WITH r1, rank, similar, similar.recipe AS r2
+    CREATE (r1) - [:SIMILAR_AUDIENCE {
+        rank: rank,
+        shared_commenter_count: similar.shared_commenter_count,
+        shared_commenters: similar.shared_commenters
+    }] -> (r2)
+} IN TRANSACTIONS OF 100 ROWS
+;
@@ -0,0 +1,14 @@
+//
+// Purpose: Writes community IDs computed outside the database (component.communities) as
+// USER.communityId, the property written by write_tribes.cypher when GDS is available.
+//
+// Parameters:
+// - $rows: List of {user_id, communityId} maps.
+//
+// Returns: nothing.
+//
+
+UNWIND $rows AS row
+MATCH (u:USER {user_id: row.user_id})
+SET u.communityId = row.communityId
+;
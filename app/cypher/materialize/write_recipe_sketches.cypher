@@ -0,0 +1,17 @@
+//
+// Purpose: Stores the commenter sketches computed by component/sketches.py on RECIPE nodes, for
+// get_recipe_sketches.cypher.
+//
+// Parameters:
+// - $rows: List of {recipe_code, commenter_count, commenter_minhash, commenter_hll} maps.
+//   Null values remove the sketch, for recipes that no longer have commenters.
+//
+// Returns: nothing.
+//
+
+UNWIND $rows AS row
+MATCH (r:RECIPE {recipe_code: row.recipe_code})
+SET r.commenter_count = row.commenter_count,
+    r.commenter_minhash = row.commenter_minhash,
+    r.commenter_hll = row.commenter_hll
+;
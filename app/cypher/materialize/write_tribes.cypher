@@ -0,0 +1,18 @@
+//
+// Purpose: Runs Louvain community detection on the co-comment projection and writes each
+// user's community as USER.communityId, so get_tribes.cypher and get_bridge_users.cypher
+// are plain indexed reads instead of rerunning the algorithm on every request.
+//
+// Parameters:
+// - $graph_name: Name of the projection built by project_tribe_graph.cypher.
+//
+// Returns: communityCount, modularity and nodePropertiesWritten.
+//
+
+CALL gds.louvain.write(
+    $graph_name,
+    {writeProperty: 'communityId', relationshipWeightProperty: 'shared_recipes'}
+)
+YIELD communityCount, modularity, nodePropertiesWritten
+RETURN communityCount, modularity, nodePropertiesWritten
+;
@@ -0,0 +1,18 @@
+//
+// Purpose: Typeahead search for the recipe pickers. Returns the best-matching recipe names for the
+// text typed so far, read from the `recipe_name_fulltext` index instead of shipping the whole catalog
+// to the page.
+//
+// Parameters:
+// - $search: Lucene query built by component.search.to_fulltext_query, e.g. "choc* AND cak*".
+// - $limit: The maximum number of matches to return.
+//
+// Returns:
+// - recipe_name: The name of each matching recipe, best match first.
+//
+
+CALL db.index.fulltext.queryNodes('recipe_name_fulltext', $search, {limit: $limit})
+YIELD node, score
+RETURN node.recipe_name AS recipe_name
+ORDER BY score DESC, recipe_name
+;
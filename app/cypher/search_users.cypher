@@ -0,0 +1,19 @@
+//
+// Purpose: Typeahead search for the user pickers. Returns the best-matching users for the text typed
+// so far, read from the `user_name_fulltext` index instead of shipping every user to the page.
+// Equally good matches are ordered by reputation.
+//
+// Parameters:
+// - $search: Lucene query built by component.search.to_fulltext_query, e.g. "ann* AND smi*".
+// - $limit: The maximum number of matches to return.
+//
+// Returns:
+// - user_name: The username of each matching user, best match first.
+// - user_reputation: The reputation score of that user.
+//
+
+CALL db.index.fulltext.queryNodes('user_name_fulltext', $search, {limit: $limit})
+YIELD node, score
+RETURN node.user_name AS user_name, node.user_reputation AS user_reputation
+ORDER BY score DESC, node.reputation_rank
+;
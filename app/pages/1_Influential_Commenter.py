@@ -8,17 +8,16 @@ an interactive graph visualization of these connections for a selected user."""
 
 import streamlit as st
 import pandas as pd
-from component.database import Database
-import networkx as nx
-from pyvis.network import Network
-from streamlit_agraph import agraph, Node, Edge, Config
-
-# Initialize a connection to the Neo4j database using credentials from Streamlit secrets.
-db = Database(
-    uri=st.secrets["NEO4J_URI"],
-    username=st.secrets["NEO4J_USERNAME"],
-    password=st.secrets["NEO4J_PASSWORD"],
-)
+from component.database import get_database
+from component.metrics import tag_page
+from component.panel import performance_panel
+from component.graph import MAX_VISIBLE_NODES, render, star_payload
+from component import sketches
+
+# Connect to the Neo4j database (or the local in-process backend) configured in Streamlit secrets.
+db = get_database(st.secrets)
+# Attribute this page's queries in the performance panel and query metrics.
+tag_page("Influential Commenter")
 
 st.set_page_config(page_title="Influential Commenter", layout="wide")
 
@@ -43,15 +42,53 @@ with pagecol1:
         # User input to select the number of top users (N) to analyze.
         n = st.number_input("Select number of users (N)", min_value=3, value=10, step=1)
 
-    # Execute a Cypher query to get the top N users by reputation and their comment reach.
-    # The query is loaded from a file and formatted with the user-selected value of N.
-    df = db.run_cypher(
-        query=db.generate_query(
-            cypher_filename="get_high_rep_user_comment_reach.cypher"
-        ).format(n=n),
+    with col2:
+        # Approximate mode estimates reach from precomputed HyperLogLog sketches
+        # instead of collecting every reached user, which is much cheaper for large N.
+        approximate = st.toggle("Approximate (sketches)", value=False)
+
+    # Start the reached-user query for the graph panel's default selection (the top
+    # user, default min. recipe count) before the reach query, so the two run
+    # concurrently. The top user comes from a cheap lookup on the reputation rank
+    # index, which orders users the same way as the reach queries.
+    top_user = db.run_query(
+        cypher_filename="get_users_sort_by_rep.cypher",
         database=st.secrets["NEO4J_DATABASE"],
+        limit=1,
     )
+    if len(top_user):
+        db.prefetch(
+            cypher_filename="get_reached_user.cypher",
+            database=st.secrets["NEO4J_DATABASE"],
+            user=top_user["user_name"][0],
+            recipe_count=2,
+        )
 
+    if approximate:
+        # Each user's recipes, then the estimated distinct commenters over those
+        # recipes, minus the user themselves.
+        df = db.run_query(
+            cypher_filename="get_high_rep_user_recipes.cypher",
+            database=st.secrets["NEO4J_DATABASE"],
+            n=n,
+        ).rename(
+            columns={
+                "user_name": "top_users.user_name",
+                "user_reputation": "top_users.user_reputation",
+            }
+        )
+        recipe_sketches = sketches.load(db, st.secrets["NEO4J_DATABASE"])
+        df["reach"] = [
+            max(round(recipe_sketches.reach(recipes)) - 1, 0) for recipes in df["recipe_name"]
+        ]
+    else:
+        # Execute a Cypher query to get the top N users by reputation and their comment reach.
+        # The query is loaded from a file and filled in with the user-selected value of N.
+        df = db.run_query(
+            cypher_filename="get_high_rep_user_comment_reach.cypher",
+            database=st.secrets["NEO4J_DATABASE"],
+            n=n,
+        )
     # Prepare the DataFrame for display by selecting and renaming columns.
     df_display = pd.DataFrame(
         {
@@ -63,15 +100,26 @@ with pagecol1:
     df_display.index = range(1, len(df_display) + 1)
 
     st.dataframe(df_display)
+    if approximate:
+        st.caption(
+            "Reach is estimated with HyperLogLog sketches: about 95% of estimates "
+            "are within 4.6% of the exact count."
+        )
 
-with pagecol2:
+
+# The reach graph panel is a fragment: changing the selected user, the min. recipe count
+# or the graph settings reruns only this function, not the top-N reach query above. It
+# depends only on the list of top users, which is passed in (a fragment rerun reuses the
+# arguments of the last full run).
+@st.fragment
+def reached_users_panel(users: pd.Series):
+    # Fragment reruns start in a new script thread, so the page tag is set again.
+    tag_page("Influential Commenter")
 
     # --- Visualization --- #
     col3, col4 = st.columns(2)
     with col3:
-        user = st.selectbox(
-            "Select user to view user's reach", df["top_users.user_name"]
-        )
+        user = st.selectbox("Select user to view user's reach", users)
     # User input to filter connections by a minimum number of shared recipes.
     with col4:
         recipe_count = st.number_input(
@@ -81,56 +129,49 @@ with pagecol2:
             value=2,
             step=1,
         )
-    df_reached_user = db.run_cypher(
-        query=db.generate_query(
-            # This query finds all users who have commented on at least `recipe_count`
-            # same recipes as the selected `user`.
-            cypher_filename="get_reached_user.cypher"
-        ).format(user=user, recipe_count=recipe_count),
+    df_reached_user = db.run_query(
+        # This query finds all users who have commented on at least `recipe_count`
+        # same recipes as the selected `user`.
+        cypher_filename="get_reached_user.cypher",
         database=st.secrets["NEO4J_DATABASE"],
+        user=user,
+        recipe_count=recipe_count,
     )
     # Display an informational message with the average reputation of the reached users.
     st.info(
         f"""Filtered to users have commented on at least {recipe_count} same recipes. **Average reputation of users: {round(df_reached_user['reached_user_reputation'].mean())}**"""
     )
 
-    # --- 1. Create a networkx graph object ---
-    # This graph will represent the selected user and the other users they have reached.
-    G = nx.Graph()
-
-    # Add the selected influential user as a central, larger node.
-    G.add_node(user, size=25, title=user)
-    # Add nodes for each "reached" user and edges connecting them to the central user.
-    for u, recipe_count in zip(
-        df_reached_user["reached_user"].values, df_reached_user["recipe_count"].values
-    ):
-        G.add_node(u, size=5, title=u)
-        # The edge weight represents the number of shared recipes.
-        G.add_edge(user, u, weight=int(recipe_count), label="Reach")
-
-    # --- 2. Convert networkx graph to a list of Nodes and Edges ---
-    # The `streamlit-agraph` component requires nodes and edges to be in a specific format.
-    nodes = [
-        Node(
-            id=n,
-            label=str(n),
-            size=G.nodes[n].get(
-                "size", 10
-            ),  # Use size defined in networkx, default to 10.
+    # --- Graph rendering --- #
+    # Popular users reach thousands of others, so only the strongest connections are
+    # drawn individually; the rest are collapsed into cluster nodes by shared recipe count.
+    col5, col6 = st.columns(2)
+    with col5:
+        max_nodes = st.number_input(
+            "Max. users shown", min_value=10, value=MAX_VISIBLE_NODES, step=10
         )
-        for n in G.nodes
-    ]
-
-    edges = [
-        Edge(source=u, target=v, label="", weight=G.edges[u, v].get("weight", 2))
-        for u, v in G.edges
-    ]
-
-    # --- 3. Configure the graph's appearance ---
-    # These settings control the layout and physics of the interactive graph.
-    config = Config(
-        width=400, height=300, directed=True, physics=True, hierarchical=False
+    with col6:
+        # A precomputed layout renders immediately; physics lets nodes be dragged around.
+        static_layout = st.toggle("Static layout", value=True)
+
+    # Build the node and edge tables directly from the query result, with the selected
+    # user as the central, larger node and edges weighted by the number of shared recipes.
+    nodes, edges = star_payload(
+        center=user,
+        neighbors=df_reached_user["reached_user"],
+        weights=df_reached_user["recipe_count"],
+        max_nodes=max_nodes,
+        noun="users",
+        weight_label="shared recipes",
+        static_layout=static_layout,
     )
 
     # Render the interactive graph in the Streamlit app.
-    return_value = agraph(nodes=nodes, edges=edges, config=config)
+    return_value = render(nodes, edges, width=400, height=300)
+
+
+with pagecol2:
+    reached_users_panel(df["top_users.user_name"])
+
+# Query timings for this page, in the sidebar.
+performance_panel(db)
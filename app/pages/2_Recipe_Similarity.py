@@ -10,16 +10,17 @@ with the original recipe.
 
 import streamlit as st
 import pandas as pd
-from component.database import Database
-import networkx as nx
-from streamlit_agraph import agraph, Node, Edge, Config
-
-# Initialize a connection to the Neo4j database using credentials from Streamlit secrets.
-db = Database(
-    uri=st.secrets["NEO4J_URI"],
-    username=st.secrets["NEO4J_USERNAME"],
-    password=st.secrets["NEO4J_PASSWORD"],
-)
+from component.database import get_database
+from component.metrics import tag_page
+from component.panel import performance_panel
+from component.picker import recipe_picker
+from component.graph import MAX_VISIBLE_NODES, render, star_payload
+from component import sketches
+
+# Connect to the Neo4j database (or the local in-process backend) configured in Streamlit secrets.
+db = get_database(st.secrets)
+# Attribute this page's queries in the performance panel and query metrics.
+tag_page("Recipe Similarity")
 
 st.set_page_config(page_title="Recipe Similarity", layout="wide")
 
@@ -31,39 +32,71 @@ pagecol1, pagecol2 = st.columns(2)
 
 with pagecol1:
 
-    # Fetch the list of all available recipes to populate the selection dropdown.
-    all_recipes = db.run_cypher(
-        query=db.generate_query(cypher_filename="get_all_recipes.cypher"),
-        database=st.secrets["NEO4J_DATABASE"],
+    # User input to select a recipe to analyze for similarity. Only the top matches
+    # for the search text are fetched, not the whole catalog. The similarity query is
+    # started in parallel for the first few matches, so the default selection's result
+    # is in flight while the dropdown renders and the next likely picks are warm.
+    recipe = recipe_picker(
+        db, st.secrets["NEO4J_DATABASE"], prefetch="get_similar_recipes.cypher"
     )
 
-    # User input to select a recipe to analyze for similarity.
-    recipe = st.selectbox("Select recipe", all_recipes["recipe_name"])
-
     st.markdown("Most similar recipes")
 
-    # Execute a Cypher query to find recipes similar to the selected one.
-    # Similarity is determined by the number of users who commented on both recipes.
-    similar_recipes = db.run_cypher(
-        query=db.generate_query(cypher_filename="get_similar_recipes.cypher").format(
-            recipe=recipe
-        ),
-        database=st.secrets["NEO4J_DATABASE"],
-    )
+    # Approximate mode ranks recipes by MinHash estimates of commenter overlap
+    # instead of counting the shared commenters of every candidate.
+    approximate = st.toggle("Approximate (sketches)", value=False)
 
-    # Prepare the DataFrame for display, showing similar recipes and the count of shared commenters.
-    df = pd.DataFrame(
-        {
-            "Recipe": similar_recipes["recipe_name"],
-            "Shared Commenter Count": similar_recipes["shared_commenter_count"],
-        }
-    )
+    if approximate:
+        similar_recipes = sketches.load(db, st.secrets["NEO4J_DATABASE"]).similar(recipe)
+
+        # Prepare the DataFrame for display, with the estimated overlap and Jaccard similarity.
+        df = pd.DataFrame(
+            {
+                "Recipe": similar_recipes["recipe_name"],
+                "Est. Shared Commenters": similar_recipes["shared_commenter_count"],
+                "Jaccard": similar_recipes["jaccard"].round(3),
+            }
+        )
+    else:
+        # Execute a Cypher query to find recipes similar to the selected one.
+        # Similarity is determined by the number of users who commented on both recipes.
+        similar_recipes = db.run_query(
+            cypher_filename="get_similar_recipes.cypher",
+            database=st.secrets["NEO4J_DATABASE"],
+            recipe=recipe,
+        )
+
+        # Prepare the DataFrame for display, showing similar recipes and the count of shared commenters.
+        df = pd.DataFrame(
+            {
+                "Recipe": similar_recipes["recipe_name"],
+                "Shared Commenter Count": similar_recipes["shared_commenter_count"],
+            }
+        )
     df.index = range(1, len(df) + 1)
 
     st.dataframe(df)
+    if approximate:
+        st.caption(
+            "Estimated from 128-value MinHash signatures: Jaccard estimates have a "
+            "standard error of at most 0.044, and shared commenter counts inherit "
+            "the same relative error."
+        )
 
 
-with pagecol2:
+# The graph panel is a fragment: changing its widgets reruns only this function, not
+# the recipe search and similarity query above. It depends only on their results,
+# which are passed in (a fragment rerun reuses the arguments of the last full run).
+@st.fragment
+def shared_commenters_panel(similar_recipes: pd.DataFrame, approximate: bool):
+    # Fragment reruns start in a new script thread, so the page tag is set again.
+    tag_page("Recipe Similarity")
+
+    # A recipe with no commenters in common with any other has nothing to draw, and the
+    # selectbox below would return None.
+    if similar_recipes.empty:
+        st.info("No similar recipes found for the selected recipe.")
+        return
 
     # User input to select one of the similar recipes for graph visualization.
     similar_recipe = st.selectbox(
@@ -71,46 +104,45 @@ with pagecol2:
         similar_recipes["recipe_name"],
     )
 
-    # Filter the `similar_recipes` DataFrame to get the list of shared commenters
-    # for the recipe selected for visualization.
-    commenters = similar_recipes.query(f"recipe_name == '{similar_recipe}'")
-
-    # --- 1. Create a networkx graph object ---
-    # This graph will represent the selected similar recipe and the shared commenters.
-    G = nx.Graph()
-
-    # Add the selected similar recipe as a central, larger node.
-    G.add_node(similar_recipe, size=25, title=similar_recipe)
-    # Add nodes for each shared commenter and create an edge connecting them to the recipe node.
-    for c in commenters["shared_commenters"].values[0]:
-        G.add_node(c, size=5, title=c)
-        G.add_edge(c, similar_recipe)
-
-    # --- 2. Convert networkx graph to a list of Nodes and Edges ---
-    # The `streamlit-agraph` component requires nodes and edges to be in a specific format.
-    nodes = [
-        Node(
-            id=n,
-            label=str(n),
-            size=G.nodes[n].get(
-                "size", 10
-            ),  # Use size defined in networkx, default to 10.
+    if approximate:
+        # Sketches summarize commenters without listing them.
+        st.info("Turn off approximate mode to view the shared commenters.")
+    else:
+        # Filter the `similar_recipes` DataFrame to get the list of shared commenters
+        # for the recipe selected for visualization.
+        commenters = similar_recipes[similar_recipes["recipe_name"] == similar_recipe]
+        if commenters.empty:
+            st.info("No shared commenters found for the selected recipe.")
+            return
+
+        # --- Graph rendering --- #
+        # Similar popular recipes can share thousands of commenters, so only the first ones
+        # are drawn individually and the rest are collapsed into a single cluster node.
+        col1, col2 = st.columns(2)
+        with col1:
+            max_nodes = st.number_input(
+                "Max. commenters shown", min_value=10, value=MAX_VISIBLE_NODES, step=10
+            )
+        with col2:
+            # A precomputed layout renders immediately; physics lets nodes be dragged around.
+            static_layout = st.toggle("Static layout", value=True)
+
+        # Build the node and edge tables directly from the shared commenter list, with the
+        # selected similar recipe as the central, larger node.
+        nodes, edges = star_payload(
+            center=similar_recipe,
+            neighbors=pd.Series(commenters["shared_commenters"].values[0]),
+            max_nodes=max_nodes,
+            noun="commenters",
+            static_layout=static_layout,
         )
-        for n in G.nodes
-    ]
 
-    edges = [
-        Edge(
-            source=v, target=u, label=""  # Edges are not labeled in this visualization.
-        )
-        for u, v in G.edges
-    ]
+        # Render the interactive graph in the Streamlit app.
+        return_value = render(nodes, edges, width=400, height=300)
 
-    # --- 3. Configure the graph's appearance ---
-    # These settings control the layout and physics of the interactive graph.
-    config = Config(
-        width=400, height=300, directed=True, physics=True, hierarchical=False
-    )
 
-    # Render the interactive graph in the Streamlit app.
-    return_value = agraph(nodes=nodes, edges=edges, config=config)
+with pagecol2:
+    shared_commenters_panel(similar_recipes, approximate)
+
+# Query timings for this page, in the sidebar.
+performance_panel(db)
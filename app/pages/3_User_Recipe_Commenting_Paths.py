@@ -6,18 +6,27 @@ sourced from a Neo4j graph database.
 A "commenting path" is a sequence of recipes that a user comments on after
 commenting on an initial, user-selected recipe. This analysis helps uncover
 patterns in user interests and how they navigate between different recipes.
+
+Paths can be matched exactly (users whose whole chronological recipe list is
+identical) or mined as frequent sub-paths: ordered recipe sequences, gaps
+allowed, shared by at least a minimum number of users.
 """
 
 import streamlit as st
 import pandas as pd
-from component.database import Database
+from component.database import get_database
+from component.metrics import tag_page
+from component.panel import performance_panel
+from component.picker import recipe_picker
+from component.patterns import frequent_subsequences
 
-# Initialize a connection to the Neo4j database using credentials from Streamlit secrets.
-db = Database(
-    uri=st.secrets["NEO4J_URI"],
-    username=st.secrets["NEO4J_USERNAME"],
-    password=st.secrets["NEO4J_PASSWORD"],
-)
+# Number of commenting paths shown per page.
+PAGE_SIZE = 50
+
+# Connect to the Neo4j database (or the local in-process backend) configured in Streamlit secrets.
+db = get_database(st.secrets)
+# Attribute this page's queries in the performance panel and query metrics.
+tag_page("User Recipe Commenting Paths")
 
 st.markdown("# User-Recipe Commenting Paths")
 
@@ -29,39 +38,90 @@ For example, do users who comment on baking recipes tend to also comment on a sp
 This uncovers user behavior patterns."""
 )
 
-all_recipes = db.run_cypher(
-    query=db.generate_query(
-        # Fetch the list of all available recipes to populate the selection dropdown.
-        cypher_filename="get_all_recipes.cypher"
-    ),
-    database=st.secrets["NEO4J_DATABASE"],
-)
+# User input to select a starting recipe for the path analysis. Only the top matches
+# for the search text are fetched, not the whole catalog.
+recipe = recipe_picker(db, st.secrets["NEO4J_DATABASE"])
 
-# User input to select a starting recipe for the path analysis.
-recipe = st.selectbox("Select recipe", all_recipes["recipe_name"])
-
-# Execute a Cypher query to find the commenting paths starting from the selected recipe.
-commenting_paths = db.run_cypher(
-    query=db.generate_query(
-        # This query identifies sequences of recipes commented on by the same users
-        # after they have commented on the initial selected recipe.
-        cypher_filename="get_user_commenting_paths.cypher"
-    ).replace("{recipe}", recipe),
-    database=st.secrets["NEO4J_DATABASE"],
-)
 
-# Display the results in a Streamlit DataFrame.
-st.dataframe(
-    pd.DataFrame(
-        {
-            # The 'commenting_path' column from the query result is a list of recipe names.
-            # This lambda function formats the list into a more readable string format.
-            "Commenting Path": commenting_paths["commenting_path"].apply(
-                lambda x: " → ".join(x)
-            ),
-            "User Count": commenting_paths["user_count"],
-        }
-    ),
-    # Hide the default DataFrame index for a cleaner presentation.
-    hide_index=True,
-)
+# Longest sub-path the miner looks for. The search space grows exponentially with the
+# length, so longer paths would stall the page on popular recipes.
+MAX_SUB_PATH_LENGTH = 6
+
+
+# Mining is pure CPU work over the query result, so it is cached per recipe and settings.
+# The data version is part of the key, so new ingests are picked up.
+@st.cache_data(max_entries=128, show_spinner="Mining sub-paths...")
+def mine_sub_paths(recipe: str, min_users: int, max_length: int, data_version: int) -> pd.DataFrame:
+    # Fetch the chronological recipe sequence of every user who commented on the recipe,
+    # then mine the ordered sub-paths they share.
+    sequences = db.run_query(
+        cypher_filename="get_recipe_sequences.cypher",
+        database=st.secrets["NEO4J_DATABASE"],
+        recipe=recipe,
+    )
+    return frequent_subsequences(
+        sequences["recipe_sequence"], min_support=min_users, max_length=max_length
+    )
+
+
+# Everything below the picker is a fragment: changing the match mode, the sub-path
+# settings or the page reruns only this function, not the recipe search above. It
+# depends only on the selected recipe, which is passed in (a fragment rerun reuses the
+# arguments of the last full run).
+@st.fragment
+def commenting_paths_panel(recipe: str):
+    # Fragment reruns start in a new script thread, so the page tag is set again.
+    tag_page("User Recipe Commenting Paths")
+
+    # Full paths are almost always unique, so frequent sub-paths are usually more informative.
+    mode = st.radio("Match", ["Frequent sub-paths", "Identical full paths"], horizontal=True)
+
+    if mode == "Frequent sub-paths":
+        col1, col2 = st.columns(2)
+        with col1:
+            # Minimum number of users who must share a sub-path for it to be shown.
+            min_users = st.number_input("Min. # users", min_value=2, value=2, step=1)
+        with col2:
+            max_length = st.number_input(
+                "Max. path length", min_value=2, max_value=MAX_SUB_PATH_LENGTH, value=3, step=1
+            )
+
+        commenting_paths = mine_sub_paths(
+            recipe, min_users, max_length, db.data_version(st.secrets["NEO4J_DATABASE"])
+        )
+    else:
+        # Popular recipes can produce many paths, so results are fetched one page at a time.
+        page = st.number_input("Page", min_value=1, value=1, step=1)
+
+        # Execute a Cypher query to find the commenting paths starting from the selected recipe.
+        commenting_paths = db.run_page(
+            # This query identifies sequences of recipes commented on by the same users
+            # after they have commented on the initial selected recipe.
+            cypher_filename="get_user_commenting_paths.cypher",
+            database=st.secrets["NEO4J_DATABASE"],
+            page=page - 1,
+            page_size=PAGE_SIZE,
+            recipe=recipe,
+        )
+
+    # Display the results in a Streamlit DataFrame.
+    st.dataframe(
+        pd.DataFrame(
+            {
+                # The 'commenting_path' column from the query result is a list of recipe names.
+                # This lambda function formats the list into a more readable string format.
+                "Commenting Path": commenting_paths["commenting_path"].apply(
+                    lambda x: " → ".join(x)
+                ),
+                "User Count": commenting_paths["user_count"],
+            }
+        ),
+        # Hide the default DataFrame index for a cleaner presentation.
+        hide_index=True,
+    )
+
+
+commenting_paths_panel(recipe)
+
+# Query timings for this page, in the sidebar.
+performance_panel(db)
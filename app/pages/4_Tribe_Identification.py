@@ -0,0 +1,127 @@
+"""
+This script creates a Streamlit web page for identifying and visualizing user
+"tribes" or communities within a recipe review dataset from a Neo4j database.
+
+Communities are detected by Louvain on the graph of users who comment on the
+same recipes. Detection runs as the `tribes` stage of `component.materialize`
+after each ingest and stores a `communityId` on every user, so this page only
+reads the stored communities. The results are visualized as an interactive
+graph in which users are colored by their community ID, showing clusters of
+users who comment on similar recipes. The page also identifies and lists
+"bridge" users, who are instrumental in connecting different communities.
+"""
+
+import streamlit as st
+import pandas as pd
+import colorsys
+from component.database import get_database
+from component.graph import NODE_SIZE, render
+from component.metrics import tag_page
+from component.panel import performance_panel
+
+# Connect to the Neo4j database (or the local in-process backend) configured in Streamlit secrets.
+db = get_database(st.secrets)
+# Attribute this page's queries in the performance panel and query metrics.
+tag_page("Tribe Identification")
+
+st.markdown("# Tribe Identification")
+
+st.info(
+    """
+Clusters of users who have commented on same recipes. This could be used to identify communities or "tribes" of users with shared interests, even if they don't directly interact.
+
+Showing the largest tribes, with the first 5 users of each tribe.
+"""
+)
+
+# Number of communities shown, largest first.
+tribe_count = st.number_input("Number of tribes", min_value=1, value=10, step=1)
+
+# Start the bridge-user query while the tribes are fetched and drawn; both read
+# the same stored communities.
+bridge_users_future = db.submit(
+    cypher_filename="get_bridge_users.cypher",
+    database=st.secrets["NEO4J_DATABASE"],
+    limit=tribe_count,
+)
+
+col1, col2 = st.columns([4, 1])
+
+with col1:
+    # Fetch the community data, which includes users, their assigned community IDs,
+    # and the recipes they've commented on.
+    df = db.run_query(
+        cypher_filename="get_tribes.cypher",
+        database=st.secrets["NEO4J_DATABASE"],
+        limit=tribe_count,
+    )
+    if df.empty:
+        st.warning(
+            "No tribes found. Build them with `python -m component.materialize co_commented tribes`."
+        )
+        st.stop()
+
+    # Create a mapping from each user to their assigned community ID.
+    # `first()` is used because a user appears once per recipe they commented on.
+    user_communities = df.dropna(subset=["user_name"]).groupby("user_name")["communityId"].first()
+
+    # --- Color Palette Generation for Communities ---
+    # Get a sorted list of unique community IDs to ensure consistent color mapping.
+    unique_communities = sorted(df["communityId"].dropna().unique().tolist())
+
+    # Helper function to convert HSL color values to a hex string for HTML/CSS.
+    def _hsl_to_hex(h):
+        r, g, b = colorsys.hls_to_rgb(h, 0.5, 0.65)
+        return "#{:02x}{:02x}{:02x}".format(int(r * 255), int(g * 255), int(b * 255))
+
+    # Generate a distinct color for each community by evenly spacing hues in the HSL color space.
+    community_colors = {
+        c: _hsl_to_hex(i / max(len(unique_communities), 1))
+        for i, c in enumerate(unique_communities)
+    }
+
+    # --- Node and edge tables ---
+    # Recipe nodes are larger and neutral; user nodes are colored by community.
+    recipes = pd.Series(df["recipe"].dropna().unique())
+    nodes = pd.concat(
+        [
+            pd.DataFrame(
+                {"id": recipes, "label": recipes, "title": recipes, "size": 25, "color": "#CCCCCC"}
+            ),
+            pd.DataFrame(
+                {
+                    "id": user_communities.index,
+                    "label": user_communities.index,
+                    "title": user_communities.astype(str).to_numpy(),
+                    "size": NODE_SIZE,
+                    "color": user_communities.map(community_colors).fillna("#888888").to_numpy(),
+                }
+            ),
+        ],
+        ignore_index=True,
+    )
+    # A user can share a name with a recipe; keep a single node per id.
+    nodes = nodes.drop_duplicates("id")
+
+    # Add edges between users and the recipes they have commented on.
+    edges = (
+        df.dropna(subset=["user_name", "recipe"])
+        .drop_duplicates(["user_name", "recipe"])
+        .rename(columns={"user_name": "source", "recipe": "target"})[["source", "target"]]
+    )
+
+    # Render the interactive graph in the Streamlit app. Without precomputed
+    # positions, physics lays the communities out.
+    return_value = render(nodes, edges, width=800, height=400, directed=False)
+
+with col2:
+    # In a separate column, display "bridge" users: users who connect different
+    # communities, identified by a separate Cypher query.
+    bridge_users = db.gather(bridge_users_future)[0]
+
+    st.dataframe(
+        pd.DataFrame({'"Bridge" User': bridge_users["user_name"]}), hide_index=True
+    )
+
+# Query timings for this page, in the sidebar.
+performance_panel(db)
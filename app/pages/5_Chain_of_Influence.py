@@ -2,7 +2,7 @@
 This script creates a Streamlit web page to analyze the "chain of influence"
 for individual users from a recipe review dataset stored in a Neo4j database.
 
-The page allows for the selection of a user (from a list sorted by reputation)
+The page allows for the selection of a user (searched by name)
 and displays key metrics about their influence. This includes their reputation score
 and the average number of "thumbs-up" their comments have received. It also
 provides a detailed table of all comments made by that user, including the comment
@@ -11,15 +11,17 @@ text, thumbs-up count, creation date, and the associated recipe.
 
 import streamlit as st
 import pandas as pd
-from component.database import Database
+from component.database import get_database
+from component.ingest import to_milliseconds
+from component.metrics import tag_page
+from component.panel import performance_panel
+from component.picker import user_picker
 import numpy as np
 
-# Initialize a connection to the Neo4j database using credentials from Streamlit secrets.
-db = Database(
-    uri=st.secrets["NEO4J_URI"],
-    username=st.secrets["NEO4J_USERNAME"],
-    password=st.secrets["NEO4J_PASSWORD"],
-)
+# Connect to the Neo4j database (or the local in-process backend) configured in Streamlit secrets.
+db = get_database(st.secrets)
+# Attribute this page's queries in the performance panel and query metrics.
+tag_page("Chain of Influence")
 
 st.markdown("# Chain of Influence")
 
@@ -34,39 +36,31 @@ This measures their indirect influence on a recipe's overall engagement.
 """
 )
 
-# Fetch a list of all users, sorted by their reputation score, to populate the dropdown.
-user_sort_by_rep = db.run_cypher(
-    query=db.generate_query(cypher_filename="get_users_sort_by_rep.cypher"),
-    database=st.secrets["NEO4J_DATABASE"],
-)
-
-# User input to select a user to analyze.
-user = st.selectbox("Select user", user_sort_by_rep["user_name"])
-# Retrieve the reputation score for the selected user from the DataFrame.
-reputation = user_sort_by_rep.query(f"user_name == '{user}'")["user_reputation"].values[
-    0
-]
+# User input to select a user to analyze. Only the top matches for the search text are
+# fetched (the highest-reputation users when nothing has been typed). The comments query
+# is started in parallel for the first few matches, so the default selection's comments
+# are in flight while the dropdown renders and the next likely picks are warm.
+selected = user_picker(db, st.secrets["NEO4J_DATABASE"], prefetch="get_comments.cypher")
+user = selected["user_name"]
+# The reputation score comes with the selected user's row.
+reputation = selected["user_reputation"]
 
 col1, col2, col3 = st.columns([1, 2, 2])
 
 # Display the selected user's reputation in a metric card.
 col1.metric(label="Reputation", value=reputation)
 
-comments = db.run_cypher(
-    query=db.generate_query(cypher_filename="get_comments.cypher").format(user=user),
+comments = db.run_query(
+    cypher_filename="get_comments.cypher",
     database=st.secrets["NEO4J_DATABASE"],
+    user=user,
 )
 # Convert the 'created_at' Unix timestamp to a readable datetime format.
-# The logic checks if the timestamp is likely in milliseconds ( > 1e12) or seconds
-# and converts it accordingly. This handles potential inconsistencies in the source data.
-if comments["created_at"].max() > 1e12:
-    comments["created_at"] = pd.to_datetime(
-        comments["created_at"], unit="ms", errors="coerce"
-    )
-else:
-    comments["created_at"] = pd.to_datetime(
-        comments["created_at"], unit="s", errors="coerce"
-    )
+# The user's comments span recipes whose timestamps are in seconds and ones in
+# milliseconds, so each value is converted to milliseconds on its own before parsing.
+comments["created_at"] = pd.to_datetime(
+    to_milliseconds(comments["created_at"]), unit="ms", errors="coerce"
+)
 
 # Calculate and display the average thumbs-up count for the user's comments.
 col2.metric(label="Average Thumbs-up Count", value=int(np.mean(comments["thumbs_up"])))
@@ -83,3 +77,6 @@ st.dataframe(
     ),
     hide_index=True,
 )  # Hide the default DataFrame index for a cleaner presentation.
+
+# Query timings for this page, in the sidebar.
+performance_panel(db)
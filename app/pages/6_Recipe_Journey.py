@@ -2,8 +2,8 @@
 This script creates a Streamlit web page to analyze the initial "commenting journey"
 of new users within a recipe review dataset from a Neo4j database.
 
-The analysis identifies the first three recipes that new users comment on, treating
-this sequence as their initial "journey." The script aggregates these journeys
+The analysis identifies the first few recipes (three by default) that new users
+comment on, treating this sequence as their initial "journey." The script aggregates these journeys
 across all new users to find the most common paths. The results are displayed in a
 table, showing each unique journey and the number of users who followed that path.
 This can provide insights into user onboarding and initial engagement patterns.
@@ -11,29 +11,47 @@ This can provide insights into user onboarding and initial engagement patterns.
 
 import streamlit as st
 import pandas as pd
-from component.database import Database
+from component.database import get_database
+from component.metrics import tag_page
+from component.panel import performance_panel
 
-# Initialize a connection to the Neo4j database using credentials from Streamlit secrets.
-db = Database(
-    uri=st.secrets["NEO4J_URI"],
-    username=st.secrets["NEO4J_USERNAME"],
-    password=st.secrets["NEO4J_PASSWORD"],
-)
+# Number of journeys shown per page.
+PAGE_SIZE = 50
+
+# Connect to the Neo4j database (or the local in-process backend) configured in Streamlit secrets.
+db = get_database(st.secrets)
+# Attribute this page's queries in the performance panel and query metrics.
+tag_page("Recipe Journey")
 
 st.markdown("# Recipe Journey")
 
 # Provide a description of the analysis for the user.
 st.info(
     """
-Commenting journey of a new user. What are the first 3 recipes they comment on?
+Commenting journey of a new user. What are the first N recipes they comment on?
 """
 )
 
+col1, col2, col3 = st.columns(3)
+with col1:
+    # Number of recipes at the start of each user's history that make up their journey.
+    length = st.number_input("Journey length", min_value=2, value=3, step=1)
+with col2:
+    # Minimum number of users who must share a journey for it to be shown.
+    min_users = st.number_input("Min. # users", min_value=1, value=1, step=1)
+with col3:
+    # Almost every journey is unique, so results are fetched one page at a time.
+    page = st.number_input("Page", min_value=1, value=1, step=1)
+
 # Execute a Cypher query to get the initial commenting journeys for new users.
 # The query logic is contained in the specified .cypher file.
-df = db.run_cypher(
-    query=db.generate_query(cypher_filename="get_new_user_commenting_journey.cypher"),
+df = db.run_page(
+    cypher_filename="get_new_user_commenting_journey.cypher",
     database=st.secrets["NEO4J_DATABASE"],
+    page=page - 1,
+    page_size=PAGE_SIZE,
+    length=length,
+    min_users=min_users,
 )
 
 # Display the results in a Streamlit DataFrame.
@@ -49,3 +67,6 @@ st.dataframe(
     # Hide the default DataFrame index for a cleaner presentation.
     hide_index=True,
 )
+
+# Query timings for this page, in the sidebar.
+performance_panel(db)
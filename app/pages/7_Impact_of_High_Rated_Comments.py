@@ -9,18 +9,26 @@ After finding this pivotal comment, it calculates the total number of replies an
 thumbs-up received by all comments posted *after* it. This analysis aims to
 quantify the "influence" a positive, high-profile comment has on community
 interaction.
+
+A second section ranks every recipe at once by "influencer lift": average
+engagement per comment after the pivotal comment relative to before it.
 """
 
 import streamlit as st
 import pandas as pd
-from component.database import Database
+from component.database import get_database
+from component.ingest import to_milliseconds
+from component.metrics import tag_page
+from component.panel import performance_panel
+from component.picker import recipe_picker
 
-# Initialize a connection to the Neo4j database using credentials from Streamlit secrets.
-db = Database(
-    uri=st.secrets["NEO4J_URI"],
-    username=st.secrets["NEO4J_USERNAME"],
-    password=st.secrets["NEO4J_PASSWORD"],
-)
+# Number of recipes shown per page of the influencer lift ranking.
+PAGE_SIZE = 50
+
+# Connect to the Neo4j database (or the local in-process backend) configured in Streamlit secrets.
+db = get_database(st.secrets)
+# Attribute this page's queries in the performance panel and query metrics.
+tag_page("Impact of High-Rated Comments")
 
 st.markdown("# Impact of High-Rated Comments")
 
@@ -35,49 +43,118 @@ For a given recipe, what is the total reply_count and thumbs_up on comments post
 """
 )
 
-# Fetch the list of all available recipes to populate the selection dropdown.
-all_recipes = db.run_cypher(
-    query=db.generate_query(cypher_filename="get_all_recipes.cypher"),
+# The recipe analysis and the lift ranking are independent fragments: searching for or
+# selecting a recipe reruns only the recipe analysis, and changing the page reruns only
+# the ranking.
+impact_section = st.container()
+lift_section = st.container()
+
+# On a full run, start the lift ranking (for the page last selected) in the background
+# while the recipe analysis runs; the ranking fragment then picks up the in-flight query.
+# The ranking computes the impact metrics for every recipe from the precomputed
+# engagement index and ranks them by lift.
+db.submit_page(
+    cypher_filename="get_influencer_lift.cypher",
     database=st.secrets["NEO4J_DATABASE"],
+    page=st.session_state.get("lift_page", 1) - 1,
+    page_size=PAGE_SIZE,
 )
 
-# User input to select a recipe to analyze.
-recipe = st.selectbox("Select recipe", all_recipes["recipe_name"])
 
-# Execute a Cypher query to find the impact of the first 5-star comment from a high-rep user.
-df = db.run_cypher(
-    query=db.generate_query(
+@st.fragment
+def impact_panel():
+    # Fragment reruns start in a new script thread, so the page tag is set again.
+    tag_page("Impact of High-Rated Comments")
+
+    # User input to select a recipe to analyze. Only the top matches for the search
+    # text are fetched, not the whole catalog.
+    recipe = recipe_picker(db, st.secrets["NEO4J_DATABASE"])
+
+    # Execute a Cypher query to find the impact of the first 5-star comment from a high-rep user.
+    df = db.run_query(
         # This query finds the first 5-star comment from a top-100 user on the selected recipe
         # and then aggregates the reply and thumbs-up counts of all subsequent comments.
-        cypher_filename="get_reply_count_thumbs_up.cypher"
-    ).format(recipe=recipe),
-    database=st.secrets["NEO4J_DATABASE"],
-)
-# Convert the 'created_at' Unix timestamp to a readable datetime format.
-# The logic checks if the timestamp is likely in milliseconds ( > 1e12) or seconds
-# and converts it accordingly. This handles potential inconsistencies in the source data.
-if df["created_at"].max() > 1e12:
-    df["created_at"] = pd.to_datetime(df["created_at"], unit="ms", errors="coerce")
-else:
-    df["created_at"] = pd.to_datetime(df["created_at"], unit="s", errors="coerce")
-
-# This block only executes if a qualifying 5-star comment was found for the selected recipe.
-if df.shape[0] >= 1:
-    st.markdown("First 5-star comment")
-    # Display a table with details about the influential comment and the user who posted it.
+        cypher_filename="get_reply_count_thumbs_up.cypher",
+        database=st.secrets["NEO4J_DATABASE"],
+        recipe=recipe,
+    )
+    # Convert the 'created_at' Unix timestamp to a readable datetime format.
+    # Timestamps are in seconds for some recipes and milliseconds for others, so each
+    # value is converted to milliseconds on its own before parsing.
+    df["created_at"] = pd.to_datetime(to_milliseconds(df["created_at"]), unit="ms", errors="coerce")
+
+    # This block only executes if a qualifying 5-star comment was found for the selected recipe.
+    if df.shape[0] >= 1:
+        st.markdown("First 5-star comment")
+        # Display a table with details about the influential comment and the user who posted it.
+        st.dataframe(
+            pd.DataFrame(
+                {
+                    "User": df["user"],
+                    "Reputation": df["user_reputation"],
+                    "Posted": df["created_at"],
+                    "Comment": df["comment"],
+                }
+            ),
+            hide_index=True,  # Hide the default DataFrame index for a cleaner presentation.
+        )
+
+        # Display the calculated impact metrics in separate columns.
+        col1, col2, col3 = st.columns([1, 1, 3])
+        col1.metric("Total Reply Count", df["total_reply_count"][0])
+        col2.metric("Total Thumbs-Up", df["total_thumbs_up"][0])
+
+
+@st.fragment
+def lift_panel():
+    # Fragment reruns start in a new script thread, so the page tag is set again.
+    tag_page("Impact of High-Rated Comments")
+
+    st.markdown("## Influencer Lift Across All Recipes")
+    st.caption(
+        "Engagement = reply_count + thumbs_up per comment. "
+        "Lift = average engagement after the first 5-star comment from a high-reputation user "
+        "divided by the average up to and including it."
+    )
+
+    # Popular catalogs have many recipes with a pivot comment, so the ranking is paged.
+    page = st.number_input("Page", min_value=1, value=1, step=1, key="lift_page")
+
+    lift = db.run_page(
+        cypher_filename="get_influencer_lift.cypher",
+        database=st.secrets["NEO4J_DATABASE"],
+        page=page - 1,
+        page_size=PAGE_SIZE,
+    )
+
+    # Convert the pivot timestamps the same way as above. The ranking mixes recipes
+    # whose timestamps are in seconds with ones in milliseconds.
+    lift["created_at"] = pd.to_datetime(to_milliseconds(lift["created_at"]), unit="ms", errors="coerce")
+
     st.dataframe(
         pd.DataFrame(
             {
-                "User": df["user"],
-                "Reputation": df["user_reputation"],
-                "Posted": df["created_at"],
-                "Comment": df["comment"],
+                "Recipe": lift["recipe"],
+                "User": lift["user"],
+                "Posted": lift["created_at"],
+                "Comments Before": lift["comments_before"],
+                "Comments After": lift["comments_after"],
+                "Total Reply Count": lift["total_reply_count"],
+                "Total Thumbs-Up": lift["total_thumbs_up"],
+                "Engagement Before": lift["engagement_before"],
+                "Engagement After": lift["engagement_after"],
+                "Lift": lift["lift"],
             }
         ),
-        hide_index=True,  # Hide the default DataFrame index for a cleaner presentation.
+        hide_index=True,
     )
 
-    # Display the calculated impact metrics in separate columns.
-    col1, col2, col3 = st.columns([1, 1, 3])
-    col1.metric("Total Reply Count", df["total_reply_count"][0])
-    col2.metric("Total Thumbs-Up", df["total_thumbs_up"][0])
+
+with impact_section:
+    impact_panel()
+
+with lift_section:
+    lift_panel()
+
+# Query timings for this page, in the sidebar.
+performance_panel(db)
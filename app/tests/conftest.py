@@ -0,0 +1,73 @@
+"""Shared fixtures. Tests run from the repository root or `app/`:
+
+    python -m pytest app/tests
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Pages and CLIs import `component.*` with `app/` as the working directory.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from component.local import LocalDatabase  # noqa: E402
+
+
+def fixture_frames():
+    """A tiny graph whose query results can be worked out by hand.
+
+    Chronological recipes per user:
+
+        Alice (100): Apple Pie, Banana Bread
+        Bob (50):    Apple Pie, Banana Bread
+        Cara (10):   Apple Pie, Carrot Cake
+        Dan (1):     Carrot Cake
+
+    Date Loaf has no comments. c1 appears twice (the later row wins) and c8
+    belongs to a user that doesn't exist, so it is dropped like the MATCH in
+    the graph loaders drops it.
+    """
+    recipes = pd.DataFrame(
+        {
+            "recipe_number": [1, 2, 3, 4],
+            "recipe_code": [101, 102, 103, 104],
+            "recipe_name": ["Apple Pie", "Banana Bread", "Carrot Cake", "Date Loaf"],
+        }
+    )
+    users = pd.DataFrame(
+        {
+            "user_id": ["u1", "u2", "u3", "u4"],
+            "user_name": ["Alice", "Bob", "Cara", "Dan"],
+            "user_reputation": [100, 50, 10, 1],
+        }
+    )
+    comments = pd.DataFrame(
+        [
+            ("c1", 101, "u1", 100, 0, 5, 0, 5, 100, "lovely"),
+            ("c2", 102, "u1", 200, 0, 1, 0, 4, 100, "good"),
+            ("c3", 101, "u2", 150, 0, 3, 0, 5, 100, "great"),
+            ("c4", 102, "u2", 250, 0, 2, 0, 3, 100, "fine"),
+            ("c5", 101, "u3", 300, 0, 0, 0, 2, 100, "meh"),
+            ("c6", 103, "u3", 400, 0, 4, 0, 5, 100, "tasty"),
+            ("c7", 103, "u4", 500, 0, 1, 0, 5, 100, "yum"),
+            ("c8", 101, "u9", 600, 0, 9, 0, 1, 100, "orphan"),
+            ("c1", 101, "u1", 100, 0, 7, 0, 5, 100, "lovely, edited"),
+        ],
+        columns=[
+            "comment_id", "recipe_code", "user_id", "created_at", "reply_count",
+            "thumbs_up", "thumbs_down", "stars", "best_score", "text",
+        ],
+    )
+    return recipes, users, comments
+
+
+@pytest.fixture
+def frames():
+    return fixture_frames()
+
+
+@pytest.fixture
+def local_db(frames):
+    return LocalDatabase(*frames)
@@ -0,0 +1,89 @@
+"""API parameter binding, ETag revalidation and batches, on the local backend."""
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from component.api import ANALYSES, MAX_PAGE_SIZE, PAGE_SIZE, create_app  # noqa: E402
+
+
+@pytest.fixture
+def client(local_db):
+    return TestClient(create_app(local_db, "neo4j"))
+
+
+def test_bind_types_and_defaults():
+    assert ANALYSES["reach"].bind({}) == {"n": 10}
+    assert ANALYSES["reach"].bind({"n": "3"}) == {"n": 3}
+    assert ANALYSES["influencer-lift"].bind({}) == {"page": 0, "page_size": PAGE_SIZE}
+
+
+@pytest.mark.parametrize(
+    "name, params, error",
+    [
+        ("similar-recipes", {}, "missing parameter: recipe"),
+        ("reach", {"n": "ten"}, "n must be int"),
+        ("reach", {"n": 3, "limit": 5}, "unexpected parameters: limit"),
+        ("reach", {"page": 1}, "unexpected parameters: page"),
+        ("journeys", {"page": -1}, "page must be >= 0"),
+        ("journeys", {"page_size": MAX_PAGE_SIZE + 1}, "page_size between"),
+    ],
+)
+def test_bind_rejects(name, params, error):
+    with pytest.raises(ValueError, match=error):
+        ANALYSES[name].bind(params)
+
+
+def test_every_analysis_runs_locally(local_db):
+    for analysis in ANALYSES.values():
+        assert analysis.cypher_filename in local_db._handlers
+
+
+def test_get_returns_rows_and_etag(client):
+    response = client.get("/similar-recipes", params={"recipe": "Apple Pie"})
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["cache-control"] == "no-cache"
+    body = response.json()
+    assert body["params"] == {"recipe": "Apple Pie"}
+    assert [row["recipe_name"] for row in body["rows"]] == ["Banana Bread", "Carrot Cake"]
+
+
+def test_if_none_match_gets_304(client):
+    etag = client.get("/reach").headers["etag"]
+    for if_none_match in [etag, f"W/{etag}", f'"other", {etag}', "*"]:
+        response = client.get("/reach", headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+    assert client.get("/reach", headers={"If-None-Match": '"other"'}).status_code == 200
+    # Different parameters, different body and ETag.
+    assert client.get("/reach", params={"n": 1}).headers["etag"] != etag
+
+
+def test_invalid_parameters_are_422(client):
+    response = client.get("/reach", params={"n": "ten"})
+    assert response.status_code == 422
+    assert response.json() == {"error": "n must be int"}
+
+
+def test_batch_statuses_in_order(client):
+    response = client.post(
+        "/batch",
+        json={
+            "requests": [
+                {"analysis": "user-comments", "params": {"user": "Alice"}},
+                {"analysis": "nope"},
+                {"analysis": "reach", "params": {"n": "ten"}},
+                "not an object",
+            ]
+        },
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == [200, 404, 422, 422]
+    assert [row["thumbs_up"] for row in results[0]["result"]["rows"]] == [7, 1]
+    assert client.post("/batch", json={"requests": "x"}).status_code == 422
@@ -0,0 +1,80 @@
+"""Louvain, label propagation and modularity on a planted partition."""
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from component.communities import co_comment_graph, label_propagation, louvain, modularity
+
+
+def planted_partition(sizes=(5, 5, 5)):
+    """Cliques of the given sizes, joined in a chain by one edge each."""
+    edges, start, planted = [], 0, []
+    for community, size in enumerate(sizes):
+        nodes = range(start, start + size)
+        edges += [(a, b) for a in nodes for b in nodes if a < b]
+        if start:
+            edges.append((start - 1, start))
+        planted += [community] * size
+        start += size
+    rows, cols = np.array(edges).T
+    graph = sparse.csr_matrix(
+        (np.ones(2 * len(edges)), (np.r_[rows, cols], np.r_[cols, rows])), shape=(start, start)
+    )
+    return graph, np.array(planted)
+
+
+def same_partition(a, b) -> bool:
+    return len(set(zip(a, b))) == len(set(a)) == len(set(b))
+
+
+def test_modularity_of_planted_partition():
+    graph, planted = planted_partition((5, 5))
+    # m = 21 edges; each clique has 10 inner edges and total degree 21.
+    expected = 2 * (10 / 21 - (21 / 42) ** 2)
+    assert modularity(graph, planted) == pytest.approx(expected)
+    assert modularity(graph, np.zeros(10, dtype=int)) == pytest.approx(0.0)
+
+
+def test_louvain_recovers_planted_partition():
+    graph, planted = planted_partition()
+    labels = louvain(graph)
+    assert same_partition(labels, planted)
+    assert modularity(graph, labels) == pytest.approx(modularity(graph, planted))
+
+
+def test_louvain_is_parallel_safe():
+    graph, planted = planted_partition((6, 5, 4, 7))
+    assert same_partition(louvain(graph, workers=1), planted)
+    assert same_partition(louvain(graph, workers=4), planted)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_louvain_finds_at_least_planted_modularity(seed):
+    rng = np.random.default_rng(seed)
+    graph, planted = planted_partition(rng.integers(3, 9, size=rng.integers(2, 6)))
+    # Small cliques may merge (the resolution limit), but never to lower modularity.
+    assert modularity(graph, louvain(graph, seed=seed)) >= modularity(graph, planted) - 1e-9
+
+
+def test_communities_are_numbered_by_size():
+    graph, _ = planted_partition((3, 6, 4))
+    labels = louvain(graph)
+    sizes = np.bincount(labels)
+    assert list(sizes) == sorted(sizes, reverse=True)
+
+
+def test_label_propagation_recovers_planted_partition():
+    graph, planted = planted_partition()
+    assert same_partition(label_propagation(graph), planted)
+
+
+def test_co_comment_graph_counts_shared_recipes():
+    user_recipe = sparse.csr_matrix(np.array([[1, 1, 0], [1, 1, 0], [0, 1, 1]]))
+    graph = co_comment_graph(user_recipe).toarray()
+    assert graph.tolist() == [[0, 2, 1], [2, 0, 1], [1, 1, 0]]
+
+
+def test_empty_graph():
+    graph = sparse.csr_matrix((0, 0))
+    assert len(louvain(graph)) == 0
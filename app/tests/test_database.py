@@ -0,0 +1,34 @@
+"""Parsing of the server's query-plan cache metrics."""
+
+import pandas as pd
+
+from component.database import _plan_cache_counters
+
+
+def jmx(name: str, count: int) -> tuple:
+    return f"neo4j.metrics:name={name}", {"Count": {"description": "", "value": count}}
+
+
+def test_plan_cache_counters_per_cache():
+    df = pd.DataFrame(
+        [
+            jmx("neo4j.neo4j.cypher.cache.executable_query_cache.hits", 90),
+            jmx("neo4j.neo4j.cypher.cache.executable_query_cache.misses", 10),
+            jmx("neo4j.neo4j.cypher.cache.ast.hits", 3),
+            jmx("neo4j.neo4j.cypher.cache.ast.compiled", 7),
+            jmx("neo4j.system.cypher.cache.executable_query_cache.hits", 1000),
+        ],
+        columns=["name", "attributes"],
+    )
+    stats = _plan_cache_counters(df, "neo4j")
+    assert stats.to_dict("list") == {
+        "cache": ["ast", "executable_query_cache"],
+        "hits": [3, 90],
+        "misses": [0, 10],
+        "hit_rate": [1.0, 0.9],
+    }
+
+
+def test_plan_cache_counters_without_metrics():
+    assert _plan_cache_counters(pd.DataFrame(columns=["name", "attributes"]), "neo4j") is None
+    assert _plan_cache_counters(pd.DataFrame(), "neo4j") is None
@@ -0,0 +1,169 @@
+"""Delta ingest: mixed created_at units, changed rows and the lookback window."""
+
+import threading
+
+import pandas as pd
+import pytest
+
+from component import ingest
+from component.ingest import MILLISECONDS_FROM, MS_PER_DAY, changed_rows, ingest_delta, to_milliseconds
+
+DAY = MS_PER_DAY
+NOW = 1_700_000_000_000
+
+
+class FakeGraph():
+    """Answers the ingest queries from dicts, with the semantics of their Cypher."""
+
+    def __init__(self):
+        self.recipes, self.users, self.comments = {}, {}, {}
+        self.watermark = None
+        self._lock = threading.Lock()
+
+    def execute(self, cypher_filename: str, database: str, **params) -> pd.DataFrame:
+        comments = pd.DataFrame(
+            list(self.comments.values()), columns=["comment_id", *ingest.COMMENT_PROPERTIES]
+        )
+        if cypher_filename == "ingest/get_watermark.cypher":
+            return pd.DataFrame([self.watermark] if self.watermark else [], columns=["created_at_ms", "comment_id"])
+        if cypher_filename == "ingest/get_latest_comment.cypher":
+            latest = comments.sort_values(["created_at", "comment_id"]).groupby(
+                comments["created_at"] >= MILLISECONDS_FROM
+            ).tail(1)
+            return latest[["created_at", "comment_id"]].reset_index(drop=True)
+        if cypher_filename == "ingest/get_comments_since.cypher":
+            in_ms = comments["created_at"] >= params["since_ms"]
+            in_s = (comments["created_at"] >= params["since_s"]) & (comments["created_at"] < MILLISECONDS_FROM)
+            return comments[in_ms | in_s].astype(object)
+        if cypher_filename == "ingest/get_users_by_id.cypher":
+            rows = [self.users[key] for key in params["user_ids"] if key in self.users]
+            return pd.DataFrame(rows, columns=ingest.USER_COLUMNS)
+        if cypher_filename == "ingest/get_recipes_by_code.cypher":
+            rows = [self.recipes[key] for key in params["recipe_codes"] if key in self.recipes]
+            return pd.DataFrame(rows, columns=ingest.RECIPE_COLUMNS)
+        if cypher_filename == "ingest/get_commenters_of_recipes.cypher":
+            users = {row["user_id"] for row in self.comments.values() if row["recipe_code"] in params["recipe_codes"]}
+            return pd.DataFrame({"user_id": sorted(users)})
+        if cypher_filename == "ingest/set_watermark.cypher":
+            self.watermark = (params["created_at_ms"], params["comment_id"])
+            return pd.DataFrame()
+        raise KeyError(cypher_filename)
+
+    def write(self, cypher_filename: str, database: str, rows: list) -> list:
+        with self._lock:
+            if cypher_filename == "ingest/merge_recipes.cypher":
+                self.recipes.update((row["recipe_code"], row) for row in rows)
+            elif cypher_filename == "ingest/merge_users.cypher":
+                self.users.update((row["user_id"], row) for row in rows)
+            else:
+                # MATCH on the user and recipe: comments without them are skipped.
+                written = [row for row in rows if row["user_id"] in self.users and row["recipe_code"] in self.recipes]
+                for row in written:
+                    self.comments[row["comment_id"]] = {
+                        "comment_id": row["comment_id"],
+                        "user_id": row["user_id"],
+                        "recipe_code": row["recipe_code"],
+                        **row["properties"],
+                    }
+                return [{"written": len(written)}]
+        return []
+
+
+def comment(comment_id, user_id, created_at, thumbs_up=0, recipe_code=1):
+    return {
+        "comment_id": comment_id,
+        "recipe_code": recipe_code,
+        "user_id": user_id,
+        "created_at": created_at,
+        "reply_count": 0,
+        "thumbs_up": thumbs_up,
+        "thumbs_down": 0,
+        "stars": 5,
+        "best_score": 100,
+        "text": "nice",
+    }
+
+
+def write_export(data_dir, comments, reputation=10, recipe_name="Pie"):
+    pd.DataFrame({"recipe_number": [1], "recipe_code": [1], "recipe_name": [recipe_name]}).to_csv(
+        data_dir / "recipe.csv", index=False
+    )
+    pd.DataFrame(
+        {"user_id": ["u1", "u2"], "user_name": ["Ann", "Ben"], "user_reputation": [reputation, 5]}
+    ).to_csv(data_dir / "user.csv", index=False)
+    pd.DataFrame(comments).to_csv(data_dir / "comment.csv", index=False)
+
+
+@pytest.fixture(autouse=True)
+def no_schema(monkeypatch):
+    monkeypatch.setattr(ingest.schema, "apply", lambda db, database: None)
+
+
+def test_to_milliseconds_converts_each_value():
+    created_at = pd.Series([1_600_000_000, 1_600_000_000_123, None])
+    assert to_milliseconds(created_at).tolist() == [1_600_000_000_000, 1_600_000_000_123, pd.NA]
+
+
+def test_changed_rows():
+    incoming = pd.DataFrame(
+        {"key": ["a", "b", "c", "d"], "value": [1, 2, None, 4]}
+    ).astype({"value": "Int64"})
+    existing = pd.DataFrame({"key": ["a", "b", "c"], "value": [1, 3, None]}, dtype=object)
+    # b changed and d is new; a is equal and c is missing on both sides.
+    assert changed_rows(incoming, existing, "key", ["value"])["key"].tolist() == ["b", "d"]
+    assert len(changed_rows(incoming, existing.iloc[:0], "key", ["value"])) == 4
+
+
+def test_delta_ingest_with_mixed_units_and_lookback(tmp_path):
+    db = FakeGraph()
+    old = comment("c1", "u1", NOW - 10 * DAY)                  # milliseconds
+    recent = comment("c2", "u1", (NOW - 1 * DAY) // 1000)      # seconds
+    latest = comment("c3", "u2", NOW)                          # milliseconds
+    write_export(tmp_path, [old, recent, latest])
+
+    changes = ingest_delta(db, "neo4j", tmp_path, lookback_days=3)
+    assert changes["comments"] == 3
+    assert db.watermark == (NOW, "c3")
+
+    # Nothing new: nothing is written.
+    changes = ingest_delta(db, "neo4j", tmp_path, lookback_days=3)
+    assert changes == {"user_ids": [], "recipe_codes": [], "comments": 0, "skipped_comments": 0}
+
+    # Edits inside the lookback window are picked up, older ones are not; a new
+    # comment in seconds moves the watermark, compared in milliseconds.
+    old["thumbs_up"], recent["thumbs_up"] = 7, 9
+    newer = comment("c4", "u2", (NOW + DAY) // 1000)
+    write_export(tmp_path, [old, recent, latest, newer])
+    changes = ingest_delta(db, "neo4j", tmp_path, lookback_days=3)
+    assert changes["comments"] == 2
+    assert db.comments["c2"]["thumbs_up"] == 9
+    assert db.comments["c1"]["thumbs_up"] == 0
+    assert db.comments["c4"]["created_at"] == (NOW + DAY) // 1000
+    assert db.watermark == (NOW + DAY, "c4")
+    assert changes["user_ids"] == ["u1", "u2"]
+
+
+def test_delta_ingest_reports_changed_users_and_skipped_comments(tmp_path):
+    db = FakeGraph()
+    write_export(tmp_path, [comment("c1", "u1", NOW)])
+    ingest_delta(db, "neo4j", tmp_path)
+
+    write_export(tmp_path, [comment("c1", "u1", NOW), comment("c2", "nobody", NOW + 1)], reputation=99)
+    changes = ingest_delta(db, "neo4j", tmp_path)
+    assert db.users["u1"]["user_reputation"] == 99
+    assert changes["comments"] == 0
+    assert changes["skipped_comments"] == 1
+    assert "u1" in changes["user_ids"]
+
+
+def test_delta_ingest_refreshes_commenters_of_renamed_recipes(tmp_path):
+    db = FakeGraph()
+    write_export(tmp_path, [comment("c1", "u1", NOW), comment("c2", "u2", NOW + 1)])
+    ingest_delta(db, "neo4j", tmp_path)
+
+    # No new comments, but both commenters' recipe sequences name the recipe.
+    write_export(tmp_path, [comment("c1", "u1", NOW), comment("c2", "u2", NOW + 1)], recipe_name="Apple Pie")
+    changes = ingest_delta(db, "neo4j", tmp_path)
+    assert db.recipes[1]["recipe_name"] == "Apple Pie"
+    assert changes["user_ids"] == ["u1", "u2"]
+    assert changes["recipe_codes"] == [1]
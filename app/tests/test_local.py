@@ -0,0 +1,86 @@
+"""LocalDatabase against the results the Cypher queries give on the same graph."""
+
+import pytest
+
+from component.local import LocalDatabase
+from component.queries import QueryRegistry, UnsupportedQueryError
+
+DATABASE = "neo4j"
+
+
+def test_every_page_query_has_a_handler(local_db):
+    page_queries = {query.name for query in local_db.queries if "/" not in query.name}
+    assert page_queries <= local_db._handlers.keys()
+
+
+def test_missing_handler_fails_at_construction(monkeypatch, tmp_path, frames):
+    (tmp_path / "get_everything.cypher").write_text("MATCH (n) RETURN n;\n")
+    monkeypatch.setattr("component.local.get_registry", lambda: QueryRegistry(tmp_path))
+    with pytest.raises(UnsupportedQueryError, match="get_everything.cypher"):
+        LocalDatabase(*frames)
+
+
+def test_write_queries_are_unsupported(local_db):
+    with pytest.raises(UnsupportedQueryError):
+        local_db.execute("materialize/get_influencer_ids.cypher", DATABASE)
+
+
+def test_users_sort_by_rep(local_db):
+    df = local_db.run_query("get_users_sort_by_rep.cypher", DATABASE, limit=2)
+    assert df.to_dict("list") == {"user_name": ["Alice", "Bob"], "user_reputation": [100, 50]}
+
+
+def test_reached_user_counts_shared_recipes(local_db):
+    # CO_COMMENTED.shared_recipes: Alice-Bob 2 (Apple Pie, Banana Bread), Alice-Cara 1.
+    df = local_db.run_query("get_reached_user.cypher", DATABASE, user="Alice", recipe_count=2)
+    assert df.to_dict("list") == {
+        "reached_user": ["Bob"],
+        "recipe_count": [2],
+        "reached_user_reputation": [50],
+    }
+    df = local_db.run_query("get_reached_user.cypher", DATABASE, user="Alice", recipe_count=1)
+    assert sorted(df["reached_user"]) == ["Bob", "Cara"]
+
+
+def test_high_rep_user_comment_reach(local_db):
+    df = local_db.run_query("get_high_rep_user_comment_reach.cypher", DATABASE, n=2)
+    assert list(df["top_users.user_name"]) == ["Alice", "Bob"]
+    assert list(df["reach"]) == [2, 2]
+    assert sorted(df["users_reached"][0]) == ["Bob", "Cara"]
+    assert sorted(df["recipe_name"][0]) == ["Apple Pie", "Banana Bread"]
+
+
+def test_similar_recipes(local_db):
+    df = local_db.run_query("get_similar_recipes.cypher", DATABASE, recipe="Apple Pie")
+    assert list(df["recipe_name"]) == ["Banana Bread", "Carrot Cake"]
+    assert list(df["shared_commenter_count"]) == [2, 1]
+    assert sorted(df["shared_commenters"][0]) == ["Alice", "Bob"]
+
+
+def test_comments_keep_last_row_and_order_by_thumbs_up(local_db):
+    df = local_db.run_query("get_comments.cypher", DATABASE, user="Alice")
+    assert list(df["thumbs_up"]) == [7, 1]
+    assert list(df["recipe"]) == ["Apple Pie", "Banana Bread"]
+
+
+def test_orphan_comments_are_dropped(local_db):
+    sketches = local_db.run_query("get_recipe_sketches.cypher", DATABASE)
+    counts = dict(zip(sketches["recipe_name"], sketches["commenter_count"]))
+    # Date Loaf has no comments, so it has no sketch, and the orphan comment adds no commenter.
+    assert counts == {"Apple Pie": 3, "Banana Bread": 2, "Carrot Cake": 2}
+
+
+def test_new_user_commenting_journey(local_db):
+    df = local_db.run_query(
+        "get_new_user_commenting_journey.cypher", DATABASE, length=2, min_users=2
+    )
+    assert df.to_dict("list") == {
+        "commenting_path": [["Apple Pie", "Banana Bread"]],
+        "user_count": [2],
+    }
+
+
+def test_recipe_sequences_are_chronological(local_db):
+    df = local_db.run_query("get_recipe_sequences.cypher", DATABASE, recipe="Carrot Cake")
+    # Dan only commented on Carrot Cake, so he has no sequence to follow.
+    assert list(map(list, df["recipe_sequence"])) == [["Apple Pie", "Carrot Cake"]]
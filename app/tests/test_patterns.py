@@ -0,0 +1,62 @@
+"""PrefixSpan support counts and the sharded (SON) path."""
+
+import random
+
+from component.patterns import frequent_subsequences, prefixspan
+
+SEQUENCES = [
+    ("A", "B", "C"),
+    ("A", "C"),
+    ("A", "B"),
+    ("B", "C", "D"),
+]
+
+
+def test_prefixspan_support_counts():
+    support = prefixspan(SEQUENCES, min_count=1, max_length=3)
+    assert support[("A",)] == 3
+    assert support[("A", "B")] == 2
+    # Gaps are allowed: A ... C is in the first sequence too.
+    assert support[("A", "C")] == 2
+    assert support[("B", "C")] == 2
+    assert support[("A", "B", "C")] == 1
+    # Order matters.
+    assert ("C", "A") not in support
+
+
+def test_prefixspan_prunes_by_min_count_and_max_length():
+    support = prefixspan(SEQUENCES, min_count=2, max_length=2)
+    assert support == {
+        ("A",): 3,
+        ("B",): 3,
+        ("C",): 3,
+        ("A", "B"): 2,
+        ("A", "C"): 2,
+        ("B", "C"): 2,
+    }
+
+
+def test_frequent_subsequences_rows():
+    df = frequent_subsequences(SEQUENCES, min_support=2, max_length=3)
+    assert df["commenting_path"].tolist() == [["A", "B"], ["A", "C"], ["B", "C"]]
+    assert df["user_count"].tolist() == [2, 2, 2]
+    assert df["support"].tolist() == [0.5, 0.5, 0.5]
+
+
+def test_frequent_subsequences_fractional_support():
+    df = frequent_subsequences(SEQUENCES, min_support=0.75, max_length=3, min_length=1)
+    assert df["commenting_path"].tolist() == [["A"], ["B"], ["C"]]
+
+
+def test_frequent_subsequences_empty_input():
+    assert frequent_subsequences([[], []]).empty
+
+
+def test_sharded_mining_matches_single_process():
+    rng = random.Random(0)
+    items = [f"r{i}" for i in range(12)]
+    sequences = [rng.sample(items, rng.randint(1, 6)) for _ in range(300)]
+    single = frequent_subsequences(sequences, min_support=15, max_length=3, workers=1)
+    sharded = frequent_subsequences(sequences, min_support=15, max_length=3, workers=3)
+    assert not single.empty
+    assert single.to_dict("list") == sharded.to_dict("list")
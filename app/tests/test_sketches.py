@@ -0,0 +1,161 @@
+"""HyperLogLog and MinHash estimates against their documented error bounds."""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from component import sketches
+from component.sketches import NUM_HASHES, REGISTERS, RecipeSketches, hash_users, hll_estimate
+
+# Relative standard error of HyperLogLog with 2048 registers.
+HLL_ERROR = 1.04 / math.sqrt(REGISTERS)
+
+
+def build(audiences: dict) -> RecipeSketches:
+    """Sketches for {recipe name: user IDs}."""
+    names = list(audiences)
+    pair_recipes = np.concatenate([[i] * len(users) for i, users in enumerate(audiences.values())])
+    users = np.concatenate([list(users) for users in audiences.values()])
+    return RecipeSketches.from_pairs(
+        np.arange(len(names)), np.array(names, dtype=object), pair_recipes.astype(np.int64), hash_users(users)
+    )
+
+
+def user_ids(start: int, stop: int) -> list:
+    return [f"u{i}" for i in range(start, stop)]
+
+
+@pytest.mark.parametrize("count", [100, 3_000, 20_000, 100_000])
+def test_hll_reach_within_error_bound(count):
+    estimate = build({"r": user_ids(0, count)}).reach(["r"])
+    # Four standard errors; linear counting (small counts) is tighter still.
+    assert abs(estimate - count) <= 4 * HLL_ERROR * count
+
+
+def test_hll_union_over_recipes():
+    # 30,000 users in three overlapping audiences, 50,000 commenter rows in all.
+    recipes = build(
+        {"a": user_ids(0, 20_000), "b": user_ids(10_000, 30_000), "c": user_ids(25_000, 30_000)}
+    )
+    estimate = recipes.reach(["a", "b", "c"])
+    assert abs(estimate - 30_000) <= 4 * HLL_ERROR * 30_000
+    assert recipes.reach(["missing"]) == 0.0
+
+
+def test_hll_empty_registers():
+    assert hll_estimate(np.zeros(REGISTERS, dtype=np.uint8)) == 0
+
+
+@pytest.mark.parametrize("overlap", [0, 500, 1_000, 1_800])
+def test_minhash_jaccard_within_error_bound(overlap):
+    a, b = user_ids(0, 2_000), user_ids(2_000 - overlap, 4_000 - overlap)
+    jaccard = overlap / (4_000 - overlap)
+    df = build({"a": a, "b": b}).similar("a")
+    estimate = df["jaccard"].iloc[0] if len(df) else 0.0
+    # Four standard errors of sqrt(J (1 - J) / 128), at least one hash's worth.
+    bound = max(4 * math.sqrt(jaccard * (1 - jaccard) / NUM_HASHES), 1 / NUM_HASHES)
+    assert abs(estimate - jaccard) <= bound
+
+
+def test_similar_ranks_by_estimated_shared_commenters():
+    recipes = build(
+        {
+            "a": user_ids(0, 1_000),
+            "close": user_ids(200, 1_200),
+            "far": user_ids(900, 1_900),
+            "apart": user_ids(5_000, 6_000),
+        }
+    )
+    df = recipes.similar("a")
+    assert list(df["recipe_name"]) == ["close", "far"]
+    assert abs(df["shared_commenter_count"].iloc[0] - 800) <= 0.25 * 800
+
+
+def test_similar_without_commenters_is_empty_but_typed():
+    df = build({"a": user_ids(0, 10)}).similar("missing")
+    assert df.empty
+    # The page rounds and formats the columns of an empty result too.
+    assert df["jaccard"].round(3).empty
+    assert df["shared_commenter_count"].dtype == np.int64
+
+
+def test_frame_round_trip():
+    recipes = build({"a": user_ids(0, 50), "b": user_ids(25, 75)})
+    again = RecipeSketches.from_frame(recipes.to_frame())
+    assert np.array_equal(again.minhash, recipes.minhash)
+    assert np.array_equal(again.hll, recipes.hll)
+    assert again.reach(["a", "b"]) == recipes.reach(["a", "b"])
+
+
+class VersionedBackend():
+    """Serves one sketch frame and counts how often it was queried."""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self.version = 1
+        self.queries = 0
+
+    def data_version(self, database: str) -> int:
+        return self.version
+
+    def run_query(self, cypher_filename: str, database: str):
+        self.queries += 1
+        return self.frame
+
+
+def test_load_is_cached_per_data_version():
+    db = VersionedBackend(build({"a": user_ids(0, 10)}).to_frame())
+    first = sketches.load(db, "neo4j")
+    assert sketches.load(db, "neo4j") is first
+    assert db.queries == 1
+    db.version = 2
+    assert sketches.load(db, "neo4j") is not first
+    assert db.queries == 2
+
+
+class CommenterStore():
+    """Answers the sketch export queries from (recipe_code, recipe_name, user_id) rows."""
+
+    def __init__(self, pairs: list):
+        self.pairs = pd.DataFrame(pairs, columns=["recipe_code", "recipe_name", "user_id"])
+        self.written = {}
+
+    def stream_query(self, cypher_filename: str, database: str, fetch_size: int, **params):
+        pairs = self.pairs
+        if cypher_filename == "materialize/export_commenters_of_recipes.cypher":
+            pairs = pairs[pairs["recipe_code"].isin(params["recipe_codes"])]
+        if not pairs.empty:
+            yield pairs.reset_index(drop=True)
+
+    def write(self, cypher_filename: str, database: str, rows: list) -> list:
+        self.written.update((row["recipe_code"], row) for row in rows)
+        return []
+
+
+def test_refresh_sketches_rewrites_only_the_given_recipes():
+    store = CommenterStore(
+        [(1, "a", "u1"), (1, "a", "u2"), (2, "b", "u2"), (2, "b", "u3"), (3, "c", "u1")]
+    )
+    sketches.write_sketches(store, "neo4j")
+    full = dict(store.written)
+
+    # Recipe 2 gets a new commenter and recipe 3 loses its only one.
+    store.pairs = pd.concat(
+        [store.pairs[store.pairs["recipe_code"] != 3], pd.DataFrame([(2, "b", "u4")], columns=store.pairs.columns)]
+    )
+    store.written = {}
+    sketches.refresh_sketches(store, "neo4j", [2, 3])
+
+    assert set(store.written) == {2, 3}
+    assert store.written[2]["commenter_count"] == 3
+    assert store.written[2]["commenter_hll"] != full[2]["commenter_hll"]
+    assert store.written[3] == {
+        "recipe_code": 3, "commenter_count": None, "commenter_minhash": None, "commenter_hll": None
+    }
+
+    # The refreshed sketch is the one a full build would write.
+    refreshed = store.written[2]
+    sketches.write_sketches(store, "neo4j")
+    assert store.written[2] == refreshed
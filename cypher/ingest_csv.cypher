@@ -22,6 +22,41 @@ REQUIRE (n.`recipe_code`) IS UNIQUE;
 CREATE CONSTRAINT `user_id_USER_uniq` IF NOT EXISTS
 FOR (n: `USER`)
 REQUIRE (n.`user_id`) IS UNIQUE;
+CREATE CONSTRAINT `name_DATA_VERSION_uniq` IF NOT EXISTS
+FOR (n: `DATA_VERSION`)
+REQUIRE (n.`name`) IS UNIQUE;
+CREATE CONSTRAINT `name_INGEST_WATERMARK_uniq` IF NOT EXISTS
+FOR (n: `INGEST_WATERMARK`)
+REQUIRE (n.`name`) IS UNIQUE;
+
+// INDEX creation
+// --------------
+//
+// Create indexes on the properties the dashboard queries filter or sort on, so lookups by name and top-N by reputation use an index instead of a label scan. Keep in sync with `app/component/schema.py`.
+CREATE INDEX `recipe_name_RECIPE` IF NOT EXISTS
+FOR (n: `RECIPE`)
+ON (n.`recipe_name`);
+CREATE INDEX `user_name_USER` IF NOT EXISTS
+FOR (n: `USER`)
+ON (n.`user_name`);
+CREATE INDEX `user_reputation_USER` IF NOT EXISTS
+FOR (n: `USER`)
+ON (n.`user_reputation`);
+CREATE INDEX `reputation_rank_USER` IF NOT EXISTS
+FOR (n: `USER`)
+ON (n.`reputation_rank`);
+CREATE INDEX `community_id_USER` IF NOT EXISTS
+FOR (n: `USER`)
+ON (n.`communityId`);
+CREATE INDEX `created_at_COMMENT` IF NOT EXISTS
+FOR (n: `COMMENT`)
+ON (n.`created_at`);
+CREATE FULLTEXT INDEX `recipe_name_fulltext` IF NOT EXISTS
+FOR (n: `RECIPE`)
+ON EACH [n.`recipe_name`];
+CREATE FULLTEXT INDEX `user_name_fulltext` IF NOT EXISTS
+FOR (n: `USER`)
+ON EACH [n.`user_name`];
 
 :param {
   idsToSkip: []
@@ -95,3 +130,17 @@ CALL {
   MATCH (target: `RECIPE` { `recipe_code`: toInteger(trim(row.`recipe_code`)) })
   MERGE (source)-[r: `BELONGS_TO`]->(target)
 } IN TRANSACTIONS OF 10000 ROWS;
+
+
+// DERIVED structures
+// ------------------
+//
+// After a full load, rebuild the precomputed relationships and properties the dashboard queries read (e.g. CO_COMMENTED,
+// USER.reputation_rank and the :INFLUENCER label) by running `python -m component.materialize` from the `app/` directory. That job also bumps the data version below.
+
+// CACHE invalidation
+// ------------------
+//
+// Bump the graph data version so running dashboards drop their cached query results on their next version check.
+MERGE (v: `DATA_VERSION` { `name`: 'graph' })
+SET v.`version` = coalesce(v.`version`, 0) + 1;